@@ -35,10 +35,11 @@ def on_collision(data: SpriteCollisionMsg):
 def on_sprite_out(data: SpriteOutMsg):
     if data.device_nr != device.client_device.device_nr:
         return
-    data.sprite.pos_x = 0
-    data.sprite.pos_y = 0
-    data.sprite.speed = 1
-    device.add_sprite(**data.sprite)
+    sprite = data.sprite.to_dict()
+    sprite.pos_x = 0
+    sprite.pos_y = 0
+    sprite.speed = 1
+    device.add_sprite(**sprite)
 
 
 def on_border_overlap(data: BorderOverlapMsg):
@@ -5,7 +5,7 @@ with open("README.md", "r") as fh:
 
 setuptools.setup(
     name="smartphone_connector",
-    version="0.0.115",
+    version="0.0.140",
     author="Balthasar Hofer",
     author_email="lebalz@outlook.com",
     description="Talk to a socketio server",
@@ -16,6 +16,10 @@ setuptools.setup(
     install_requires=[
         'python-socketio[client]>=4,<5',
     ],
+    extras_require={
+        'images': ['Pillow'],
+        'simulator': ['numpy'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -1,18 +1,38 @@
 from __future__ import annotations
 import logging
 from .timings import CancleSubscription, ThreadJob
+from .clock import Clock, VirtualClock, get_clock, set_clock
 from .helpers import *
 import socketio
 from inspect import signature
-from typing import overload, cast, Any, Union, Literal, Callable, List, Optional, Any
+from typing import overload, cast, Any, Deque, Dict, Union, Literal, Callable, List, Optional, Any, Sequence
 from copy import deepcopy
 from itertools import repeat
+from heapq import merge
+from collections import deque
 from .types import *
+from .dictx import DictView
+from .motion import SpriteMotion
+from .spatial import SpatialGrid, sprite_bbox
+from .simulator import PlaygroundSimulator, DEFAULT_FRAME_RATE, PLAYGROUND_TYPES
+from .recorder import SessionRecorder, read_records, DEFAULT_BUFFER_SIZE
+from .replay import ReplaySource
+from .rolling import RollingWindow
+from .filters import StreamFilter, Biquad, LowPass, HighPass, Decimate, ComplementaryFilter
+from .gestures import GestureDetector, ShakeDetector, TiltDetector, TapDetector, GESTURES
+from .store import SnapshotCache, ListSnapshot
+from .waiting import EventWaiters
+from .streams import MessageStream, StreamPolicy, DEFAULT_STREAM_SIZE, DEFAULT_BLOCK_TIMEOUT
+from .aio import AsyncMessageStream, AsyncStreamPolicy, DEFAULT_ASYNC_STREAM_SIZE
+from .executor import CallbackExecutor, LatestCallback, DispatchPolicy, DEFAULT_WORKERS, DEFAULT_QUEUE_SIZE
 from .colors import Colors
+from .assets import AssetCache, AssetUpload, AssetUploader, ImagePipeline, asset_files, asset_pkg, content_hash, load_assets, resolve_asset_dir, DEFAULT_CHUNK_SIZE, DEFAULT_STREAM_THRESHOLD
 from random import randint
 from contextlib import contextmanager
 from pathlib import Path
 import sys
+import threading
+import time
 
 
 def noop(x):
@@ -29,6 +49,21 @@ def data_threshold(data_type: str) -> int:
     return DATA_MSG_THRESHOLD
 
 
+# the fields of the data frames delivered to subscriptions
+SUBSCRIPTION_FIELDS = ['key', 'acceleration', 'gyro', 'color_pointer', 'grid_pointer']
+
+
+# alternative names of the events
+EVENT_ALIASES = {
+    'acc': 'acceleration',
+    'object_out': 'sprite_out',
+    'object_removed': 'sprite_removed',
+    'collision': 'sprite_collision',
+    'object_collision': 'sprite_collision',
+    'object_clicked': 'sprite_clicked'
+}
+
+
 DEFAULT_PLAYGROUND_CONFIG = DictX({
         'width': 100,
         'height': 100,
@@ -42,9 +77,10 @@ class Connector:
     __last_time_stamp: float = -1
     __last_sub_time: float = 0
     __record_data: bool = False
-    data: dict[str, dict[str, list[ClientMsg]]] = DictX({})
-    __current_data_frame: dict[str, DataFrame] = DictX({})
-    __latest_data: DataFrame = default_data_frame()
+    __clock: Optional[Clock] = None
+    data: dict[str, dict[str, list[ClientMsg]]]
+    __current_data_frame: dict[str, DataFrame]
+    __latest_data: DataFrame
     __devices = {'time_stamp': time_s(), 'devices': []}
     device: Optional[Device] = None
     __server_url: str
@@ -54,7 +90,18 @@ class Connector:
     room_members: List[Device] = []
     joined_rooms: List[str]
     __main_thread_blocked: bool = False
-    __blocked_data_msgs: List[DataMsg] = []
+    __blocked_data_msgs: Deque[DataMsg]
+    # messages received while `subscribe(blocking=True)` runs are handed to the main thread
+    # through a queue of at most `blocked_queue_size` messages (None: unbounded). When it is full,
+    # the 'oldest' or the 'newest' message is dropped (see `blocked_dropped`).
+    blocked_queue_size: Optional[int] = None
+    blocked_drop_policy: Literal['oldest', 'newest'] = 'oldest'
+    blocked_dropped: int = 0
+    # the number of the latest messages kept for `changed_since`
+    change_log_size: int = 10000
+    __change_log: List[ClientMsg]
+    __seq: int
+    __streams: Tuple[Union[MessageStream, AsyncMessageStream], ...]
     __last_sent_grid = DictX({
         'grid': [[]],
         'unicast_to': None,
@@ -64,9 +111,27 @@ class Connector:
     })
     __playground_config: PlaygroundConfig = deepcopy(DEFAULT_PLAYGROUND_CONFIG)
 
-    __sprites = []
+    __sprites: Dict[str, Sprite]
+    __motions: Dict[str, SpriteMotion]
+    __spatial: SpatialGrid
     __lines = []
     __reportings: DictX
+    __uploaded_assets: Dict[str, Dict[str, str]]
+    asset_cache: AssetCache
+    asset_search_paths: Optional[List[Union[Path, str]]] = None
+    asset_workers: Optional[int] = None
+    asset_chunk_size: int = DEFAULT_CHUNK_SIZE
+    asset_stream_threshold: Optional[int] = DEFAULT_STREAM_THRESHOLD
+    __asset_uploaders: List[AssetUploader]
+    __lazy_images: Dict[str, Tuple[Path, Optional[ImagePipeline]]]
+    __simulator: Optional[PlaygroundSimulator] = None
+    __recorder: Optional[SessionRecorder] = None
+    __executor: Optional[CallbackExecutor] = None
+    __rolling: Dict[Tuple[str, str], Dict[Tuple[str, float], RollingWindow]]
+    __filters: Dict[str, Tuple[StreamFilter, int]]
+    __filter_batches: Dict[str, List[DictX]]
+    __custom_events: Dict[str, List[Callable]]
+    __gestures: Dict[str, GestureDetector]
 
     # callback functions
 
@@ -127,68 +192,93 @@ class Connector:
     _on_timer: List[OnTimerSignature] = []
 
     @overload
-    def on(self, event: Literal['key'], function: OnKeySignature, replace: bool = False): ...
+    def on(self, event: Literal['key'], function: OnKeySignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['f1'], function: OnF1Signature, replace: bool = False): ...
+    def on(self, event: Literal['f1'], function: OnF1Signature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['f2'], function: OnF2Signature, replace: bool = False): ...
+    def on(self, event: Literal['f2'], function: OnF2Signature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['f3'], function: OnF3Signature, replace: bool = False): ...
+    def on(self, event: Literal['f3'], function: OnF3Signature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['f4'], function: OnF4Signature, replace: bool = False): ...
+    def on(self, event: Literal['f4'], function: OnF4Signature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['pointer'], function: OnPointerSignature, replace: bool = False): ...
+    def on(self, event: Literal['pointer'], function: OnPointerSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['acceleration', 'acc'], function: OnAccelerationSignature, replace: bool = False): ...
+    def on(self, event: Literal['acceleration', 'acc'], function: OnAccelerationSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['gyro'], function: OnGyroSignature, replace: bool = False): ...
+    def on(self, event: Literal['gyro'], function: OnGyroSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['sensor'], function: OnSensorSignature, replace: bool = False): ...
+    def on(self, event: Literal['sensor'], function: OnSensorSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['data'], function: OnDataSignature, replace: bool = False): ...
+    def on(self, event: Literal['data'], function: OnDataSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['broadcast_data'], function: OnBroadcastDataSignature, replace: bool = False): ...
+    def on(self, event: Literal['broadcast_data'], function: OnBroadcastDataSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['all_data'], function: OnAll_dataSignature, replace: bool = False): ...
+    def on(self, event: Literal['all_data'], function: OnAll_dataSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['device'], function: OnDeviceSignature, replace: bool = False): ...
+    def on(self, event: Literal['device'], function: OnDeviceSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['client_device'], function: OnClientDeviceSignature, replace: bool = False): ...
+    def on(self, event: Literal['client_device'], function: OnClientDeviceSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['devices'], function: OnDevicesSignature, replace: bool = False): ...
+    def on(self, event: Literal['devices'], function: OnDevicesSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['error'], function: OnErrorSignature, replace: bool = False): ...
+    def on(self, event: Literal['error'], function: OnErrorSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['room_joined'], function: OnRoomJoinedSignature, replace: bool = False): ...
+    def on(self, event: Literal['room_joined'], function: OnRoomJoinedSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['room_left'], function: OnRoomLeftSignature, replace: bool = False): ...
+    def on(self, event: Literal['room_left'], function: OnRoomLeftSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['sprite_out', 'object_out'], function: OnSpriteOutSignature, replace: bool = False): ...
+    def on(self, event: Literal['sprite_out', 'object_out'], function: OnSpriteOutSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
 
     @overload
     def on(self, event: Literal['sprite_removed', 'object_removed'],
-           function: OnSpriteRemovedSignature, replace: bool = False): ...
+           function: OnSpriteRemovedSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
 
     @overload
     def on(self, event: Literal['sprite_collision', 'object_collision',
-                                'collision'], function: OnSpriteCollisionSignature, replace: bool = False): ...
+                                'collision'], function: OnSpriteCollisionSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
 
     @overload
-    def on(self, event: Literal['overlap_in'], function: OnOverlapInSignature, replace: bool = False): ...
+    def on(self, event: Literal['overlap_in'], function: OnOverlapInSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['overlap_out'], function: OnOverlapOutSignature, replace: bool = False): ...
+    def on(self, event: Literal['overlap_out'], function: OnOverlapOutSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['border_overlap'], function: OnBorderOverlapSignature, replace: bool = False): ...
+    def on(self, event: Literal['border_overlap'], function: OnBorderOverlapSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['auto_movement_pos'], function: OnAutoMovementPosSignature, replace: bool = False): ...
+    def on(self, event: Literal['auto_movement_pos'], function: OnAutoMovementPosSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
     @overload
-    def on(self, event: Literal['timer'], function: OnTimerSignature, replace: bool = False): ...
+    def on(self, event: Literal['timer'], function: OnTimerSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
 
     @overload
     def on(self, event: Literal['sprite_clicked', 'object_clicked'],
-           function: OnSpriteClickedSignature, replace: bool = False): ...
+           function: OnSpriteClickedSignature, replace: bool = False, policy: DispatchPolicy = 'all'): ...
 
-    def on(self, event: Union[Event, EventAliases], function: CallbackSignature, replace: bool = False):
+    def on(self, event: Union[Event, EventAliases], function: CallbackSignature, replace: bool = False, policy: DispatchPolicy = 'all'):
+        '''
+        registers a callback function for the event
+
+        Optional
+        --------
+        replace : bool
+            wheter to remove the previously registered callbacks of the event
+
+        policy : 'all' | 'latest'
+            'all' (default): the callback is called with each message
+            'latest': the callback runs on its own thread and is called with the newest message only -
+            messages received while it is busy are skipped (their number is passed in the field `skipped` of
+            dict messages, other payloads like the list of `devices` are passed unchanged).
+            Suited to slow callbacks of fast streams, e.g. plotting the acceleration.
+
+        Example
+        -------
+        ```py
+        device.on('acceleration', plot, policy='latest')
+        ```
+        '''
+        if policy == 'latest':
+            function = LatestCallback(function, lambda fn, data: self.__run_callbacks([fn], data))
+        elif policy != 'all':
+            raise ValueError(f'unknown dispatch policy "{policy}"')
         funcs = []
         if event == 'key':
             funcs = self._on_key
@@ -244,8 +334,14 @@ class Connector:
             funcs = self._on_auto_movement_pos
         elif event == 'timer':
             funcs = self._on_timer
+        else:
+            # events of filtered streams, gestures and other custom events
+            funcs = self.__custom_events.setdefault(event, [])
+            if event in GESTURES and event not in self.__gestures:
+                self.detect_gesture(event)
 
         if replace:
+            self.__stop_callbacks(funcs)
             funcs.clear()
         funcs.append(function)
 
@@ -307,16 +403,31 @@ class Connector:
             funcs = self._on_auto_movement_pos
         elif event == 'timer':
             funcs = self._on_timer
+        else:
+            funcs = self.__custom_events.get(event, [])
 
         if function is None:
+            self.__stop_callbacks(funcs)
             funcs.clear()
         else:
+            if function not in funcs:
+                # callbacks with the 'latest' policy are wrapped
+                wrapped = [f for f in funcs if isinstance(f, LatestCallback) and f.function == function]
+                if len(wrapped) > 0:
+                    function = wrapped[0]
+                    function.stop()
             funcs.remove(function)
 
+    @staticmethod
+    def __stop_callbacks(funcs: List[Callable]):
+        for f in funcs:
+            if isinstance(f, LatestCallback):
+                f.stop()
+
     __on_notify_subscribers: SubscriptionCallbackSignature = noop
     __subscription_job: CancleSubscription = None
     __async_subscription_jobs: List[ThreadJob] = []
-    __responses: List[InputResponseMsg] = []
+    __responses: List[InputResponseMsg]
     __alerts: List[AlertConfirmMsg] = []
 
     @ property
@@ -331,9 +442,21 @@ class Connector:
     def device_id(self):
         return self.__device_id
 
+    @property
+    def clock(self) -> Clock:
+        '''
+        the clock of all timings of this connector (time stamps, `sleep`, async subscriptions, sprite motions,
+        the simulator) - by default the clock set with `set_clock`
+        '''
+        return self.__clock if self.__clock is not None else get_clock()
+
+    @clock.setter
+    def clock(self, clock: Optional[Clock]):
+        self.__clock = clock
+
     @ property
     def current_time_stamp(self):
-        ts = time_s()
+        ts = time_s(self.clock)
         if ts == self.__last_time_stamp:
             self.__last_sub_time += 0.000001
             return ts + self.__last_sub_time
@@ -343,7 +466,7 @@ class Connector:
 
     @property
     def sprites(self) -> List[Sprite]:
-        return self.__sprites
+        return list(self.__sprites_snapshot())
 
     def get_sprite(self, id: str = None) -> Union[Sprite, None]:
         '''returns the sprite with the given id
@@ -352,11 +475,174 @@ class Connector:
 
         if the sprite is not found, None is returned
         '''
-        if len(self.sprites) == 0:
-            return None
         if id is None:
-            return self.sprites[0]
-        return first(lambda s: s.id == id, self.sprites)
+            return next(iter(self.__sprites_snapshot()), None)
+        return self.__sprites.get(id)
+
+    def __sprites_snapshot(self) -> Tuple[Sprite, ...]:
+        return self.__store.get('sprites', lambda: tuple(self.__sprites.values()))
+
+    def __register_sprite(self, sprite: dict):
+        '''
+        adds or updates a sprite of the local registry. Registered sprites are never changed in place but replaced,
+        thus views on a registered sprite (as delivered with events) stay unchanged.
+        '''
+        with self.__store.lock:
+            old = self.__sprites.get(sprite['id'])
+            self.__sprites[sprite['id']] = DictX({**old, **sprite} if old is not None else sprite)
+            self.__spatial.update(sprite['id'], sprite_bbox(self.__sprites[sprite['id']]))
+            self.__store.invalidate('sprites')
+
+    def __unregister_sprite(self, id: str) -> Optional[Sprite]:
+        with self.__store.lock:
+            self.__motions.pop(id, None)
+            self.__spatial.remove(id)
+            self.__store.invalidate('sprites')
+            return self.__sprites.pop(id, None)
+
+    def __reset_sprites(self):
+        with self.__store.lock:
+            self.__sprites = {}
+            self.__motions = {}
+            self.__spatial.clear()
+            self.__store.invalidate('sprites')
+
+    def __grid_cell_size(self) -> Number:
+        # about 10x10 cells cover the playground
+        size = max(self.__playground_config.get('width') or 0, self.__playground_config.get('height') or 0)
+        return size / 10 if size > 0 else 10
+
+    def __rebuild_spatial(self):
+        with self.__store.lock:
+            self.__spatial.rebuild(self.__grid_cell_size())
+
+    def __registered_sprites(self, ids: List[str]) -> List[Sprite]:
+        # called while holding the store lock
+        return [self.__sprites[id] for id in ids if id in self.__sprites]
+
+    def __track_motion(self, sprite: dict):
+        t = time_s(self.clock)
+        motion = self.__motions.get(sprite['id'])
+        if motion is None:
+            registered = self.__sprites.get(sprite['id'], {})
+            motion = SpriteMotion((registered.get('pos_x', 0), registered.get('pos_y', 0)), t)
+            self.__motions[sprite['id']] = motion
+        motion.update(sprite, t)
+
+    def sprite_position(self, id: str, at: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        '''
+        returns the current position `(x, y)` of a sprite, extrapolated locally from its last known position,
+        its direction and speed and its movement sequences - no network traffic involved.
+
+        Optional
+        --------
+        at : float
+            time in seconds since epoche (of the connector's `clock`), by default now
+
+        Return
+        ------
+        Tuple[float, float], None
+            None when the sprite is unknown
+        '''
+        if id not in self.__sprites:
+            return None
+        motion = self.__motions.get(id)
+        if motion is None:
+            sprite = self.__sprites[id]
+            return (sprite.get('pos_x', 0), sprite.get('pos_y', 0))
+        return motion.position(at if at is not None else time_s(self.clock))
+
+    def sprites_at(self, x: Number, y: Number) -> List[Sprite]:
+        '''
+        returns the sprites whose bounding box contains the point `(x, y)`.
+
+        The lookup uses a spatial index over the last known positions of the sprites (as set by
+        `add_sprite`, `update_sprite` or reported by the playground), rotations are ignored.
+        '''
+        # the index is updated by the receiving thread
+        with self.__store.lock:
+            return self.__registered_sprites(self.__spatial.at(x, y))
+
+    def sprites_in_rect(self, x_min: Number, y_min: Number, x_max: Number, y_max: Number) -> List[Sprite]:
+        '''
+        returns the sprites whose bounding box overlaps the given rectangle (based on their last known positions)
+        '''
+        with self.__store.lock:
+            return self.__registered_sprites(self.__spatial.in_rect(x_min, y_min, x_max, y_max))
+
+    def nearest_sprite(self, x: Number, y: Number, max_distance: Optional[Number] = None) -> Optional[Sprite]:
+        '''
+        returns the sprite with the bounding box nearest to the point `(x, y)` (based on their last known positions)
+
+        Optional
+        --------
+        max_distance : Number
+            sprites farther away are ignored
+
+        Return
+        ------
+        Sprite, None
+            None when no sprite is within reach
+        '''
+        with self.__store.lock:
+            id = self.__spatial.nearest(x, y, max_distance if max_distance is not None else float('inf'))
+            if id is None:
+                return None
+            return self.__sprites.get(id)
+
+    @property
+    def simulator(self) -> Optional[PlaygroundSimulator]:
+        return self.__simulator
+
+    def simulate(self, frame_rate: Number = DEFAULT_FRAME_RATE, start_time: Optional[float] = None) -> PlaygroundSimulator:
+        '''
+        sends all playground messages (sprites, lines, movements, playground config) to a local headless simulator
+        instead of the phone. The simulator reports the playground events (collisions, border overlaps, sprites out,
+        auto movement positions) as the phone would - but only when it is advanced with `step()` or `run(seconds)`,
+        thus a game can be tested offline and faster than in real time.
+
+        Optional
+        --------
+        frame_rate : Number
+            simulated frames per second
+
+        start_time : float
+            virtual start time in seconds since epoche, by default the time of the connector's `clock`.
+            A `VirtualClock` is advanced with the simulation.
+
+        Return
+        ------
+        PlaygroundSimulator
+            the simulator, already initialized with the current playground and the registered sprites
+
+        Example
+        -------
+        ```py
+        sim = device.simulate()
+        device.add_sprite(id='ball', pos_x=0, pos_y=0, direction=[1, 0], speed=10, radius=2)
+        sim.run(20)     # simulates 20 seconds, the callbacks are called as usual
+        ```
+        '''
+        client = self.client_device
+        simulator = PlaygroundSimulator(
+            on_event=self.__on_new_data,
+            device_id=self.device_id,
+            device_nr=client['device_nr'] if client is not None else 0,
+            frame_rate=frame_rate,
+            start_time=start_time,
+            clock=self.clock
+        )
+        simulator.receive({'type': DataType.PLAYGROUND_CONFIG, 'config': self.__playground_config})
+        simulator.receive({'type': DataType.SPRITES, 'sprites': list(self.__sprites.values())})
+        simulator.receive({'type': DataType.LINES, 'lines': self.__lines})
+        self.__simulator = simulator
+        return simulator
+
+    def stop_simulation(self):
+        '''
+        playground messages are sent to the phone again
+        '''
+        self.__simulator = None
 
     get_circle = get_sprite
     get_ellipse = get_sprite
@@ -364,23 +650,56 @@ class Connector:
     get_rectangle = get_sprite
     get_object = get_sprite
 
-    def __init__(self, server_url: str, device_id: str):
+    def __init__(self, server_url: str, device_id: str, clock: Optional[Clock] = None):
+        self.__clock = clock
         self.__reportings = DictX({})
+        self.__sprites = {}
+        self.__motions = {}
+        self.__playground_config = deepcopy(DEFAULT_PLAYGROUND_CONFIG)
+        self.__spatial = SpatialGrid(self.__grid_cell_size())
+        self.__uploaded_assets = {'image': {}, 'audio': {}}
+        self.asset_cache = AssetCache()
+        self.__asset_uploaders = []
+        self.__lazy_images = {}
+        self.__lazy_lock = threading.RLock()
+        self.__rolling = {}
+        self.__filters = {}
+        self.__filter_batches = {}
+        self.__custom_events = {}
+        self.__gestures = {}
+        self.__blocked_data_msgs = deque()
+        self.__blocked_lock = threading.Lock()
+        # the store (data, data frames, sprites, responses) is changed while holding the lock of
+        # the snapshot cache, readers use the published snapshots
+        self.__store = SnapshotCache()
+        self.__responses = []
+        self.__change_log = []
+        self.__seq = 0
+        self.__waiters = EventWaiters()
+        # notified when a response, an alert confirmation or an information message is received
+        self.__replies = threading.Condition()
+        self.__streams = ()
         device_id = device_id.strip()
         self.__server_url = server_url
         self.__device_id = device_id
-        self.__current_data_frame[device_id] = default_data_frame()
+        self.data = DictX({})
+        self.__current_data_frame = DictX({device_id: default_data_frame()})
+        self.__latest_data = default_data_frame()
         self.sio.on('connect', self.__on_connect)
         self.sio.on('disconnect', self.__on_disconnect)
-        self.sio.on(SocketEvents.NEW_DATA, self.__on_new_data)
-        self.sio.on(SocketEvents.ALL_DATA, self.__on_all_data)
-        self.sio.on(SocketEvents.DEVICE, self.__on_device)
-        self.sio.on(SocketEvents.DEVICES, self.__on_devices)
-        self.sio.on(SocketEvents.ERROR_MSG, self.__on_error)
-        self.sio.on(SocketEvents.INFORMATION_MSG, self.__on_information)
-        self.sio.on(SocketEvents.ROOM_JOINED, self.__on_room_joined)
-        self.sio.on(SocketEvents.ROOM_LEFT, self.__on_room_left)
-        self.sio.on(SocketEvents.TIMER, self.__on_timer)
+        self.__handlers = {
+            SocketEvents.NEW_DATA: self.__on_new_data,
+            SocketEvents.ALL_DATA: self.__on_all_data,
+            SocketEvents.DEVICE: self.__on_device,
+            SocketEvents.DEVICES: self.__on_devices,
+            SocketEvents.ERROR_MSG: self.__on_error,
+            SocketEvents.INFORMATION_MSG: self.__on_information,
+            SocketEvents.ROOM_JOINED: self.__on_room_joined,
+            SocketEvents.ROOM_LEFT: self.__on_room_left,
+            SocketEvents.TIMER: self.__on_timer
+        }
+        for event, handler in self.__handlers.items():
+            self.sio.on(event, self.__inbound(event, handler))
         self.joined_rooms = [device_id]
         self.connect()
 
@@ -429,6 +748,13 @@ class Connector:
                 del data['broadcast']
             data['unicast_to'] = delivery_opts['unicast_to']
 
+        if self.__recorder is not None:
+            self.__recorder.record(event, data, outbound=True)
+
+        if self.__simulator is not None and event == SocketEvents.NEW_DATA and data.get('type') in PLAYGROUND_TYPES:
+            self.__simulator.receive(data)
+            return
+
         self.sio.emit(event, data)
 
     def send_to(self, to: str, data: DataMsg, **delivery_opts):
@@ -531,12 +857,207 @@ class Connector:
         )
         if not alert:
             return
-        alert_msg = False
-        while not alert_msg:
-            self.sleep(0.01)
-            alert_msg = first(lambda msg: msg['time_stamp'] == ts, self.__alerts)
+        alert_msg = self.__wait_for_reply(lambda: first(lambda msg: msg['time_stamp'] == ts, self.__alerts))
         self.__alerts.remove(alert_msg)
 
+    def wait_for(self, event: Union[Event, EventAliases], predicate: Optional[Callable[[Any], bool]] = None, timeout: Optional[float] = None) -> Any:
+        '''
+        waits (without polling) until the event occurs and returns its message. The callbacks of the
+        event are called as usual.
+
+        Parameters
+        ----------
+        event : str
+            the event, as used with `on(event, ...)`, e.g. 'key', 'f1', 'sprite_clicked' or 'devices'
+
+        Optional
+        --------
+        predicate : Callable[[Any], bool]
+            wait for a message fulfilling the predicate
+
+        timeout : float
+            the maximal time in seconds to wait, by default no limit. Measured in real time, also when
+            a `VirtualClock` is set (the messages arrive in real time).
+
+        Return
+        ------
+        Any
+            the message of the event, None when the timeout expired (or the connector disconnected)
+
+        Example
+        -------
+        ```py
+        key = device.wait_for('key', lambda data: data.key in ['left', 'right'], timeout=10)
+        clicked = device.wait_for('sprite_clicked', lambda data: data.id == 'start')
+        ```
+        '''
+        event = EVENT_ALIASES.get(event, event)
+        if event in GESTURES and event not in self.__gestures:
+            self.detect_gesture(event)
+        return self.__waiters.wait(event, predicate, timeout)
+
+    def stream(self,
+               data_type: Optional[str] = None,
+               device_id: str = None,
+               maxsize: int = DEFAULT_STREAM_SIZE,
+               policy: StreamPolicy = 'drop_oldest',
+               block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT) -> MessageStream:
+        '''
+        the received messages as an iterator - a bounded queue, which is consumed by iterating over it.
+        The iteration blocks until the next message arrives and ends when the stream is closed
+        (`close()`, leaving a `with` block or `disconnect()`). Leaving the loop early closes the stream.
+
+        Optional
+        --------
+        data_type : str
+            only messages of this type, e.g. 'acceleration', by default all
+
+        device_id : str
+            default is the device_id of this connector, '__ALL_DEVICES__' for the messages of all devices
+
+        maxsize : int
+            the maximal number of queued messages
+
+        policy : 'drop_oldest' | 'drop_newest' | 'block'
+            when the queue is full, the oldest queued (default) or the new message is dropped -
+            or the reception waits until the consumer caught up
+
+        block_timeout : float
+            with policy 'block', the maximal time in seconds the reception waits for the consumer,
+            then the new message is dropped. None waits without limit.
+
+        Example
+        -------
+        ```py
+        with device.stream('acceleration', maxsize=100) as samples:
+            for msg in samples:
+                process(msg)
+        ```
+        '''
+        if device_id is None:
+            device_id = self.device_id
+        stream = MessageStream(
+            data_type=data_type,
+            device_id=None if device_id == '__ALL_DEVICES__' else device_id,
+            maxsize=maxsize,
+            policy=policy,
+            block_timeout=block_timeout,
+            on_close=self.__remove_stream
+        )
+        self.__add_stream(stream)
+        return stream
+
+    def aiter(self,
+              data_type: Optional[str] = None,
+              device_id: str = None,
+              maxsize: int = DEFAULT_ASYNC_STREAM_SIZE,
+              policy: AsyncStreamPolicy = 'drop_oldest') -> AsyncMessageStream:
+        '''
+        the received messages as an async iterator for the running asyncio loop. The messages are handed
+        to the loop with `call_soon_threadsafe` and queued in a bounded queue, neither the reception nor
+        the loop are blocked. Must be called within the loop. Leaving the loop early closes the stream.
+
+        Optional
+        --------
+        data_type : str
+            only messages of this type, e.g. 'key', by default all
+
+        device_id : str
+            default is the device_id of this connector, '__ALL_DEVICES__' for the messages of all devices
+
+        maxsize : int
+            the maximal number of queued messages
+
+        policy : 'drop_oldest' | 'drop_newest'
+            which message is dropped when the queue is full
+
+        Example
+        -------
+        ```py
+        async def main():
+            async for msg in device.aiter('key'):
+                print(msg.key)
+        ```
+        '''
+        if device_id is None:
+            device_id = self.device_id
+        stream = AsyncMessageStream(
+            data_type=data_type,
+            device_id=None if device_id == '__ALL_DEVICES__' else device_id,
+            maxsize=maxsize,
+            policy=policy,
+            on_close=self.__remove_stream
+        )
+        self.__add_stream(stream)
+        return stream
+
+    async def anext_response(self,
+                             question: Optional[str] = None,
+                             input_type: str = 'text',
+                             options: List[str] = None,
+                             unicast_to: int = None,
+                             timeout: Optional[float] = None) -> Union[str, None]:
+        '''
+        the async version of `prompt`: prompts the user and awaits the response without blocking
+        the asyncio loop. Without a question, the next response to any prompt is awaited.
+
+        Optional
+        --------
+        question : str
+            what should the user be prompted for?
+
+        input_type : 'text', 'number', 'datetime', 'date', 'time', 'select'
+            to use the correct html input type
+
+        options: List[str]
+            required when input_type is 'select' - a list with the selection-options
+
+        unicast_to : int
+            the device number to which this message is sent exclusively.
+
+        timeout : float
+            the maximal time in seconds to wait, by default no limit
+
+        Return
+        ------
+        str, None
+
+            None when the user canceled the prompt or the timeout expired
+
+        Example
+        -------
+        ```py
+        name = await device.anext_response('What is your name?')
+        ```
+        '''
+        # the time stamp is fixed before the stream is registered, thus a late response to an earlier
+        # prompt is never taken for the response to this one
+        ts = self.current_time_stamp if question is not None else None
+
+        def is_response(msg: dict) -> bool:
+            return ts is None or msg.get('time_stamp') == ts
+
+        stream = AsyncMessageStream(data_type=DataType.INPUT_RESPONSE, maxsize=1, predicate=is_response, on_close=self.__remove_stream)
+        self.__add_stream(stream)
+        try:
+            if question is not None:
+                self.__send_prompt(question, input_type=input_type, options=options, unicast_to=unicast_to, ts=ts)
+            response = await stream.get(timeout)
+        finally:
+            stream.close()
+        if response is None:
+            return None
+        self.__take_response(cast(InputResponseMsg, response))
+        if 'response' in response:
+            return response['response']
+
+    def __add_stream(self, stream: Union[MessageStream, AsyncMessageStream]):
+        # replaced, not changed - the receiving thread iterates without locking
+        self.__streams = (*self.__streams, stream)
+
+    def __remove_stream(self, stream: Union[MessageStream, AsyncMessageStream]):
+        self.__streams = tuple(s for s in self.__streams if s is not stream)
+
     def input(self, question: str, input_type: str = 'text', options: List[str] = None, unicast_to: int = None) -> Union[str, None]:
         '''
         Parameters
@@ -612,7 +1133,32 @@ class Connector:
 
             When the user canceled the prompt, None is returned
         '''
-        ts = self.current_time_stamp
+        ts = self.__send_prompt(question, input_type=input_type, options=options, unicast_to=unicast_to)
+
+        def find_response():
+            responses = self.__store.get('responses', lambda: tuple(self.__responses))
+            return next((res for res in responses if res['time_stamp'] == ts), None)
+
+        response = self.__wait_for_reply(find_response)
+        self.__take_response(response)
+
+        if 'response' in response:
+            return response['response']
+
+    def __send_prompt(self, question: str, input_type: str = 'text', options: List[str] = None, unicast_to: int = None, ts: Optional[float] = None) -> float:
+        '''
+        Optional
+        --------
+        ts : float
+            the time stamp of the prompt, by default the current time stamp
+
+        Return
+        ------
+        float
+            the time stamp of the prompt, the response has the same time stamp
+        '''
+        if ts is None:
+            ts = self.current_time_stamp
 
         if callable(getattr(options, 'tolist', None)):
             options = cast(Any, options).tolist()
@@ -631,16 +1177,25 @@ class Connector:
             },
             unicast_to=unicast_to
         )
-        response = False
+        return ts
 
-        while not response:
-            self.sleep(0.01)
-            response = next((res for res in self.__responses if res['time_stamp'] == ts), False)
+    def __wait_for_reply(self, find: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        '''
+        waits until `find` returns the reply (or the timeout expired). The replies come from the phone,
+        thus the wait is in real time - also when a `VirtualClock` is set.
+        '''
+        with self.__replies:
+            return self.__replies.wait_for(find, timeout)
 
-        self.__responses.remove(response)
+    def __notify_replies(self):
+        with self.__replies:
+            self.__replies.notify_all()
 
-        if 'response' in response:
-            return response['response']
+    def __take_response(self, response: InputResponseMsg):
+        with self.__store.lock:
+            if response in self.__responses:
+                self.__responses.remove(response)
+            self.__store.invalidate('responses')
 
     def broadcast(self, data: DataMsg):
         self.emit(SocketEvents.NEW_DATA, data=data, broadcast=True)
@@ -691,12 +1246,28 @@ class Connector:
         List[ClientMsg] a list of all received messages (inlcuding messages to other device id's), ordered by time_stamp ascending (first element = oldest)
         '''
         all_data: List[ClientMsg] = []
-        for dev_id in self.data:
-            for dtype in self.data[dev_id]:
-                all_data.extend(self.data[dev_id][dtype])
+        for dev_id, data_types in self.__data_index().items():
+            for dtype in data_types:
+                all_data.extend(self.__history(dev_id, dtype))
         all_data.sort(key=lambda d: d['time_stamp'])
         return all_data
 
+    def __data_index(self) -> Dict[str, Tuple[str, ...]]:
+        '''
+        snapshot of the device ids and their data types
+        '''
+        return self.__store.get('index', lambda: {dev_id: tuple(types) for dev_id, types in self.data.items()})
+
+    def __history(self, device_id: str, data_type: str) -> Sequence[ClientMsg]:
+        '''
+        snapshot of the (time ordered) messages of a device and data type - O(1), the history lists
+        are only appended to (see `__on_new_data`)
+        '''
+        return self.__store.get(
+            ('history', device_id, data_type),
+            lambda: ListSnapshot(self.data[device_id].get(data_type, [])) if device_id in self.data else ()
+        )
+
     @overload
     def all_data(self, data_type: Literal['pointer'], device_id: str = None) -> Union[List[ColorPointer], List[GridPointer]]:
         ...
@@ -737,21 +1308,282 @@ class Connector:
         if device_id is None:
             device_id = self.device_id
 
+        index = self.__data_index()
         dev_ids = [device_id]
         if device_id == '__ALL_DEVICES__':
-            dev_ids = self.data.keys()
-        elif device_id not in self.data:
+            dev_ids = index.keys()
+        elif device_id not in index:
             return []
 
         all_data: List[ClientMsg] = []
         for dev_id in dev_ids:
-            data_types = self.data[dev_id].keys() if data_type is None else [data_type]
+            data_types = index[dev_id] if data_type is None else [data_type]
             for dtype in data_types:
-                if dtype in self.data[dev_id]:
-                    all_data.extend(self.data[dev_id][dtype])
+                all_data.extend(self.__history(dev_id, dtype))
         all_data.sort(key=lambda d: d['time_stamp'])
         return all_data
 
+    def data_between(self, data_type: str = None, t_start: Optional[float] = None, t_end: Optional[float] = None, device_id: str = None) -> List[ClientMsg]:
+        '''
+        Returns
+        -------
+        List[ClientMsg] the received messages with `t_start <= time_stamp <= t_end`, ordered by time_stamp ascending.
+            The range is found with a binary search on the (time ordered) history, only the messages
+            within the range are copied.
+
+        Optional
+        --------
+        data_type : str
+            the type of the data, by default all types
+
+        t_start : float
+            time in seconds since epoche, by default from the oldest message on
+
+        t_end : float
+            time in seconds since epoche, by default up to the latest message
+
+        device_id : str
+            default is the device_id of this connector, '__ALL_DEVICES__' for the data of all devices
+        '''
+        if device_id is None:
+            device_id = self.device_id
+        index = self.__data_index()
+        dev_ids = index.keys() if device_id == '__ALL_DEVICES__' else [device_id]
+        ranges: List[List[ClientMsg]] = []
+        for dev_id in dev_ids:
+            if dev_id not in index:
+                continue
+            data_types = index[dev_id] if data_type is None else [data_type]
+            for dtype in data_types:
+                msgs = self.__history(dev_id, dtype)
+                lo = 0 if t_start is None else bisect_time(msgs, t_start)
+                hi = len(msgs) if t_end is None else bisect_time(msgs, t_end, right=True, lo=lo)
+                if hi > lo:
+                    ranges.append(msgs[lo:hi])
+        if len(ranges) == 1:
+            return ranges[0]
+        return list(merge(*ranges, key=lambda d: d['time_stamp']))
+
+    def rolling(self, data_type: str, axis: str, window: float = 1.0, device_id: str = None) -> RollingWindow:
+        '''
+        Returns rolling aggregates (mean, variance, std, rms, min, max, peak, ema) of one value of a data type,
+        e.g. the x axis of the acceleration. The aggregates are updated incrementally with each received
+        message and can be read at any time without recomputing anything.
+
+        Parameters
+        ----------
+        data_type : str
+            e.g. 'acceleration' or 'gyro'
+
+        axis : str
+            the field of the messages, e.g. 'x' or 'gamma'
+
+        Optional
+        --------
+        window : float
+            length of the window in seconds (measured with the time stamps of the messages)
+
+        device_id : str
+            default is the device_id of this connector
+
+        Example
+        -------
+        ```py
+        acc_x = device.rolling('acceleration', 'x', window=1.0)
+        ...
+        print(acc_x.mean, acc_x.std, acc_x.max)
+        ```
+        '''
+        if device_id is None:
+            device_id = self.device_id
+        windows = self.__rolling.setdefault((device_id, data_type), {})
+        if (axis, window) not in windows:
+            rolling = RollingWindow(window)
+            history = self.__history(device_id, data_type)
+            if len(history) > 0:
+                for msg in self.data_between(data_type, t_start=history[-1]['time_stamp'] - window, device_id=device_id):
+                    if axis in msg:
+                        rolling.add(msg['time_stamp'], msg[axis])
+            windows[(axis, window)] = rolling
+        return windows[(axis, window)]
+
+    def add_filter(self, name: str, stream_filter: StreamFilter, batch_size: int = 1):
+        '''
+        attaches a streaming filter to the ingest path. The filtered messages are received as messages of the
+        new data type `name`: they are stored and can be used as any other data type, e.g. with
+        `on(name, ...)`, `latest_data(name)`, `all_data(name)` or `rolling(name, ...)`.
+
+        Parameters
+        ----------
+        name : str
+            the data type of the filtered messages, e.g. 'acc_lowpass'
+
+        stream_filter : StreamFilter
+            e.g. `LowPass(2)`, `HighPass(0.5, source='gyro')`, `Decimate(4)` or `ComplementaryFilter()`.
+            The source can be another filtered stream too.
+
+        Optional
+        --------
+        batch_size : int
+            the messages are processed in batches of this size - larger batches reduce the overhead
+            (NumPy is used where it helps), but delay the filtered messages
+
+        Example
+        -------
+        ```py
+        device.add_filter('smooth', LowPass(cutoff=2))
+        device.on('smooth', lambda data: print(data.x))
+        ```
+        '''
+        if name in [t.value for t in DataType]:
+            raise ValueError(f'"{name}" is a built-in data type')
+        stream_filter.reset()
+        self.__filters[name] = (stream_filter, max(int(batch_size), 1))
+        self.__filter_batches[name] = []
+
+    def remove_filter(self, name: str):
+        self.__filters.pop(name, None)
+        self.__filter_batches.pop(name, None)
+
+    def detect_gesture(self, gesture: Union[str, GestureDetector], **thresholds) -> GestureDetector:
+        '''
+        detects gestures in the acceleration stream. Each detected gesture is received as a message of the
+        data type 'shake', 'tilt' or 'tap', thus it can be handled with `on('shake', ...)`.
+        Registering a callback for a gesture starts its detection with the default thresholds.
+
+        Parameters
+        ----------
+        gesture : 'shake' | 'tilt' | 'tap' | GestureDetector
+            the gesture or a configured detector, e.g. `ShakeDetector(threshold=15)`
+
+        Optional
+        --------
+        **thresholds
+            the thresholds of the detector (when the gesture is given by name), e.g.
+            shake: `threshold`, `peaks`, `window`, `debounce`
+            tilt: `threshold`, `hysteresis`, `time_constant`, `debounce`
+            tap: `threshold`, `max_duration`, `debounce`
+
+        Return
+        ------
+        GestureDetector
+            the detector, its thresholds can be changed while running
+
+        Example
+        -------
+        ```py
+        device.detect_gesture('shake', threshold=15, debounce=2)
+        device.on('shake', lambda data: print('shaken', data.intensity))
+        device.on('tilt', lambda data: print(data.direction))
+        ```
+        '''
+        if isinstance(gesture, str):
+            if gesture not in GESTURES:
+                raise ValueError(f'unknown gesture "{gesture}", use one of {", ".join(GESTURES)}')
+            gesture = GESTURES[gesture](**thresholds)
+        gesture.reset()
+        self.__gestures[gesture.event] = gesture
+        return gesture
+
+    def stop_gesture(self, gesture: str):
+        '''
+        stops the detection of the gesture
+        '''
+        self.__gestures.pop(gesture, None)
+
+    def remove_rolling(self, rolling: RollingWindow):
+        '''
+        stops updating the rolling aggregates
+        '''
+        for windows in self.__rolling.values():
+            for key in [k for k, w in windows.items() if w is rolling]:
+                del windows[key]
+
+    def __update_rolling(self, data: DictX):
+        windows = self.__rolling.get((data['device_id'], data['type']))
+        if not windows:
+            return
+        for (axis, _), rolling in windows.items():
+            if axis in data and data[axis] is not None:
+                rolling.add(data.get('time_stamp', 0), data[axis])
+
+    def data_since(self, t: float, data_type: str = None, device_id: str = None) -> List[ClientMsg]:
+        '''
+        Returns
+        -------
+        List[ClientMsg] the received messages with a time_stamp of at least `t` (seconds since epoche),
+            ordered by time_stamp ascending
+
+        Example
+        -------
+        ```py
+        # acceleration samples of the last 2 seconds
+        samples = device.data_since(time_s() - 2, 'acceleration')
+        ```
+        '''
+        return self.data_between(data_type, t_start=t, device_id=device_id)
+
+    @property
+    def sequence(self) -> int:
+        '''
+        the sequence number of the latest received message
+        '''
+        return self.__seq
+
+    def changed_since(self, seq: int = 0, data_type: str = None, device_id: str = None) -> Tuple[List[ClientMsg], int]:
+        '''
+        Returns the messages received after the message with the sequence number `seq` - each received
+        message gets a sequence number (the field `seq`), increasing in the order of reception.
+        Pass the returned cursor to the next call to get only the new messages.
+
+        Only the latest `change_log_size` messages are kept, older ones are not returned.
+
+        Optional
+        --------
+        seq : int
+            the cursor of the previous call, 0 for all kept messages
+
+        data_type : str
+            only messages of this type
+
+        device_id : str
+            default is the device_id of this connector, '__ALL_DEVICES__' for the messages of all devices
+
+        Return
+        ------
+        Tuple[List[ClientMsg], int]
+            the new messages in the order of reception and the new cursor
+
+        Example
+        -------
+        ```py
+        cursor = 0
+        while True:
+            msgs, cursor = device.changed_since(cursor, 'acceleration')
+            export(msgs)
+            device.sleep(1)
+        ```
+        '''
+        if device_id is None:
+            device_id = self.device_id
+        # the log is only appended to (and replaced when trimmed), thus the first n messages do not change
+        log = self.__change_log
+        n = len(log)
+        if n == 0 or log[n - 1]['seq'] <= seq:
+            return [], max(seq, self.__seq if n == 0 else log[n - 1]['seq'])
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if log[mid]['seq'] <= seq:
+                lo = mid + 1
+            else:
+                hi = mid
+        msgs = [
+            msg for msg in log[lo:n]
+            if (data_type is None or msg['type'] == data_type) and (device_id == '__ALL_DEVICES__' or msg['device_id'] == device_id)
+        ]
+        return msgs, log[n - 1]['seq']
+
     def pointer_data(self, device_id: str = '__ALL_DEVICES__') -> Union[List[ColorPointer], List[GridPointer]]:
         return self.all_data('pointer', device_id=device_id)
 
@@ -810,10 +1642,11 @@ class Connector:
         '''
         if device_id is None:
             device_id = self.device_id
+        # the published data frames are never changed, only the returned message is copied
         if device_id == '__ALL_DEVICES__':
-            raw = deepcopy(self.__latest_data)
+            raw = self.__latest_data
         else:
-            raw = deepcopy(self.__current_data_frame[device_id]) if (device_id in self.__current_data_frame) else None
+            raw = self.__current_data_frame.get(device_id)
 
         if raw is None:
             if data_type is None:
@@ -821,11 +1654,10 @@ class Connector:
             return default(data_type)
 
         if data_type is None:
-            srted = sorted(raw.values(), reverse=True, key=lambda x: x['time_stamp'])
-            return srted[0]
+            return deepcopy(max(raw.values(), key=lambda x: x['time_stamp']))
 
         if data_type in raw:
-            return raw[data_type]
+            return deepcopy(raw[data_type])
         return default(data_type)
 
     def latest_pointer(self, device_id: str = '__ALL_DEVICES__') -> Union[ColorPointer, GridPointer, None]:
@@ -889,11 +1721,14 @@ class Connector:
         </svg>
         ```
         '''
-        pkg = {'name': name, 'image': raw_svg, 'type': 'svg'}
+        digest = content_hash(raw_svg)
+        pkg = asset_pkg('image', name, 'svg', digest, raw_svg)
+        self.__uploaded_assets['image'][name] = digest
         playground_config = {'images': [pkg]}
-        if 'images' not in self.__playground_config:
-            self.__playground_config['images'] = []
-        self.__playground_config['images'].append(pkg)
+        with self.__lazy_lock:
+            if 'images' not in self.__playground_config:
+                self.__playground_config['images'] = []
+            self.__playground_config['images'].append(self.__asset_ref(pkg))
         config = {
             'type': DataType.PLAYGROUND_CONFIG,
             'config': playground_config
@@ -911,7 +1746,11 @@ class Connector:
                              images: Optional[Union[Path, str]] = None,
                              audio_tracks: Optional[Union[Path, str]] = None,
                              image: Optional[str] = None,
-                             **delivery_opts):
+                             optimize_images: Union[bool, ImagePipeline] = False,
+                             on_upload_progress: Optional[Callable[[DictX], None]] = None,
+                             lazy_images: bool = False,
+                             prefetch: bool = False,
+                             **delivery_opts) -> Optional[AssetUploader]:
         '''
         Optional
         --------
@@ -937,64 +1776,87 @@ class Connector:
             How many units should the playground be shifted vertically? Same as the negative value of origin_y
             Only one of both should be set
 
+        images : Path | str
+            directory containing the images for the playground. Relative directories are searched within
+            `asset_search_paths` (by default the script directory and the working directory). Images already uploaded within this connection
+            are not sent again when their content did not change.
+
+        audio_tracks : Path | str
+            directory containing the audio tracks for the playground. Unchanged tracks are not sent again.
+
+        optimize_images : bool | ImagePipeline
+            downscale images to the size of the playground, convert bmp's to png and strip metadata
+            before uploading (requires `Pillow`). Pass an `ImagePipeline` to customize the processing.
+
+        lazy_images : bool
+            only register the images - an image is uploaded the first time a sprite (or the playground `image`)
+            references it. Reduces the startup time when many images are used later or never.
+
+        prefetch : bool
+            when `lazy_images` is set, upload the registered images one by one in the background
+
+        on_upload_progress : Callable[[DictX], None]
+            assets larger than `asset_stream_threshold` bytes are streamed in chunks of `asset_chunk_size` bytes
+            in the background. Called after each chunk with `{'name', 'kind', 'hash', 'sent', 'size', 'done'}`.
+
+        Return
+        ------
+        AssetUploader, None
+            the background upload of the streamed assets (if any), call `join()` on it to wait for completion
+
         '''
         if origin_x is not None:
             shift_x = -origin_x
         if origin_y is not None:
             shift_y = -origin_y
+        streamed: List[AssetUpload] = []
         raw_images = []
         if images is not None:
-            images = Path(images)
-            if images.is_absolute():
-                pass
-            else:
-                rpath = Path(sys.argv[0]).parent.rglob(str(images))
-                try:
-                    while True:
-                        new_p = next(rpath)
-                        if new_p.is_dir():
-                            images = new_p
-                            break
-                except:
-                    pass
-
+            images = resolve_asset_dir(images, self.asset_search_paths)
             if not images.is_dir():
                 raise Exception(f'Image path {images} not found')
-            for img in images.iterdir():
-                if img.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-                    raw = img.read_bytes()
-                    name = img.stem
-                    file_type = img.suffix.lower()
-                    raw_images.append({'name': name, 'image': raw, 'type': file_type[1:]})
-                elif img.suffix.lower() in ['.svg']:
-                    raw = img.read_text('utf-8')
-                    name = img.stem
-                    file_type = img.suffix.lower()
-                    raw_images.append({'name': name, 'image': raw, 'type': file_type[1:]})
+            pipeline = None
+            if optimize_images:
+                pipeline = optimize_images if isinstance(optimize_images, ImagePipeline) else ImagePipeline()
+                pipeline = pipeline.for_playground(
+                    width if width is not None else self.__playground_config['width'],
+                    height if height is not None else self.__playground_config['height']
+                )
+            files = asset_files(images, 'image')
+            if lazy_images:
+                with self.__lazy_lock:
+                    for file in files:
+                        self.__lazy_images[file.stem] = (file, pipeline)
+                files = []
+                if image is not None:
+                    self.__upload_lazy_images([image], **delivery_opts)
+                if prefetch:
+                    self.__prefetch_lazy_images(**delivery_opts)
+            raw_images, uploads = load_assets(
+                files,
+                'image',
+                self.asset_cache,
+                self.__uploaded_assets['image'],
+                pipeline=pipeline,
+                workers=self.asset_workers,
+                stream_threshold=self.asset_stream_threshold
+            )
+            streamed.extend(uploads)
         raw_tracks = []
         if audio_tracks is not None:
-            audio_tracks = Path(audio_tracks)
-            if audio_tracks.is_absolute():
-                pass
-            else:
-                rpath = Path(sys.argv[0]).parent.rglob(str(audio_tracks))
-                try:
-                    while True:
-                        new_p = next(rpath)
-                        if new_p.is_dir():
-                            audio_tracks = new_p
-                            break
-                except:
-                    pass
-
-                if not audio_tracks.is_dir():
-                    raise Exception(f'audio_tracks path {audio_tracks} not found')
-                for track in audio_tracks.iterdir():
-                    if track.suffix in ['.mp3', '.wav', '.ogg']:
-                        raw = track.read_bytes()
-                        name = track.stem
-                        file_type = track.suffix
-                        raw_tracks.append({'name': name, 'audio': raw, 'type': file_type[1:]})
+            audio_tracks = resolve_asset_dir(audio_tracks, self.asset_search_paths)
+            if not audio_tracks.is_dir():
+                raise Exception(f'audio_tracks path {audio_tracks} not found')
+            raw_tracks, uploads = load_assets(
+                asset_files(audio_tracks, 'audio'),
+                'audio',
+                self.asset_cache,
+                self.__uploaded_assets['audio'],
+                workers=self.asset_workers,
+                stream_threshold=self.asset_stream_threshold
+            )
+            streamed.extend(uploads)
+        self.asset_cache.flush()
 
         playground_config = without_none({
                 'width': width,
@@ -1006,16 +1868,115 @@ class Connector:
                 'images': raw_images,
                 'audio_tracks': raw_tracks
             })
+        if len(raw_images) == 0:
+            # no eagerly loaded images: the images on the phone (e.g. uploaded lazily) are kept
+            del playground_config['images']
         config = {
             'type': DataType.PLAYGROUND_CONFIG,
             'config': playground_config
         }
-        if 'images' in self.__playground_config and len(raw_images) > 0:
-            playground_config['images'] = [*raw_images, *self.__playground_config['images']]
-        if 'audio_tracks' in self.__playground_config and len(raw_tracks) > 0:
-            playground_config['audio_tracks'] = [*raw_tracks, *self.__playground_config['audio_tracks']]
-        self.__playground_config.update(playground_config)
-        self.emit(SocketEvents.NEW_DATA, config, **delivery_opts)
+        # the lazy uploads add their references concurrently
+        with self.__lazy_lock:
+            if 'images' in self.__playground_config and 'images' in playground_config:
+                playground_config['images'] = self.__merge_asset_refs(raw_images, self.__playground_config['images'])
+            if 'audio_tracks' in self.__playground_config and len(raw_tracks) > 0:
+                playground_config['audio_tracks'] = self.__merge_asset_refs(
+                    raw_tracks, self.__playground_config['audio_tracks'])
+            self.emit(SocketEvents.NEW_DATA, config, **delivery_opts)
+            # keep only references locally, the payloads are not needed anymore
+            refs = {
+                kind: [self.__asset_ref(pkg) for pkg in playground_config[kind]]
+                for kind in ['images', 'audio_tracks'] if kind in playground_config
+            }
+            self.__playground_config.update({**playground_config, **refs})
+        if width is not None or height is not None:
+            self.__rebuild_spatial()
+        if len(streamed) > 0:
+            return self.__stream_assets(streamed, on_upload_progress, **delivery_opts)
+
+    def __stream_assets(self, uploads: List[AssetUpload], on_progress: Optional[Callable[[DictX], None]] = None, **delivery_opts) -> AssetUploader:
+        def on_cancel(upload: AssetUpload):
+            if self.__uploaded_assets[upload.kind].get(upload.name) == upload.hash:
+                del self.__uploaded_assets[upload.kind][upload.name]
+
+        uploader = AssetUploader(
+            lambda chunk: self.emit(SocketEvents.NEW_DATA, chunk, **delivery_opts),
+            uploads,
+            chunk_size=self.asset_chunk_size,
+            on_progress=on_progress,
+            on_cancel=on_cancel
+        )
+        self.__asset_uploaders = [u for u in self.__asset_uploaders if u.is_alive()]
+        self.__asset_uploaders.append(uploader)
+        uploader.start()
+        return uploader
+
+    def __upload_lazy_images(self, names: List[Optional[str]], **delivery_opts):
+        '''
+        uploads the lazily registered images of `names` not yet uploaded within this connection
+        '''
+        if len(self.__lazy_images) == 0:
+            return
+        with self.__lazy_lock:
+            uploaded = self.__uploaded_assets['image']
+            pending = [name for name in set(names) if name in self.__lazy_images and name not in uploaded]
+            if len(pending) == 0:
+                return
+            pkgs: List[DictX] = []
+            streamed: List[AssetUpload] = []
+            for name in pending:
+                file, pipeline = self.__lazy_images[name]
+                loaded, uploads = load_assets(
+                    [file],
+                    'image',
+                    self.asset_cache,
+                    uploaded,
+                    pipeline=pipeline,
+                    stream_threshold=self.asset_stream_threshold
+                )
+                pkgs.extend(loaded)
+                streamed.extend(uploads)
+            self.asset_cache.flush()
+            self.emit(
+                SocketEvents.NEW_DATA,
+                {
+                    'type': DataType.PLAYGROUND_CONFIG,
+                    'config': {'images': pkgs}
+                },
+                **delivery_opts
+            )
+            if 'images' not in self.__playground_config:
+                self.__playground_config['images'] = []
+            self.__playground_config['images'].extend([self.__asset_ref(pkg) for pkg in pkgs])
+            if len(streamed) > 0:
+                self.__stream_assets(streamed, **delivery_opts)
+
+    def __prefetch_lazy_images(self, **delivery_opts):
+        def prefetch():
+            for name in list(self.__lazy_images.keys()):
+                if not self.sio.connected:
+                    return
+                self.__upload_lazy_images([name], **delivery_opts)
+
+        threading.Thread(target=prefetch, daemon=True).start()
+
+    def wait_for_uploads(self, timeout: Optional[float] = None):
+        '''
+        blocks until all streamed assets are uploaded
+        '''
+        for uploader in self.__asset_uploaders:
+            uploader.join(timeout)
+
+    @staticmethod
+    def __asset_ref(pkg: dict) -> DictX:
+        return DictX({k: v for k, v in pkg.items() if k not in ['image', 'audio']})
+
+    def __merge_asset_refs(self, new_pkgs: List[dict], previous: List[dict]) -> List[dict]:
+        '''
+        previously uploaded assets are kept in the config, but only referenced by their hash
+        '''
+        names = set(pkg['name'] for pkg in new_pkgs)
+        return [*new_pkgs, *[self.__asset_ref(pkg) for pkg in previous if pkg['name'] not in names]]
 
     @contextmanager
     def add_sprites(self, **delivery_opts):
@@ -1162,12 +2123,10 @@ class Connector:
             sprites = []
             raise
         else:
+            self.__upload_lazy_images([s['image'] for s in sprites if 'image' in s], **delivery_opts)
             for s in sprites:
-                to_update = first(lambda spr: spr['id'] == s['id'], self.__sprites)
-                if to_update is not None:
-                    to_update.update(s)
-                else:
-                    self.__sprites.append(DictX(s))
+                self.__register_sprite(s)
+                self.__track_motion(s)
             self.emit(
                 SocketEvents.NEW_DATA,
                 {
@@ -2048,11 +3007,10 @@ class Connector:
             'z_index': z_index
         }
         sprite = without_none(sprite)
-        to_update = first(lambda s: s['id'] == sprite['id'], self.__sprites)
-        if to_update is not None:
-            to_update.update(sprite)
-        else:
-            self.__sprites.append(DictX(sprite))
+        if image is not None:
+            self.__upload_lazy_images([image], **delivery_opts)
+        self.__register_sprite(sprite)
+        self.__track_motion(sprite)
         self.emit(
             SocketEvents.NEW_DATA,
             {
@@ -2067,22 +3025,25 @@ class Connector:
         '''Cleans the playground and reconfigures the playground to
         the default playground config. Images and soundtracks have to be uploaded again
         '''
-        self.__sprites = []
+        self.__reset_sprites()
         self.__lines = []
         self.__playground_config = deepcopy(DEFAULT_PLAYGROUND_CONFIG)
+        self.__rebuild_spatial()
+        self.__uploaded_assets = {'image': {}, 'audio': {}}
         self.emit(
             SocketEvents.NEW_DATA,
             {
                 'type': DataType.CLEAR_PLAYGROUND
             }
         )
-        self.sleep(0.2)
+        # real time, the phone needs it to clear the playground
+        self.sio.sleep(0.2)
 
     def clean_playground(self, **delivery_opts):
         '''Cleans the playground without reconfiguring the playground.
         Images and soundtracks can be reused and dont need to be uploaded again.
         '''
-        self.__sprites = []
+        self.__reset_sprites()
         self.__lines = []
         self.emit(
             SocketEvents.NEW_DATA,
@@ -2092,9 +3053,7 @@ class Connector:
         )
 
     def remove_sprite(self, sprite_id: str, **delivery_opts):
-        to_remove = first(lambda s: s.id == sprite_id, self.__sprites)
-        if to_remove is not None:
-            self.__sprites.remove(to_remove)
+        self.__unregister_sprite(sprite_id)
 
         self.emit(
             SocketEvents.NEW_DATA,
@@ -2648,7 +3607,8 @@ class Connector:
         ------
         bool wheter the assignment was succesfull or not.
         '''
-        ts = time_s()
+        ts = time_s(self.clock)
+        deadline = time.monotonic() + max_wait
         self.__info_messages.clear()
         self.emit(
             SocketEvents.SET_NEW_DEVICE_NR,
@@ -2659,18 +3619,16 @@ class Connector:
                 'current_device_nr': current_device_nr
             }
         )
-        result_msg = None
-        while result_msg is None and (time_s() - ts) < max_wait:
-            result_msg = first(lambda m: m.action['time_stamp'] == ts, self.__info_messages)
-
-            if result_msg is None:
-                self.sleep(0.1)
+        result_msg = self.__wait_for_reply(
+            lambda: first(lambda m: m.action['time_stamp'] == ts, self.__info_messages),
+            max_wait
+        )
 
         if result_msg is not None and result_msg['message'] == 'Success':
             return True
 
-        time_left = max_wait - (time_s() - ts)
-        if time_left > 0 and 'should_retry' in cast(dict, result_msg) and result_msg['should_retry']:
+        time_left = deadline - time.monotonic()
+        if time_left > 0 and result_msg is not None and result_msg.get('should_retry'):
             return self.set_device_nr(new_device_nr, device_id=device_id, current_device_nr=current_device_nr, max_wait=time_left)
 
         return False
@@ -2679,25 +3637,53 @@ class Connector:
         '''
         removes all gathered data
         '''
-        self.data = DictX({})
+        with self.__store.lock:
+            self.data = DictX({})
+            self.__store.invalidate()
 
     def sleep(self, seconds: float = 0) -> None:
         '''
         Sleep for the requested amount of time (in seconds) using the appropriate async model.
 
         This is a utility function that applications can use to put a task to sleep without having to worry about using the correct call for the selected async mode.
+
+        With a `VirtualClock` (see `clock`), the virtual time is advanced instead.
         '''
-        self.sio.sleep(seconds)
+        clock = self.clock
+        if clock.virtual:
+            clock.sleep(seconds)
+        else:
+            self.sio.sleep(seconds)
 
     def __distribute_dataframe(
         self,
         to: SubscriptionCallbackSignature = None,
-        job: ThreadJob = None
+        job: ThreadJob = None,
+        changes: Optional[dict] = None
     ):
+        '''
+        changes: the state of an `on_change` subscription - the callback is only called when a field
+            changed since the last call and the changed fields are passed in `changed`
+        '''
         clbk = to if to is not None else self.__on_notify_subscribers
         if clbk is None:
             return
 
+        changed = None
+        if changes is not None:
+            # the published frames are replaced on each change, thus comparing the identities suffices
+            frame = self.__current_data_frame.get(self.__device_id)
+            last = changes.get('frame')
+            if frame is last:
+                return
+            changes['frame'] = frame
+            changed = [
+                field for field in SUBSCRIPTION_FIELDS
+                if last is None or frame is None or frame.get(field) is not last.get(field)
+            ]
+            if len(changed) == 0:
+                return
+
         arg_count = len(signature(clbk).parameters)
         clbk = cast(Callable, clbk)
 
@@ -2712,16 +3698,18 @@ class Connector:
             'grid_pointer': self.latest_grid_pointer(device_id=self.__device_id) or default('grid_pointer'),
             'job': job
         })
+        if changed is not None:
+            data['changed'] = changed
         if arg_count == 1:
             clbk(data)
         elif arg_count == 2:
             clbk(data, self)
 
-    def animate(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, iteration_count: int = float('inf')) -> Union[ThreadJob, CancleSubscription]:
-        return self.subscribe_async(callback=callback, interval=interval, iteration_count=iteration_count)
+    def animate(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, iteration_count: int = float('inf'), on_change: bool = False) -> Union[ThreadJob, CancleSubscription]:
+        return self.subscribe_async(callback=callback, interval=interval, iteration_count=iteration_count, on_change=on_change)
 
-    def subscribe_async(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, iteration_count: int = float('inf')) -> Union[ThreadJob, CancleSubscription]:
-        return self.subscribe(callback=callback, interval=interval, blocking=False, iteration_count=iteration_count)
+    def subscribe_async(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, iteration_count: int = float('inf'), on_change: bool = False) -> Union[ThreadJob, CancleSubscription]:
+        return self.subscribe(callback=callback, interval=interval, blocking=False, iteration_count=iteration_count, on_change=on_change)
 
     def set_update_interval(self, interval: float):
         return self.subscribe(interval=interval, blocking=True)
@@ -2735,46 +3723,95 @@ class Connector:
 
     @ overload
     def subscribe(self, callback: SubscriptionCallbackSignature = None,
-                  interval: float = 0.05, blocking=True, iteration_count: int = float('inf')) -> Union[ThreadJob, CancleSubscription]:
+                  interval: float = 0.05, blocking=True, iteration_count: int = float('inf'), on_change: bool = False) -> Union[ThreadJob, CancleSubscription]:
         ...
 
     @ overload
-    def subscribe(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, blocking=False, iteration_count: int = float('inf')) -> None:
+    def subscribe(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, blocking=False, iteration_count: int = float('inf'), on_change: bool = False) -> None:
         ...
 
-    def subscribe(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, blocking: bool = True, iteration_count: int = float('inf')) -> Union[None, Union[ThreadJob, CancleSubscription]]:
+    def subscribe(self, callback: SubscriptionCallbackSignature = None, interval: float = 0.05, blocking: bool = True, iteration_count: int = float('inf'), on_change: bool = False) -> Union[None, Union[ThreadJob, CancleSubscription]]:
         '''
         blocked : bool wheter the main thread gets blocked or not.
 
         iteration_count : int
             how often the callback should be called (it is called at least once).
             Has only effect on async calls
+
+        on_change : bool
+            call the callback only when new data (key, acceleration, gyro or pointer) of this device was
+            received since the last call - the data frame contains the names of the changed fields in `changed`.
+            Idle ticks cost (almost) nothing.
+
+        Example
+        -------
+        ```py
+        def on_update(data: DataFrame):
+            if 'key' in data.changed:
+                print(data.key)
+
+        device.subscribe(on_update, interval=0.05, on_change=True)
+        ```
         '''
+        changes = {} if on_change else None
         if blocking:
             self.__on_notify_subscribers = cast(Callable, callback)
-            self.__main_thread_blocked = True
+            with self.__blocked_lock:
+                self.__blocked_data_msgs = self.__new_blocked_queue()
+                self.__main_thread_blocked = True
             self.__subscription_job = CancleSubscription()
-            while self.__subscription_job.is_running:
-                t0 = time_s()
-                self.__distribute_dataframe()
-                data = deepcopy(self.__blocked_data_msgs)
-                self.__blocked_data_msgs.clear()
+            while self.__subscription_job is not None and self.__subscription_job.is_running:
+                t0 = time_s(self.clock)
+                self.__distribute_dataframe(changes=changes)
+                # swap the queues, the received messages are handed over without copying them
+                with self.__blocked_lock:
+                    data = self.__blocked_data_msgs
+                    self.__blocked_data_msgs = self.__new_blocked_queue()
                 for d in data:
                     self.__distribute_new_data_callback(d)
-                td = time_s() - t0
+                td = time_s(self.clock) - t0
                 if td < interval:
                     self.sleep(interval - td)
-            self.__main_thread_blocked = False
+            with self.__blocked_lock:
+                self.__main_thread_blocked = False
+                self.__blocked_data_msgs = deque()
         else:
             thread_job = ThreadJob(
-                lambda job: self.__distribute_dataframe(to=callback, job=job),
+                lambda job: self.__distribute_dataframe(to=callback, job=job, changes=changes),
                 interval,
-                iterations=iteration_count
+                iterations=iteration_count,
+                clock=self.clock
             )
             self.__async_subscription_jobs.append(thread_job)
             thread_job.start()
             return thread_job
 
+    def __new_blocked_queue(self) -> Deque[DataMsg]:
+        if self.blocked_queue_size is not None and self.blocked_drop_policy == 'oldest':
+            # a full deque drops its oldest item when appending
+            return deque(maxlen=max(self.blocked_queue_size, 1))
+        return deque()
+
+    def __queue_blocked(self, data: DataMsg) -> bool:
+        '''
+        queues the message for the blocked main thread
+
+        Return
+        ------
+        bool
+            False when the main thread is not blocked
+        '''
+        with self.__blocked_lock:
+            if not self.__main_thread_blocked:
+                return False
+            msgs = self.__blocked_data_msgs
+            if self.blocked_queue_size is not None and len(msgs) >= self.blocked_queue_size:
+                self.blocked_dropped += 1
+                if self.blocked_drop_policy == 'newest':
+                    return True
+            msgs.append(data)
+            return True
+
     def cancel_subscription(self):
         if self.__subscription_job is not None:
             self.__subscription_job.cancel()
@@ -2816,10 +3853,20 @@ class Connector:
         if not self.sio.connected:
             return
         self.stop_sound()
+        for uploader in self.__asset_uploaders:
+            uploader.cancel()
         self.cancel_async_subscriptions()
         self.cancel_subscription()
-        self.sleep(0.2)
+        self.__waiters.cancel()
+        for stream in self.__streams:
+            stream.close()
+        # real time, the server needs it to deliver the last messages
+        self.sio.sleep(0.2)
         self.sio.disconnect()
+        if self.__recorder is not None:
+            self.__recorder.stop()
+            self.__recorder = None
+        self.stop_callback_executor()
 
     def join_room(self, device_id: str):
         self.emit(SocketEvents.JOIN_ROOM, DictX({'room': device_id}))
@@ -2827,19 +3874,174 @@ class Connector:
     def leave_room(self, device_id: str):
         self.emit(SocketEvents.LEAVE_ROOM, DictX({'room': device_id}))
 
-    def start_recording(self):
-        self.clean_data()
-        self.__record_data = True
+    def use_callback_executor(self,
+                              workers: int = DEFAULT_WORKERS,
+                              queue_size: int = DEFAULT_QUEUE_SIZE,
+                              drop_when_full: bool = False) -> CallbackExecutor:
+        '''
+        runs the `on_*` callbacks on a pool of worker threads instead of the socket thread, thus a slow
+        callback (e.g. plotting) does not delay the reception of other messages.
+        The callbacks of an event are called in the order of the messages, one after another - the
+        callbacks of different events may run in parallel.
+
+        Optional
+        --------
+        workers : int
+            the number of worker threads
+
+        queue_size : int
+            the maximal number of pending messages per event
+
+        drop_when_full : bool
+            drop the oldest pending message of an event when its queue is full, instead of
+            delaying the reception until the callbacks caught up
+
+        Example
+        -------
+        ```py
+        device.use_callback_executor(workers=2, queue_size=100, drop_when_full=True)
+        device.on('acceleration', plot)
+        ```
+        '''
+        self.stop_callback_executor()
+        self.__executor = CallbackExecutor(workers=workers, queue_size=queue_size, drop_when_full=drop_when_full)
+        return self.__executor
+
+    def stop_callback_executor(self, wait: bool = True, timeout: Optional[float] = None):
+        '''
+        the callbacks are called on the socket thread again
+
+        Optional
+        --------
+        wait : bool
+            wheter to call the pending callbacks before (default) or to discard them
+
+        timeout : float
+            the maximal time to wait for the pending callbacks
+        '''
+        executor = self.__executor
+        if executor is None:
+            return
+        self.__executor = None
+        executor.shutdown(wait=wait, timeout=timeout)
+
+    @property
+    def callback_executor(self) -> Optional[CallbackExecutor]:
+        return self.__executor
+
+    def start_recording(self,
+                        file: Optional[Union[Path, str]] = None,
+                        outbound: bool = False,
+                        buffer_size: int = DEFAULT_BUFFER_SIZE,
+                        drop_when_full: bool = False) -> Optional[SessionRecorder]:
+        '''
+        Without a file, all received data is kept in memory (`data`) until `stop_recording` is called.
+
+        With a file, every received message is streamed to it by a background writer instead, while the
+        in-memory data stays limited as usual - suited to record sessions of several hours.
+
+        Optional
+        --------
+        file : Path | str
+            the recording is appended to this file: `*.jsonl.gz` for gzip compressed json lines,
+            any other ending for a compact framed binary format. Read it with `read_records(file)`.
+
+        outbound : bool
+            record the sent messages too
+
+        buffer_size : int
+            maximal number of messages waiting to be written
+
+        drop_when_full : bool
+            drop messages when the writer can not keep up instead of waiting for it
+
+        Return
+        ------
+        SessionRecorder, None
+            the recorder when a file is given
+        '''
+        if file is None:
+            self.clean_data()
+            self.__record_data = True
+            return
+        if self.__recorder is not None:
+            self.__recorder.stop()
+        self.__recorder = SessionRecorder(
+            file,
+            outbound=outbound,
+            buffer_size=buffer_size,
+            drop_when_full=drop_when_full
+        )
+        self.__recorder.start()
+        return self.__recorder
 
     def stop_recording(self):
         self.__record_data = False
+        if self.__recorder is not None:
+            self.__recorder.stop()
+            self.__recorder = None
 
     @property
     def is_recording(self):
-        return self.__record_data
+        return self.__record_data or self.__recorder is not None
+
+    def replay(self,
+               source: Union[Path, str, ReplaySource],
+               speed: Optional[float] = 1,
+               blocking: bool = True,
+               retime: bool = False) -> ReplaySource:
+        '''
+        feeds a recorded session (see `start_recording(file)`) through the ingest path, as if the messages
+        were received from the server: data is gathered and all callbacks are called.
+
+        Parameters
+        ----------
+        source : Path | str | ReplaySource
+            the recorded file
+
+        Optional
+        --------
+        speed : float
+            1 for the original timing, 2 for twice as fast, `None` for as fast as possible
+
+        blocking : bool
+            wheter to wait until the replay finished, otherwise it is replayed in a background thread
+
+        retime : bool
+            shift the time stamps of the messages to the time of the replay
+
+        Return
+        ------
+        ReplaySource
+            call `stop()` on it to stop a background replay
+        '''
+        if isinstance(source, ReplaySource):
+            replay = source
+        else:
+            replay = ReplaySource(source, speed=speed, retime=retime, clock=self.clock)
+        replay.deliver = self.__replayed
+        if blocking:
+            replay.play()
+        else:
+            replay.start()
+        return replay
+
+    def __replayed(self, event: str, data: dict):
+        handler = self.__handlers.get(event)
+        if handler is not None:
+            handler(data)
+
+    def __inbound(self, event: str, handler: Callable[[dict], None]) -> Callable[[dict], None]:
+        def on_message(data: dict):
+            if self.__recorder is not None:
+                self.__recorder.record(event, data)
+            handler(data)
+        return on_message
 
     def __on_connect(self):
         logging.info('SocketIO connected')
+        # assets are tracked per connection
+        self.__uploaded_assets = {'image': {}, 'audio': {}}
 
     def __on_disconnect(self):
         logging.info('SocketIO disconnected')
@@ -2848,11 +4050,22 @@ class Connector:
         self.emit(SocketEvents.NEW_DEVICE)
 
     def __callback(self, name, data):
-        callback = getattr(self, name)
-        callbacks = getattr(self, f'_{name}')
-        for clbk in [callback, *callbacks]:
-            if clbk is None:
-                continue
+        self.__waiters.notify(name[len('on_'):], data)
+        if hasattr(self, f'_{name}'):
+            callbacks = [getattr(self, name), *getattr(self, f'_{name}')]
+        else:
+            callbacks = list(self.__custom_events.get(name[len('on_'):], []))
+        # the default callbacks do nothing, no need to queue them
+        callbacks = [c for c in callbacks if c is not None and getattr(c, '__func__', c) is not noop]
+        if len(callbacks) == 0:
+            return
+        executor = self.__executor
+        if executor is not None and executor.submit(name, self.__run_callbacks, callbacks, data):
+            return
+        self.__run_callbacks(callbacks, data)
+
+    def __run_callbacks(self, callbacks: List[Callable], data):
+        for clbk in callbacks:
             try:
                 arg_count = len(signature(clbk).parameters)
                 if arg_count == 0:
@@ -2866,46 +4079,101 @@ class Connector:
                 pass
 
     def __update_current_data_frame(self, data: dict):
-        if data['device_id'] not in self.__current_data_frame:
-            self.__current_data_frame[data['device_id']] = default_data_frame()
+        # the frames are replaced, not changed - readers may hold the previous frame
+        frame = self.__current_data_frame.get(data['device_id'])
+        if frame is None:
+            frame = default_data_frame()
+        key = None
         if data['type'] in ['key', 'acceleration', 'gyro']:
-            self.__current_data_frame[data['device_id']][data['type']] = data
+            key = data['type']
         elif data['type'] == DataType.POINTER:
             contex = data['context']
-            tkey = f'{contex}_pointer'
-            self.__current_data_frame[data['device_id']][tkey] = data
+            key = f'{contex}_pointer'
+        elif data['type'] in self.__filters or data['type'] in self.__gestures:
+            key = data['type']
+        if key is not None:
+            frame = DictX({**frame, key: data})
+        self.__current_data_frame[data['device_id']] = frame
 
     def __update_latest_data(self, data: dict):
-        self.__latest_data[data['type']] = data
+        latest = DictX({**self.__latest_data, data['type']: data})
         if data['type'] == DataType.POINTER:
             contex = data['context']
             tkey = f'{contex}_pointer'
-            self.__latest_data[tkey] = data
+            latest[tkey] = data
+        self.__latest_data = latest
 
     def __on_new_data(self, data: dict):
         data = DictX(data)
         if 'device_id' not in data:
             return
 
-        if data['device_id'] not in self.data:
-            self.data[data['device_id']] = DictX({})
+        with self.__store.lock:
+            self.__seq += 1
+            data['seq'] = self.__seq
+            self.__change_log.append(cast(ClientMsg, data))
+            if len(self.__change_log) >= 2 * self.change_log_size:
+                # replaced (not changed) for the readers of changed_since, amortized O(1)
+                self.__change_log = self.__change_log[-self.change_log_size:]
+
+            if data['device_id'] not in self.data:
+                self.data[data['device_id']] = DictX({})
+
+            if data['type'] not in self.data[data['device_id']]:
+                self.data[data['device_id']][data['type']] = []
+                self.__store.invalidate('index')
+
+            # the history lists are only appended to, any other change replaces the list - thus the
+            # published snapshots (views on the first n messages) stay valid without copying
+            msgs = self.data[data['device_id']][data['type']]
+            if not self.__record_data and (len(msgs) >= data_threshold(data['type'])):
+                msgs = msgs[1:]
+            if len(msgs) > 0 and data.get('time_stamp', 0) < msgs[-1].get('time_stamp', 0):
+                # keep the history ordered by time for the binary searches of data_between
+                idx = bisect_time(msgs, data['time_stamp'], right=True)
+                msgs = [*msgs[:idx], cast(ClientMsg, data), *msgs[idx:]]
+            else:
+                msgs.append(cast(ClientMsg, data))
+            self.data[data['device_id']][data['type']] = msgs
+            self.__store.invalidate(('history', data['device_id'], data['type']))
 
-        if data['type'] not in self.data[data['device_id']]:
-            self.data[data['device_id']][data['type']] = []
+            self.__update_current_data_frame(data)
+            self.__update_latest_data(data)
+        self.__update_rolling(data)
 
-        data_len = len(self.data[data['device_id']][data['type']])
-        if not self.__record_data and (data_len >= data_threshold(data['type'])):
-            self.data[data['device_id']][data['type']].pop(0)
+        if not self.__queue_blocked(cast(DataMsg, data)):
+            self.__distribute_new_data_callback(cast(DataMsg, data))
 
-        self.data[data['device_id']][data['type']].append(cast(ClientMsg, data))
+        for stream in self.__streams:
+            if stream.accepts(data):
+                stream.put(data)
 
-        self.__update_current_data_frame(data)
-        self.__update_latest_data(data)
+        if len(self.__filters) > 0:
+            self.__feed_filters(data)
 
-        if self.__main_thread_blocked:
-            self.__blocked_data_msgs.append(cast(DataMsg, data))
-        else:
-            self.__distribute_new_data_callback(cast(DataMsg, data))
+        if len(self.__gestures) > 0:
+            self.__detect_gestures(data)
+
+    def __feed_filters(self, data: DictX):
+        for name, (stream_filter, batch_size) in list(self.__filters.items()):
+            if data['type'] not in stream_filter.sources:
+                continue
+            batch = self.__filter_batches.setdefault(name, [])
+            batch.append(data)
+            if len(batch) < batch_size:
+                continue
+            self.__filter_batches[name] = []
+            for msg in stream_filter.process(batch):
+                msg['type'] = name
+                self.__on_new_data(msg)
+
+    def __detect_gestures(self, data: DictX):
+        for detector in list(self.__gestures.values()):
+            if data['type'] not in detector.sources:
+                continue
+            gesture = detector.feed(data)
+            if gesture is not None:
+                self.__on_new_data(gesture)
 
     def __distribute_new_data_callback(self, data: DataMsg):
         if 'type' in data:
@@ -2929,69 +4197,58 @@ class Connector:
             elif data['type'] == DataType.POINTER:
                 self.__callback('on_pointer', data)
             elif data['type'] == DataType.INPUT_RESPONSE:
-                self.__responses.append(cast(InputResponseMsg, data))
+                with self.__store.lock:
+                    self.__responses.append(cast(InputResponseMsg, data))
+                    self.__store.invalidate('responses')
+                self.__notify_replies()
             elif data['type'] == DataType.ALERT_CONFIRM:
                 self.__alerts.append(cast(AlertConfirmMsg, data))
+                self.__notify_replies()
             elif data['type'] == DataType.SPRITE_OUT:
                 sprite = self.get_sprite(data['id'])
                 if sprite is not None:
-                    obj = deepcopy(sprite)
+                    obj = DictView(sprite)
                     data.update({
                         'sprite': obj,
                         'object': obj
                     })
                 self.__callback('on_sprite_out', data)
             elif data['type'] == DataType.SPRITE_REMOVED:
-                sprite = self.get_sprite(data['id'])
+                sprite = self.__unregister_sprite(data['id'])
                 if sprite is not None:
-                    obj = deepcopy(sprite)
+                    obj = DictView(sprite)
                     data.update({
                         'sprite': obj,
                         'object': obj
                     })
-                    self.__sprites.remove(sprite)
                 self.__callback('on_sprite_removed', data)
             elif data['type'] == DataType.AUTO_MOVEMENT_POS:
                 sprite = self.get_sprite(data['id'])
                 if sprite is not None:
-                    sprite['pos_x'] = data['x']
-                    sprite['pos_y'] = data['y']
-                    obj = deepcopy(sprite)
+                    self.__register_sprite({'id': data['id'], 'pos_x': data['x'], 'pos_y': data['y']})
+                    if data['id'] in self.__motions:
+                        self.__motions[data['id']].rebase(data['x'], data['y'], time_s(self.clock))
+                    obj = DictView(self.__sprites[data['id']])
                     data.update({
                         'sprite': obj,
                         'object': obj
                     })
                 self.__callback('on_auto_movement_pos', data)
             elif data['type'] == DataType.SPRITE_COLLISION:
-                if len(data['sprites']) == 2:
-                    try:
-                        s1 = self.get_sprite(data['sprites'][0]['id'])
-                        s2 = self.get_sprite(data['sprites'][1]['id'])
-                        # make sure the first sprite is a controlled sprite...
-                        if 'collision_detection' in s1 and not s1['collision_detection']:
-                            t = s2
-                            s1 = s2
-                            s2 = t
-                        if s1 is not None:
-                            raw = data['sprites'][0]
-                            data['sprites'][0] = deepcopy(s1)
-                            data['sprites'][0]['pos_x'] = raw['pos_x']
-                            data['sprites'][0]['pos_y'] = raw['pos_y']
-                            # update the position
-                        else:
-                            data['sprites'][0] = DictX(data['sprites'][0])
-
-                        if s2 is not None:
-                            raw = data['sprites'][1]
-                            data['sprites'][1] = deepcopy(s2)
-                            data['sprites'][1]['pos_x'] = raw['pos_x']
-                            data['sprites'][1]['pos_y'] = raw['pos_y']
-                        else:
-                            data['sprites'][1] = DictX(data['sprites'][1])
-                    except:
-                        data['sprites'] = list(map(lambda s: DictX(s), data['sprites']))
+                raw_sprites = data['sprites']
+                if len(raw_sprites) == 2:
+                    s1 = self.get_sprite(raw_sprites[0]['id'])
+                    s2 = self.get_sprite(raw_sprites[1]['id'])
+                    # make sure the first sprite is a controlled sprite...
+                    if s1 is not None and 'collision_detection' in s1 and not s1['collision_detection']:
+                        s1, s2 = s2, s1
+                        raw_sprites = [raw_sprites[1], raw_sprites[0]]
+                    data['sprites'] = [
+                        self.__sprite_view(s1, raw_sprites[0]),
+                        self.__sprite_view(s2, raw_sprites[1])
+                    ]
                 else:
-                    data['sprites'] = list(map(lambda s: DictX(s), data['sprites']))
+                    data['sprites'] = list(map(lambda s: DictX(s), raw_sprites))
                 # add alias
                 data['objects'] = data['sprites']
                 self.__callback('on_sprite_collision', data)
@@ -3003,7 +4260,7 @@ class Connector:
             elif data['type'] == DataType.BORDER_OVERLAP:
                 original = self.get_sprite(data['id'])
                 if original is not None:
-                    obj = deepcopy(original)
+                    obj = DictView(original)
                     data.update({'sprite': obj, 'object': obj})
                 self.__callback('on_border_overlap', data)
             elif data['type'] == DataType.SPRITE_CLICKED:
@@ -3012,28 +4269,47 @@ class Connector:
             elif data['type'] == DataType.PLAYGROUND_CONFIG:
                 self.__playground_config = deepcopy(DEFAULT_PLAYGROUND_CONFIG)
                 self.__playground_config.update(data['config'])
+                self.__rebuild_spatial()
+            elif data['type'] in self.__custom_events:
+                self.__callback(f'on_{data["type"]}', data)
 
         if 'broadcast' in data and data['broadcast'] and self.on_broadcast_data is not None:
             self.__callback('on_broadcast_data', data)
         self.__callback('on_data', data)
 
+    @staticmethod
+    def __sprite_view(sprite: Optional[Sprite], reported: dict) -> Union[DictView, DictX]:
+        '''
+        view on a registered sprite with the reported position overlayed
+        '''
+        if sprite is None:
+            return DictX(reported)
+        overlay = {k: reported[k] for k in ['pos_x', 'pos_y'] if k in reported}
+        return DictView(sprite, overlay)
+
     def __on_all_data(self, data: dict):
         if 'device_id' not in data:
             return
         xdata: dict[str, List[dict]] = data['all_data']
         for dtype in xdata:
-            xdata[dtype] = list(map(lambda msg: DictX(msg), xdata[dtype]))
+            # the history is kept ordered by time_stamp (for the binary searches of the time range queries)
+            xdata[dtype] = sorted(map(lambda msg: DictX(msg), xdata[dtype]), key=lambda msg: msg.get('time_stamp', 0))
 
         data['all_data'] = DictX(xdata)
-        self.data[data['device_id']] = data['all_data']
+        with self.__store.lock:
+            self.data[data['device_id']] = data['all_data']
+            self.__store.invalidate()
         if data['device_id'] == self.device_id:
             if DataType.SPRITE in data['all_data']:
                 if self.__initial_all_data_received:
-                    self.__sprites = list(map(lambda s: DictX(s), data['all_data'][DataType.SPRITE]))
+                    self.__reset_sprites()
+                    for s in data['all_data'][DataType.SPRITE]:
+                        if 'id' in s:
+                            self.__register_sprite(s)
                 else:
                     for s in data['all_data'][DataType.SPRITE]:
                         if 'id' in s and self.get_sprite(s['id']) is None:
-                            self.__sprites.append(DictX(s))
+                            self.__register_sprite(s)
 
         self.__initial_all_data_received = True
         self.__callback('on_all_data', data)
@@ -3071,6 +4347,7 @@ class Connector:
 
     def __on_information(self, data: dict):
         self.__info_messages.append(cast(InformationMsg, DictX(data)))
+        self.__notify_replies()
 
     def __on_device(self, device: dict):
         device = DictX(device)
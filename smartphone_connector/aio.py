@@ -0,0 +1,162 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Literal, Optional
+from .dictx import DictX
+
+AsyncStreamPolicy = Literal['drop_oldest', 'drop_newest']
+
+DEFAULT_ASYNC_STREAM_SIZE = 1000
+
+
+class AsyncMessageStream:
+    '''
+    Bridges received messages into an asyncio event loop: the receiving thread hands each message to the
+    loop with `loop.call_soon_threadsafe`, where it is queued in a bounded queue - thus the receiving
+    thread never waits for the loop and the loop is never blocked. Leaving the loop early (`break`, an
+    exception) closes the stream once the loop finalizes the iteration - or immediately with `aclose()`
+    or `async with`.
+
+    ```py
+    async for msg in device.aiter('key'):
+        ...
+    ```
+    '''
+
+    def __init__(self,
+                 data_type: Optional[str] = None,
+                 device_id: Optional[str] = None,
+                 maxsize: int = DEFAULT_ASYNC_STREAM_SIZE,
+                 policy: AsyncStreamPolicy = 'drop_oldest',
+                 predicate: Optional[Callable[[Any], bool]] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 on_close: Optional[Callable[['AsyncMessageStream'], None]] = None):
+        '''
+        Optional
+        --------
+        data_type : str
+            only messages of this type, by default all
+
+        device_id : str
+            only messages of this device, by default of all devices
+
+        maxsize : int
+            the maximal number of queued messages
+
+        policy : 'drop_oldest' | 'drop_newest'
+            which message is dropped when the queue is full (see `dropped`)
+
+        predicate : Callable[[Any], bool]
+            only messages fulfilling the predicate (evaluated in the receiving thread)
+
+        loop : asyncio.AbstractEventLoop
+            by default the running loop
+
+        on_close : Callable[[AsyncMessageStream], None]
+            called when the stream is closed
+        '''
+        if policy not in ['drop_oldest', 'drop_newest']:
+            raise ValueError(f'unknown stream policy "{policy}"')
+        self.data_type = data_type
+        self.device_id = device_id
+        self.maxsize = max(int(maxsize), 1)
+        self.policy = policy
+        self.predicate = predicate
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+        self.dropped = 0
+        self.__on_close = on_close
+        # only accessed within the loop
+        self.__queue: Deque[DictX] = deque()
+        self.__ready = asyncio.Event()
+        self.__closed = False
+
+    def accepts(self, msg: dict) -> bool:
+        return (self.data_type is None or msg.get('type') == self.data_type) and \
+            (self.device_id is None or msg.get('device_id') == self.device_id) and \
+            (self.predicate is None or self.predicate(msg))
+
+    def put(self, msg: Any):
+        '''
+        hands the message to the loop (called by the receiving thread)
+        '''
+        if self.__closed:
+            return
+        if self.loop.is_closed():
+            self.close()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.__put, msg)
+        except RuntimeError:
+            # the loop was closed meanwhile
+            self.close()
+
+    def __put(self, msg: Any):
+        if self.__closed:
+            return
+        if len(self.__queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == 'drop_newest':
+                return
+            self.__queue.popleft()
+        self.__queue.append(msg)
+        self.__ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[DictX]:
+        '''
+        the next message - None when the timeout expired or the stream is closed and empty
+        '''
+        deadline = None if timeout is None else self.loop.time() + timeout
+        while len(self.__queue) == 0:
+            if self.__closed:
+                return None
+            remaining = None if deadline is None else deadline - self.loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            self.__ready.clear()
+            try:
+                await asyncio.wait_for(self.__ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return self.__queue.popleft()
+
+    @property
+    def pending(self) -> int:
+        return len(self.__queue)
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def close(self):
+        '''
+        ends the iteration once the queued messages are consumed (thread safe)
+        '''
+        if self.__closed:
+            return
+        self.__closed = True
+        if not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.__ready.set)
+            except RuntimeError:
+                pass
+        if self.__on_close is not None:
+            self.__on_close(self)
+
+    async def aclose(self):
+        self.close()
+
+    async def __aiter__(self) -> AsyncIterator[DictX]:
+        try:
+            while True:
+                msg = await self.get()
+                if msg is None:
+                    return
+                yield msg
+        finally:
+            # an abandoned iteration must not keep receiving
+            self.close()
+
+    async def __aenter__(self) -> 'AsyncMessageStream':
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
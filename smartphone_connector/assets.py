@@ -0,0 +1,508 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from math import ceil
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union, cast
+from .dictx import DictX
+from .types import DataType, Number
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_SUFFIXES = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+SVG_SUFFIXES = ['.svg']
+AUDIO_SUFFIXES = ['.mp3', '.wav', '.ogg']
+
+AssetKind = Literal['image', 'audio']
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'smartphone_connector'
+DEFAULT_SEARCH_DEPTH = 3
+SKIPPED_DIRS = ['node_modules', '__pycache__', 'venv', 'site-packages']
+PARALLEL_READ_THRESHOLD = 4
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_STREAM_THRESHOLD = 1024 * 1024
+SCREEN_SIZE = 1920  # px along the longer side of the largest expected screen
+
+_resolved_dirs: Dict[Tuple[str, Tuple[str, ...], int], Path] = {}
+
+
+def content_hash(raw: Union[bytes, str]) -> str:
+    '''
+    returns the sha256 hex digest of an asset payload
+    '''
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+def asset_files(directory: Path, kind: AssetKind) -> List[Path]:
+    '''
+    returns all files of the given asset kind located directly in `directory`, sorted by name
+    '''
+    suffixes = [*IMAGE_SUFFIXES, *SVG_SUFFIXES] if kind == 'image' else AUDIO_SUFFIXES
+    return sorted(f for f in directory.iterdir() if f.suffix.lower() in suffixes)
+
+
+def default_search_paths() -> List[Path]:
+    '''
+    the directory of the running script and the current working directory
+    '''
+    paths = [Path(sys.argv[0]).parent.absolute(), Path.cwd()]
+    return [p for i, p in enumerate(paths) if p not in paths[:i]]
+
+
+def _find_dir(base: Path, directory: Path, max_depth: int) -> Optional[Path]:
+    '''
+    breadth first search for `directory` below `base`, descending at most `max_depth` levels.
+    Hidden directories and well known dependency folders are skipped.
+    '''
+    level = [base]
+    for _ in range(max_depth + 1):
+        next_level = []
+        for parent in level:
+            candidate = parent / directory
+            if candidate.is_dir():
+                return candidate
+            try:
+                next_level.extend(
+                    d for d in parent.iterdir()
+                    if d.is_dir() and not d.name.startswith('.') and d.name not in SKIPPED_DIRS
+                )
+            except OSError:
+                pass
+        level = next_level
+    return None
+
+
+def resolve_asset_dir(directory: Union[Path, str], search_paths: Optional[List[Union[Path, str]]] = None, max_depth: int = DEFAULT_SEARCH_DEPTH) -> Path:
+    '''
+    resolves a relative asset directory by searching the `search_paths` (by default the script directory
+    and the current working directory) in order, at most `max_depth` levels deep. The nearest match wins.
+    Results are memoized. Absolute paths and unresolvable directories are returned unchanged.
+    '''
+    directory = Path(directory)
+    if directory.is_absolute():
+        return directory
+    if search_paths is None:
+        search_paths = default_search_paths()
+    key = (str(directory), tuple(str(p) for p in search_paths), max_depth)
+    if key in _resolved_dirs and _resolved_dirs[key].is_dir():
+        return _resolved_dirs[key]
+    for base in search_paths:
+        found = _find_dir(Path(base), directory, max_depth)
+        if found is not None:
+            _resolved_dirs[key] = found
+            return found
+    return directory
+
+
+def read_asset(file: Path) -> Union[bytes, str]:
+    '''
+    reads the payload of an asset file - svg's are sent as text, everything else as raw bytes
+    '''
+    if file.suffix.lower() in SVG_SUFFIXES:
+        return file.read_text('utf-8')
+    return file.read_bytes()
+
+
+def asset_pkg(kind: AssetKind, name: str, file_type: str, digest: str, payload: Union[bytes, str, None] = None) -> DictX:
+    '''
+    builds the package sent within the `images` or `audio_tracks` list of a playground config.
+    When no payload is given, the package only references an already uploaded asset by its hash.
+    '''
+    pkg = DictX({'name': name, 'type': file_type, 'hash': digest})
+    if payload is not None:
+        pkg[kind] = payload
+    return pkg
+
+
+class AssetCache:
+    '''
+    On-disk cache remembering the content hash of asset files, keyed by their path, mtime and size.
+
+    Unchanged files can thus be recognized without reading them again. Preprocessed payloads
+    (e.g. recompressed images) are stored alongside, addressed by their content hash.
+
+    ```py
+    device.asset_cache = AssetCache('/tmp/my_cache')  # use another cache location
+    device.asset_cache = AssetCache(enabled=False)    # disable the on-disk cache
+    ```
+    '''
+
+    def __init__(self, directory: Optional[Union[Path, str]] = None, enabled: bool = True):
+        self.directory = Path(directory) if directory is not None else DEFAULT_CACHE_DIR
+        self.enabled = enabled
+        self.__index: Optional[Dict[str, Dict[str, dict]]] = None
+        self.__dirty = False
+
+    @property
+    def index_file(self) -> Path:
+        return self.directory / 'index.json'
+
+    @property
+    def payload_dir(self) -> Path:
+        return self.directory / 'payloads'
+
+    @property
+    def index(self) -> Dict[str, Dict[str, dict]]:
+        if self.__index is None:
+            self.__index = {'files': {}, 'processed': {}}
+            if self.enabled and self.index_file.is_file():
+                try:
+                    self.__index.update(json.loads(self.index_file.read_text('utf-8')))
+                except Exception as e:
+                    logging.warn(f'Could not read asset cache index: {e}')
+        return self.__index
+
+    @staticmethod
+    def __key(file: Path, variant: str) -> str:
+        return f'{file.resolve()}|{variant}'
+
+    @staticmethod
+    def __stat(file: Path) -> dict:
+        st = file.stat()
+        return {'mtime': st.st_mtime_ns, 'size': st.st_size}
+
+    def lookup(self, file: Path, variant: str = '') -> Optional[dict]:
+        '''
+        returns the cached entry `{'hash': str, 'type': str}` of `file` when the file is unchanged since
+        it was cached, otherwise None. No file content is read.
+
+        variant : str
+            distinguishes differently preprocessed payloads of the same file
+        '''
+        entry = self.index['files'].get(self.__key(file, variant))
+        if entry is None:
+            return None
+        stat = self.__stat(file)
+        if entry['mtime'] != stat['mtime'] or entry['size'] != stat['size']:
+            return None
+        return entry
+
+    def remember(self, file: Path, digest: str, file_type: str, variant: str = ''):
+        self.index['files'][self.__key(file, variant)] = {**self.__stat(file), 'hash': digest, 'type': file_type}
+        self.__dirty = True
+
+    def processed(self, source_digest: str, variant: str) -> Optional[dict]:
+        '''
+        returns the entry `{'hash': str, 'type': str}` of the payload produced by preprocessing
+        the content with `source_digest`, None when it was not processed yet
+        '''
+        return self.index['processed'].get(f'{source_digest}|{variant}')
+
+    def remember_processed(self, source_digest: str, variant: str, digest: str, file_type: str):
+        self.index['processed'][f'{source_digest}|{variant}'] = {'hash': digest, 'type': file_type}
+        self.__dirty = True
+
+    def read_payload(self, digest: str) -> Optional[bytes]:
+        '''
+        returns a previously stored preprocessed payload, None when it is not cached
+        '''
+        if not self.enabled:
+            return None
+        payload_file = self.payload_dir / digest
+        if payload_file.is_file():
+            return payload_file.read_bytes()
+        return None
+
+    def store_payload(self, digest: str, payload: bytes):
+        if not self.enabled:
+            return
+        try:
+            self.payload_dir.mkdir(parents=True, exist_ok=True)
+            (self.payload_dir / digest).write_bytes(payload)
+        except Exception as e:
+            logging.warn(f'Could not write asset payload to cache: {e}')
+
+    def flush(self):
+        '''
+        persists the index to disk (only when it changed)
+        '''
+        if not self.enabled or not self.__dirty:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.index), 'utf-8')
+            tmp.replace(self.index_file)
+            self.__dirty = False
+        except Exception as e:
+            logging.warn(f'Could not write asset cache index: {e}')
+
+
+class ImagePipeline:
+    '''
+    Optional preprocessing of raster images before they are uploaded (requires `Pillow`):
+
+    - images are downscaled to fit into `max_size` (by default derived from the playground dimensions,
+      see `for_playground`)
+    - bmp's are converted to `bmp_format` ('png' or 'webp')
+    - metadata (exif, icc profiles, text chunks) is stripped
+
+    svg's and gif's (possibly animated) are passed through unchanged.
+    '''
+    HANDLED_TYPES = ['jpg', 'jpeg', 'png', 'bmp', 'webp']
+
+    def __init__(self, max_size: Optional[Tuple[int, int]] = None, screen_size: int = SCREEN_SIZE, bmp_format: Literal['png', 'webp'] = 'png', quality: int = 85):
+        self.max_size = max_size
+        self.screen_size = screen_size
+        self.bmp_format = bmp_format
+        self.quality = quality
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    def for_playground(self, width: Number, height: Number) -> ImagePipeline:
+        '''
+        returns a pipeline limiting the image size to the pixels the playground occupies on a screen with
+        `screen_size` pixels along its longer side - an image is never displayed larger than the playground.
+        An explicitly set `max_size` is kept.
+        '''
+        if self.max_size is not None:
+            return self
+        scale = self.screen_size / max(width, height)
+        max_size = (max(1, ceil(width * scale)), max(1, ceil(height * scale)))
+        return ImagePipeline(max_size, self.screen_size, self.bmp_format, self.quality)
+
+    @property
+    def variant(self) -> str:
+        size = 'x'.join(map(str, self.max_size)) if self.max_size is not None else 'none'
+        return f'img:{size}:{self.bmp_format}:{self.quality}'
+
+    def handles(self, file_type: str) -> bool:
+        return file_type in self.HANDLED_TYPES
+
+    def process(self, raw: bytes, file_type: str) -> Tuple[bytes, str]:
+        '''
+        returns the processed payload and its file type. The original is returned when processing fails
+        or does not reduce the payload size.
+        '''
+        try:
+            img = Image.open(BytesIO(raw))
+            img.load()
+        except Exception as e:
+            logging.warn(f'Could not process image: {e}')
+            return raw, file_type
+        resized = False
+        if self.max_size is not None and (img.width > self.max_size[0] or img.height > self.max_size[1]):
+            img.thumbnail(self.max_size, Image.LANCZOS)
+            resized = True
+
+        out_type = self.bmp_format if file_type == 'bmp' else file_type
+        out = BytesIO()
+        if out_type in ['jpg', 'jpeg']:
+            if img.mode not in ['RGB', 'L']:
+                img = img.convert('RGB')
+            img.save(out, format='JPEG', quality=self.quality, optimize=True)
+        elif out_type == 'webp':
+            img.save(out, format='WEBP', quality=self.quality)
+        else:
+            img.save(out, format='PNG', optimize=True)
+        payload = out.getvalue()
+        if not resized and out_type == file_type and len(payload) >= len(raw):
+            return raw, file_type
+        return payload, out_type
+
+
+def file_hash(file: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    '''
+    sha256 hex digest of a file, read in chunks of `chunk_size` bytes
+    '''
+    sha = hashlib.sha256()
+    with file.open('rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _load_asset(file: Path, cache: AssetCache, pipeline: Optional[ImagePipeline], stream_threshold: Optional[int]) -> Tuple[Union[bytes, str, Path], str, str]:
+    file_type = file.suffix.lower()[1:]
+    if pipeline is None and stream_threshold is not None and file.suffix.lower() not in SVG_SUFFIXES:
+        if file.stat().st_size > stream_threshold:
+            # streamed from disk later on, the content is never held in memory as a whole
+            return file, file_hash(file), file_type
+    raw = read_asset(file)
+    source_digest = content_hash(raw)
+    if pipeline is None:
+        return raw, source_digest, file_type
+    known = cache.processed(source_digest, pipeline.variant)
+    if known is not None:
+        payload = raw if known['hash'] == source_digest else cache.read_payload(known['hash'])
+        if payload is not None:
+            return payload, known['hash'], known['type']
+    payload, out_type = pipeline.process(cast(bytes, raw), file_type)
+    digest = content_hash(payload)
+    if digest != source_digest:
+        cache.store_payload(digest, payload)
+    cache.remember_processed(source_digest, pipeline.variant, digest, out_type)
+    return payload, digest, out_type
+
+
+@dataclass
+class AssetUpload:
+    kind: AssetKind
+    name: str
+    type: str
+    hash: str
+    source: Union[bytes, Path]
+
+    @property
+    def size(self) -> int:
+        if isinstance(self.source, Path):
+            return self.source.stat().st_size
+        return len(self.source)
+
+    def chunks(self, chunk_size: int) -> Iterator[bytes]:
+        if isinstance(self.source, Path):
+            with self.source.open('rb') as f:
+                yield from iter(lambda: f.read(chunk_size), b'')
+        else:
+            for start in range(0, len(self.source), chunk_size):
+                yield self.source[start:start + chunk_size]
+
+
+def load_assets(files: List[Path], kind: AssetKind, cache: AssetCache, uploaded: Dict[str, str], pipeline: Optional[ImagePipeline] = None, workers: Optional[int] = None, stream_threshold: Optional[int] = None) -> Tuple[List[DictX], List[AssetUpload]]:
+    '''
+    loads the asset packages of `files`.
+
+    uploaded : Dict[str, str]
+        the assets already uploaded (name -> hash). Unchanged assets are only referenced by their hash
+        and - when their hash is known from the `cache` - not even read. Newly loaded assets are added.
+
+    pipeline : ImagePipeline
+        preprocessing applied to raster images. Processed payloads are cached by content hash.
+
+    stream_threshold : int
+        assets larger than this (in bytes) are not embedded in their package, the package only references
+        them by hash and they are returned as `AssetUpload`'s to be streamed in chunks.
+
+    Larger batches are read (and processed) in a thread pool.
+
+    Return
+    ------
+    Tuple[List[DictX], List[AssetUpload]]
+        the packages (in the order of `files`) and the assets to stream
+    '''
+    if pipeline is not None and not pipeline.available():
+        logging.warn('Pillow is not installed, images are uploaded without preprocessing')
+        pipeline = None
+    pkgs: List[Optional[DictX]] = [None] * len(files)
+    uploads: List[AssetUpload] = []
+    jobs: List[Tuple[int, Optional[ImagePipeline]]] = []
+    for idx, file in enumerate(files):
+        name = file.stem
+        file_pipeline = pipeline if kind == 'image' and pipeline is not None and pipeline.handles(
+            file.suffix.lower()[1:]) else None
+        variant = file_pipeline.variant if file_pipeline is not None else ''
+        entry = cache.lookup(file, variant)
+        if entry is not None and uploaded.get(name) == entry['hash']:
+            pkgs[idx] = asset_pkg(kind, name, entry['type'], entry['hash'])
+        else:
+            jobs.append((idx, file_pipeline))
+
+    def load(job: Tuple[int, Optional[ImagePipeline]]):
+        return _load_asset(files[job[0]], cache, job[1], stream_threshold)
+
+    if len(jobs) < PARALLEL_READ_THRESHOLD or workers == 1:
+        loaded = [load(job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(load, jobs))
+
+    for (idx, file_pipeline), (payload, digest, file_type) in zip(jobs, loaded):
+        file = files[idx]
+        name = file.stem
+        cache.remember(file, digest, file_type, file_pipeline.variant if file_pipeline is not None else '')
+        if uploaded.get(name) == digest:
+            pkgs[idx] = asset_pkg(kind, name, file_type, digest)
+            continue
+        uploaded[name] = digest
+        streamed = isinstance(payload, Path) or (
+            stream_threshold is not None and isinstance(payload, bytes) and len(payload) > stream_threshold
+        )
+        if streamed:
+            pkgs[idx] = asset_pkg(kind, name, file_type, digest)
+            uploads.append(AssetUpload(kind, name, file_type, digest, cast(Union[bytes, Path], payload)))
+        else:
+            pkgs[idx] = asset_pkg(kind, name, file_type, digest, payload)
+    return cast(List[DictX], pkgs), uploads
+
+
+class AssetUploader(threading.Thread):
+    '''
+    streams assets in chunks of `chunk_size` bytes in a background thread. Each chunk is sent as an
+    `asset_chunk` message, thus other messages (e.g. sprite updates) are not blocked by large uploads.
+
+    on_progress : Callable[[DictX], None]
+        called after each chunk with `{'name', 'kind', 'hash', 'sent', 'size', 'done'}` (sizes in bytes)
+
+    on_cancel : Callable[[AssetUpload], None]
+        called for each upload not completed when the uploader is canceled
+    '''
+
+    def __init__(self, send: Callable[[dict], None], uploads: List[AssetUpload], chunk_size: int = DEFAULT_CHUNK_SIZE, on_progress: Optional[Callable[[DictX], None]] = None, on_cancel: Optional[Callable[[AssetUpload], None]] = None):
+        super().__init__(daemon=True)
+        self.send = send
+        self.uploads = uploads
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.__canceled = threading.Event()
+
+    def cancel(self):
+        self.__canceled.set()
+
+    @property
+    def is_canceled(self) -> bool:
+        return self.__canceled.is_set()
+
+    def run(self):
+        for idx, upload in enumerate(self.uploads):
+            if not self.__upload(upload):
+                if self.on_cancel is not None:
+                    for canceled in self.uploads[idx:]:
+                        self.on_cancel(canceled)
+                return
+
+    def __upload(self, upload: AssetUpload) -> bool:
+        size = upload.size
+        count = max(1, ceil(size / self.chunk_size))
+        sent = 0
+        for index, chunk in enumerate(upload.chunks(self.chunk_size)):
+            if self.is_canceled:
+                return False
+            self.send({
+                'type': DataType.ASSET_CHUNK,
+                'kind': upload.kind,
+                'name': upload.name,
+                'asset_type': upload.type,
+                'hash': upload.hash,
+                'index': index,
+                'count': count,
+                'size': size,
+                'chunk': chunk
+            })
+            sent += len(chunk)
+            if self.on_progress is not None:
+                try:
+                    self.on_progress(DictX({
+                        'name': upload.name,
+                        'kind': upload.kind,
+                        'hash': upload.hash,
+                        'sent': sent,
+                        'size': size,
+                        'done': sent >= size
+                    }))
+                except Exception as e:
+                    logging.warn(e)
+        return True
@@ -0,0 +1,183 @@
+import heapq
+import threading
+import time
+from typing import List, Optional, Set
+
+
+class Clock:
+    '''
+    The wall clock. All timings (`time_s()`, `Connector.current_time_stamp`, `Connector.sleep`
+    and the `ThreadJob`s of async subscriptions) read the time from the clock set with `set_clock`.
+    '''
+    virtual = False
+
+    def time_ns(self) -> int:
+        return time.time_ns()
+
+    def time(self) -> float:
+        '''
+        seconds since epoche
+        '''
+        return self.time_ns() / 1000000000.0
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        '''
+        waits until the event is set or the timeout is reached
+
+        Return
+        ------
+        bool
+            wheter the event is set
+        '''
+        return event.wait(timeout)
+
+    def register(self, thread: threading.Thread):
+        '''
+        called before a job thread is started
+        '''
+        pass
+
+    def release(self, thread: threading.Thread):
+        '''
+        called when a job thread finishes
+        '''
+        pass
+
+    def interrupt(self):
+        '''
+        wakes up waiting threads, e.g. when an event was set
+        '''
+        pass
+
+
+class _Waiter:
+    def __init__(self, deadline: int, seq: int, thread: threading.Thread, event: threading.Event):
+        self.deadline = deadline
+        self.seq = seq
+        self.thread = thread
+        self.event = event
+        self.woken = False
+
+    def __lt__(self, other: '_Waiter'):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+
+class VirtualClock(Clock):
+    '''
+    Deterministic clock for tests: the time only moves when it is advanced (`advance`, or `sleep` from the main thread).
+    Advancing fast-forwards through the scheduled jobs: the waiting job threads are woken one after another
+    in the order of their deadlines, each at its exact virtual time, and the clock waits until the job
+    waits again (or finishes) before the next one is woken.
+
+    Example
+    -------
+    ```py
+    clock = VirtualClock()
+    set_clock(clock)
+    job = device.subscribe_async(game_loop, interval=0.05)
+    clock.advance(60)   # runs the 1200 iterations of a one-minute game within a fraction of a second
+    ```
+    '''
+    virtual = True
+
+    def __init__(self, start: Optional[float] = None):
+        '''
+        Optional
+        --------
+        start : float
+            the initial time in seconds since epoche, by default now
+        '''
+        self.__now = int((start if start is not None else time.time()) * 1000000000)
+        self.__cond = threading.Condition()
+        self.__waiters: List[_Waiter] = []
+        self.__seq = 0
+        # job threads currently executing (not waiting for the clock)
+        self.__running: Set[threading.Thread] = set()
+        self.__jobs: Set[threading.Thread] = set()
+
+    def time_ns(self) -> int:
+        with self.__cond:
+            return self.__now
+
+    def register(self, thread: threading.Thread):
+        with self.__cond:
+            self.__jobs.add(thread)
+            self.__running.add(thread)
+
+    def release(self, thread: threading.Thread):
+        with self.__cond:
+            self.__jobs.discard(thread)
+            self.__running.discard(thread)
+            self.__cond.notify_all()
+
+    def interrupt(self):
+        with self.__cond:
+            self.__cond.notify_all()
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        thread = threading.current_thread()
+        with self.__cond:
+            if timeout is None:
+                deadline = float('inf')
+            else:
+                deadline = self.__now + round(timeout * 1000000000)
+            self.__seq += 1
+            waiter = _Waiter(deadline, self.__seq, thread, event)
+            heapq.heappush(self.__waiters, waiter)
+            self.__running.discard(thread)
+            self.__cond.notify_all()
+            while not waiter.woken and not event.is_set():
+                self.__cond.wait()
+            if not waiter.woken:
+                # interrupted by the event
+                self.__waiters.remove(waiter)
+                heapq.heapify(self.__waiters)
+                if thread in self.__jobs:
+                    self.__running.add(thread)
+            return event.is_set()
+
+    def sleep(self, seconds: float):
+        '''
+        job threads wait for the virtual time to pass, any other thread advances the clock
+        '''
+        if threading.current_thread() in self.__jobs:
+            self.wait(threading.Event(), seconds)
+        else:
+            self.advance(seconds)
+
+    def advance(self, seconds: float):
+        '''
+        moves the time forward, all jobs due within this time are executed in order
+        '''
+        with self.__cond:
+            target = self.__now + round(seconds * 1000000000)
+            while True:
+                while len(self.__running) > 0:
+                    self.__cond.wait()
+                if len(self.__waiters) == 0 or self.__waiters[0].deadline > target:
+                    break
+                waiter = heapq.heappop(self.__waiters)
+                self.__now = max(self.__now, waiter.deadline)
+                waiter.woken = True
+                if waiter.thread in self.__jobs:
+                    self.__running.add(waiter.thread)
+                self.__cond.notify_all()
+            self.__now = max(self.__now, target)
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Optional[Clock] = None):
+    '''
+    sets the clock used for all timings, `None` restores the wall clock
+    '''
+    global _clock
+    _clock = clock if clock is not None else Clock()
@@ -1,3 +1,8 @@
+from collections.abc import Mapping
+from copy import deepcopy
+from typing import Optional
+
+
 class DictX(dict):
     '''
     dict with the ability to access keys over dot notation,
@@ -46,6 +51,80 @@ class DictX(dict):
         return '<DictX ' + dict.__repr__(self) + '>'
 
 
+class DictView(Mapping):
+    '''
+    read-only view of a dict, optionally with some values overlayed. Keys can be accessed over dot notation
+    as with a `DictX`. Creating a view is cheap - nothing is copied.
+
+    ```py
+    sprite = DictX({'id': 'ball', 'pos_x': 0, 'pos_y': 0})
+    view = DictView(sprite, {'pos_x': 10})
+    print(view.id, view.pos_x)  # ball 10
+    view.to_dict()              # mutable copy
+    ```
+    '''
+    __slots__ = ('_base', '_overlay')
+
+    def __init__(self, base: Mapping, overlay: Optional[Mapping] = None):
+        object.__setattr__(self, '_base', base)
+        object.__setattr__(self, '_overlay', overlay or {})
+
+    def __getitem__(self, key):
+        if key in self._overlay:
+            return self._overlay[key]
+        try:
+            return self._base[key]
+        except (KeyError, AttributeError):
+            # a DictX base raises an AttributeError for missing keys
+            raise KeyError(key) from None
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            # private and special attributes are never looked up in the dict (e.g. by copy or pickle)
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            return None
+
+    def __contains__(self, key):
+        return key in self._overlay or key in self._base
+
+    def __iter__(self):
+        yield from self._base
+        yield from (k for k in self._overlay if k not in self._base)
+
+    def __len__(self):
+        return len(self._base) + len([k for k in self._overlay if k not in self._base])
+
+    def __setattr__(self, key, value):
+        raise TypeError(f'{type(self).__name__} is read-only, use to_dict() to get a mutable copy')
+
+    __setitem__ = __setattr__
+
+    def __delattr__(self, key):
+        raise TypeError(f'{type(self).__name__} is read-only, use to_dict() to get a mutable copy')
+
+    __delitem__ = __delattr__
+
+    def to_dict(self) -> DictX:
+        return DictX({**self._base, **self._overlay})
+
+    copy = to_dict
+
+    def __copy__(self) -> 'DictView':
+        return DictView(self._base, self._overlay)
+
+    def __reduce__(self):
+        return (DictView, (self._base, self._overlay))
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self.to_dict(), memo)
+
+    def __repr__(self):
+        return '<DictView ' + dict.__repr__(self.to_dict()) + '>'
+
+
 if __name__ == '__main__':
     a = DictX({'a': DictX({'b': 12, 'c': {'a': 113}})})
     a['b'] = {'c': 18}
@@ -0,0 +1,202 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Literal, Optional, Set, Tuple
+from .dictx import DictX
+
+DispatchPolicy = Literal['all', 'latest']
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+# tasks of a lane run before the worker is handed to the next lane
+LANE_BATCH = 32
+
+
+class CallbackExecutor:
+    '''
+    Runs the callbacks on a pool of worker threads instead of the socket thread, thus slow callbacks
+    only delay themselves and not the reception of the messages.
+
+    The tasks are queued in lanes (one per event), each lane has a bounded queue and its tasks run
+    one after another in the submitted order - while different lanes run in parallel.
+    '''
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE, drop_when_full: bool = False):
+        '''
+        Optional
+        --------
+        workers : int
+            the number of worker threads
+
+        queue_size : int
+            the maximal number of pending tasks per lane
+
+        drop_when_full : bool
+            drop the oldest pending task of a full lane instead of waiting for the workers
+        '''
+        self.queue_size = max(int(queue_size), 1)
+        self.drop_when_full = drop_when_full
+        self.dropped = 0
+        self.__pool = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix='callbacks')
+        self.__lanes: Dict[str, Deque[Tuple[Callable, tuple]]] = {}
+        self.__scheduled: Set[str] = set()
+        self.__cond = threading.Condition()
+        self.__local = threading.local()
+        self.__stopped = False
+
+    @property
+    def is_running(self) -> bool:
+        return not self.__stopped
+
+    @property
+    def pending(self) -> int:
+        with self.__cond:
+            return sum(len(lane) for lane in self.__lanes.values())
+
+    def submit(self, lane: str, fn: Callable, *args) -> bool:
+        '''
+        queues `fn(*args)` in the lane. When the lane is full, the caller waits for the workers
+        (or the oldest task is dropped, see `drop_when_full`) - except when called from a callback,
+        since waiting for its own workers could dead lock.
+
+        Return
+        ------
+        bool
+            wheter the task was queued
+        '''
+        with self.__cond:
+            if self.__stopped:
+                return False
+            tasks = self.__lanes.setdefault(lane, deque())
+            in_worker = getattr(self.__local, 'worker', False)
+            while len(tasks) >= self.queue_size and not in_worker and not self.__stopped:
+                if self.drop_when_full:
+                    tasks.popleft()
+                    self.dropped += 1
+                    break
+                self.__cond.wait()
+            if self.__stopped:
+                return False
+            tasks.append((fn, args))
+            if lane not in self.__scheduled:
+                self.__scheduled.add(lane)
+                self.__pool.submit(self.__run_lane, lane)
+            return True
+
+    def __run_lane(self, lane: str):
+        self.__local.worker = True
+        for _ in range(LANE_BATCH):
+            with self.__cond:
+                tasks = self.__lanes.get(lane)
+                if not tasks:
+                    self.__scheduled.discard(lane)
+                    self.__cond.notify_all()
+                    return
+                fn, args = tasks.popleft()
+                self.__cond.notify_all()
+            try:
+                fn(*args)
+            except Exception as e:
+                logging.warn(e)
+        with self.__cond:
+            # submitted while holding the lock, thus `shutdown` can not stop the pool in between
+            if not self.__stopped:
+                try:
+                    # requeue the lane behind the other lanes
+                    self.__pool.submit(self.__run_lane, lane)
+                    return
+                except RuntimeError as e:
+                    logging.warn(e)
+            self.__scheduled.discard(lane)
+            self.__cond.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        '''
+        waits until all queued tasks are done
+
+        Return
+        ------
+        bool
+            False when the timeout expired before
+        '''
+        with self.__cond:
+            return self.__cond.wait_for(lambda: len(self.__scheduled) == 0, timeout)
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None):
+        '''
+        stops accepting tasks. With `wait`, the queued tasks are run first, otherwise they are discarded.
+        '''
+        if wait:
+            self.join(timeout)
+        with self.__cond:
+            self.__stopped = True
+            for tasks in self.__lanes.values():
+                tasks.clear()
+            self.__cond.notify_all()
+        self.__pool.shutdown(wait=False)
+
+
+class LatestCallback:
+    '''
+    Calls a callback on its own worker thread with the newest message only: messages received while the
+    callback is still busy replace the pending message, thus a slow callback always handles recent data.
+    The number of replaced messages is passed in the field `skipped` of dict messages, other payloads
+    (e.g. the list of `devices`) are passed unchanged - `skipped` of the callback counts all replaced messages.
+    '''
+
+    def __init__(self, function: Callable, invoke: Callable[[Callable, Any], None]):
+        '''
+        Parameters
+        ----------
+        function : Callable
+            the callback
+
+        invoke : Callable[[Callable, Any], None]
+            calls the callback with a message
+        '''
+        self.function = function
+        self.skipped = 0
+        self.__invoke = invoke
+        # the pending payload and the number of payloads it replaced
+        self.__pending: Optional[Tuple[Any, int]] = None
+        self.__cond = threading.Condition()
+        self.__thread: Optional[threading.Thread] = None
+        self.__stopped = False
+
+    def __call__(self, data):
+        with self.__cond:
+            if self.__stopped:
+                return
+            skipped = 0
+            if self.__pending is not None:
+                self.skipped += 1
+                skipped = self.__pending[1] + 1
+            self.__pending = (data, skipped)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, daemon=True)
+                self.__thread.start()
+            self.__cond.notify()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while self.__pending is None and not self.__stopped:
+                    self.__cond.wait()
+                if self.__stopped:
+                    return
+                data, skipped = self.__pending
+                self.__pending = None
+            if isinstance(data, dict):
+                # a shallow copy - the message is shared with the other callbacks
+                data = DictX({**data, 'skipped': skipped})
+            try:
+                self.__invoke(self.function, data)
+            except Exception as e:
+                logging.warn(e)
+
+    def stop(self):
+        with self.__cond:
+            self.__stopped = True
+            self.__pending = None
+            self.__cond.notify()
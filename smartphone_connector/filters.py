@@ -0,0 +1,334 @@
+from math import atan2, cos, degrees, hypot, pi, sin, sqrt
+from typing import Dict, List, Optional, Sequence, Tuple
+from .dictx import DictX
+from .types import DataType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ACC_AXES = ('x', 'y', 'z')
+GYRO_AXES = ('alpha', 'beta', 'gamma')
+# fallback when neither a sample rate nor an interval is known
+DEFAULT_SAMPLE_RATE = 60
+# messages held back by a filter while it estimates the sample rate
+MAX_ESTIMATION_SAMPLES = 60
+# batches of at least this many samples are filtered as blocks with NumPy (if installed), smaller
+# batches are faster sample by sample
+MIN_VECTORIZED_BLOCK = 32
+# longer blocks are split, the block matrices grow quadratically with the length
+MAX_VECTORIZED_BLOCK = 256
+
+
+def sample_rate_of(msgs: Sequence[dict], default: Optional[float] = DEFAULT_SAMPLE_RATE) -> Optional[float]:
+    '''
+    estimates the sample rate (Hz) of a stream from the `interval` field (ms) or the time stamps,
+    `default` when neither is known
+    '''
+    for msg in msgs:
+        if msg.get('interval'):
+            return 1000.0 / msg['interval']
+    if len(msgs) > 1 and msgs[-1]['time_stamp'] > msgs[0]['time_stamp']:
+        return (len(msgs) - 1) / (msgs[-1]['time_stamp'] - msgs[0]['time_stamp'])
+    return default
+
+
+class StreamFilter:
+    '''
+    Base of the streaming filters: a filter consumes the messages of its `sources` (data types) in batches
+    and returns the filtered messages, which are ingested as messages of a new (virtual) data type.
+    Filters keep their state per device.
+    '''
+    sources: Tuple[str, ...] = (DataType.ACCELERATION,)
+
+    def process(self, batch: List[DictX]) -> List[DictX]:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+class Biquad(StreamFilter):
+    '''
+    second order IIR filter (transposed direct form II) with the coefficients of the
+    audio EQ cookbook - applied to each axis separately.
+
+    With NumPy, batches of at least `MIN_VECTORIZED_BLOCK` samples are filtered as blocks: the recursion is
+    unrolled into the matrices of its state space form, thus a block of all axes is filtered with a few
+    matrix products and the state is carried to the next block. Smaller batches are filtered sample by sample.
+    '''
+
+    def __init__(self,
+                 kind: str,
+                 cutoff: float,
+                 q: float = 1 / sqrt(2),
+                 sample_rate: Optional[float] = None,
+                 source: str = DataType.ACCELERATION,
+                 axes: Optional[Sequence[str]] = None):
+        '''
+        Parameters
+        ----------
+        kind : 'lowpass' | 'highpass'
+
+        cutoff : float
+            cutoff frequency in Hz
+
+        Optional
+        --------
+        q : float
+            quality factor, by default 1/sqrt(2) (butterworth)
+
+        sample_rate : float
+            sample rate in Hz, by default estimated from the first `interval` or the first two time stamps.
+            The messages received until the rate is known are held back.
+
+        source : str
+            the filtered data type
+
+        axes : List[str]
+            the filtered fields, by default x, y, z (acceleration) or alpha, beta, gamma (gyro)
+        '''
+        if kind not in ['lowpass', 'highpass']:
+            raise ValueError(f'unknown filter kind {kind}')
+        self.kind = kind
+        self.cutoff = cutoff
+        self.q = q
+        self.sample_rate = sample_rate
+        self.sources = (source,)
+        self.axes = tuple(axes) if axes is not None else (GYRO_AXES if source == DataType.GYRO else ACC_AXES)
+        self.coefficients: Optional[Tuple[float, float, float, float, float]] = None
+        self.__state: Dict[str, List[float]] = {}
+        self.__pending: List[DictX] = []
+        # block length -> (forced, free, decay, carry), see __block_matrices
+        self.__blocks: Dict[int, tuple] = {}
+
+    def reset(self):
+        self.__state = {}
+        self.__pending = []
+
+    def design(self, sample_rate: float):
+        w0 = 2 * pi * min(self.cutoff, sample_rate * 0.49) / sample_rate
+        alpha = sin(w0) / (2 * self.q)
+        cos_w0 = cos(w0)
+        if self.kind == 'lowpass':
+            b0 = b2 = (1 - cos_w0) / 2
+            b1 = 1 - cos_w0
+        else:
+            b0 = b2 = (1 + cos_w0) / 2
+            b1 = -(1 + cos_w0)
+        a0 = 1 + alpha
+        a1 = -2 * cos_w0
+        a2 = 1 - alpha
+        self.coefficients = (b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0)
+        self.__blocks = {}
+
+    def process(self, batch: List[DictX]) -> List[DictX]:
+        if self.coefficients is None:
+            batch = [*self.__pending, *batch]
+            sample_rate = self.sample_rate if self.sample_rate is not None else sample_rate_of(batch, None)
+            if sample_rate is None:
+                if len(batch) < MAX_ESTIMATION_SAMPLES:
+                    self.__pending = batch
+                    return []
+                sample_rate = DEFAULT_SAMPLE_RATE
+            self.__pending = []
+            self.design(sample_rate)
+        out = [DictX(msg) for msg in batch]
+        if np is not None and len(batch) >= MIN_VECTORIZED_BLOCK:
+            self.__filter_blocks(batch, out)
+        else:
+            self.__filter_samples(batch, out)
+        return out
+
+    def __initial_state(self, x: float) -> List[float]:
+        # the steady state of the first value, no transient
+        b0, _, b2, _, a2 = self.coefficients
+        gain = 1 if self.kind == 'lowpass' else 0
+        return [x * (gain - b0), x * (b2 - a2 * gain)]
+
+    def __filter_samples(self, batch: List[DictX], out: List[DictX]):
+        b0, b1, b2, a1, a2 = self.coefficients
+        for axis in self.axes:
+            for msg, result in zip(batch, out):
+                key = f'{msg["device_id"]}:{axis}'
+                if axis not in msg or msg[axis] is None:
+                    continue
+                x = msg[axis]
+                if key not in self.__state:
+                    self.__state[key] = self.__initial_state(x)
+                z = self.__state[key]
+                y = b0 * x + z[0]
+                z[0] = b1 * x - a1 * y + z[1]
+                z[1] = b2 * x - a2 * y
+                result[axis] = y
+
+    def __filter_blocks(self, batch: List[DictX], out: List[DictX]):
+        rows_of: Dict[str, List[int]] = {}
+        for i, msg in enumerate(batch):
+            rows_of.setdefault(msg.get('device_id'), []).append(i)
+        for device_id, rows in rows_of.items():
+            # missing values are nan
+            x = np.array([[batch[i].get(axis) for axis in self.axes] for i in rows], dtype=float)
+            present = ~np.isnan(x)
+            if present.all():
+                self.__filter_block(device_id, rows, list(self.axes), x, out)
+                continue
+            for a, axis in enumerate(self.axes):
+                idx = np.flatnonzero(present[:, a])
+                if len(idx) > 0:
+                    self.__filter_block(device_id, [rows[i] for i in idx], [axis], x[idx, a:a + 1], out)
+
+    def __filter_block(self, device_id: str, rows: List[int], axes: List[str], x, out: List[DictX]):
+        '''
+        filters the values `x` (samples x axes) of the device, the rows are the indices of the messages in `out`
+        '''
+        keys = [f'{device_id}:{axis}' for axis in axes]
+        for key, x0 in zip(keys, x[0].tolist()):
+            if key not in self.__state:
+                self.__state[key] = self.__initial_state(x0)
+        z = np.array([self.__state[key] for key in keys], dtype=float).T
+        y = np.empty_like(x)
+        for start in range(0, len(rows), MAX_VECTORIZED_BLOCK):
+            block = x[start:start + MAX_VECTORIZED_BLOCK]
+            forced, free, decay, carry = self.__block_matrices(len(block))
+            y[start:start + len(block)] = forced @ block + free @ z
+            z = decay @ z + carry @ block
+        for key, state in zip(keys, z.T.tolist()):
+            self.__state[key] = state
+        for i, values in zip(rows, y.tolist()):
+            out[i].update(zip(axes, values))
+
+    def __block_matrices(self, n: int) -> tuple:
+        '''
+        the matrices of a block of n samples (x: n samples of m axes, z: the 2 x m states):
+        `y = forced @ x + free @ z` and the next state `decay @ z + carry @ x`
+        '''
+        if n not in self.__blocks:
+            b0, b1, b2, a1, a2 = self.coefficients
+            # state space form: z' = A z + B x, y = z[0] + b0 x
+            A = np.array([[-a1, 1.0], [-a2, 0.0]])
+            B = np.array([b1 - a1 * b0, b2 - a2 * b0])
+            powers = np.empty((n + 1, 2, 2))
+            powers[0] = np.eye(2)
+            for k in range(n):
+                powers[k + 1] = A @ powers[k]
+            impulse = np.empty(n)
+            impulse[0] = b0
+            impulse[1:] = powers[:n - 1, 0, :] @ B
+            lag = np.subtract.outer(np.arange(n), np.arange(n))
+            forced = np.where(lag >= 0, impulse[np.maximum(lag, 0)], 0.0)
+            if len(self.__blocks) >= 4:
+                # the batch sizes are usually constant, a few block lengths suffice
+                self.__blocks = {}
+            self.__blocks[n] = (forced, powers[:n, 0, :], powers[n], (powers[n - 1::-1] @ B).T)
+        return self.__blocks[n]
+
+
+class LowPass(Biquad):
+    def __init__(self, cutoff: float, q: float = 1 / sqrt(2), sample_rate: Optional[float] = None, source: str = DataType.ACCELERATION, axes: Optional[Sequence[str]] = None):
+        super().__init__('lowpass', cutoff, q=q, sample_rate=sample_rate, source=source, axes=axes)
+
+
+class HighPass(Biquad):
+    def __init__(self, cutoff: float, q: float = 1 / sqrt(2), sample_rate: Optional[float] = None, source: str = DataType.ACCELERATION, axes: Optional[Sequence[str]] = None):
+        super().__init__('highpass', cutoff, q=q, sample_rate=sample_rate, source=source, axes=axes)
+
+
+class Decimate(StreamFilter):
+    '''
+    reduces the sample rate by `factor`: each block of `factor` samples is replaced by its mean
+    (which acts as a simple anti aliasing filter). Blocks are averaged with NumPy when it is installed.
+    '''
+
+    def __init__(self, factor: int, source: str = DataType.ACCELERATION, axes: Optional[Sequence[str]] = None):
+        self.factor = max(int(factor), 1)
+        self.sources = (source,)
+        self.axes = tuple(axes) if axes is not None else (GYRO_AXES if source == DataType.GYRO else ACC_AXES)
+        self.__pending: Dict[str, List[DictX]] = {}
+
+    def reset(self):
+        self.__pending = {}
+
+    def process(self, batch: List[DictX]) -> List[DictX]:
+        out = []
+        by_device: Dict[str, List[DictX]] = {}
+        for msg in batch:
+            by_device.setdefault(msg['device_id'], []).append(msg)
+        for device_id, msgs in by_device.items():
+            pending = self.__pending.get(device_id, []) + msgs
+            blocks = len(pending) // self.factor
+            self.__pending[device_id] = pending[blocks * self.factor:]
+            if blocks == 0:
+                continue
+            used = pending[:blocks * self.factor]
+            means = self.__block_means(used, blocks)
+            for b in range(blocks):
+                # the last message of a block carries the time stamp
+                msg = DictX(used[(b + 1) * self.factor - 1])
+                for a, axis in enumerate(self.axes):
+                    msg[axis] = means[b][a]
+                if 'interval' in msg and msg['interval']:
+                    msg['interval'] = msg['interval'] * self.factor
+                out.append(msg)
+        out.sort(key=lambda m: m['time_stamp'])
+        return out
+
+    def __block_means(self, msgs: List[DictX], blocks: int) -> List[List[float]]:
+        if np is not None:
+            values = np.array([[msg.get(axis) or 0 for axis in self.axes] for msg in msgs], dtype=float)
+            return values.reshape(blocks, self.factor, len(self.axes)).mean(axis=1).tolist()
+        return [
+            [sum(msgs[i].get(axis) or 0 for i in range(b * self.factor, (b + 1) * self.factor)) / self.factor for axis in self.axes]
+            for b in range(blocks)
+        ]
+
+
+class ComplementaryFilter(StreamFilter):
+    '''
+    fuses the tilt angles derived from the gravity in the acceleration (stable, but noisy) with the changes of
+    the gyro angles (smooth, but drifting): `angle = alpha * (angle + gyro change) + (1 - alpha) * acc angle`.
+
+    The resulting messages contain the fused `beta` (front-back tilt) and `gamma` (left-right tilt) in degrees
+    and are produced for each acceleration message.
+    '''
+    sources = (DataType.ACCELERATION, DataType.GYRO)
+
+    def __init__(self, alpha: float = 0.98):
+        self.alpha = alpha
+        self.__state: Dict[str, Dict[str, Optional[float]]] = {}
+
+    def reset(self):
+        self.__state = {}
+
+    @staticmethod
+    def acc_angles(msg: dict) -> Tuple[float, float]:
+        x, y, z = msg.get('x') or 0, msg.get('y') or 0, msg.get('z') or 0
+        return degrees(atan2(y, z)), degrees(atan2(-x, hypot(y, z)))
+
+    def process(self, batch: List[DictX]) -> List[DictX]:
+        out = []
+        for msg in batch:
+            state = self.__state.setdefault(msg['device_id'], {'beta': None, 'gamma': None, 'gyro_beta': None, 'gyro_gamma': None})
+            if msg['type'] == DataType.GYRO:
+                for angle in ['beta', 'gamma']:
+                    prev = state[f'gyro_{angle}']
+                    if prev is not None and state[angle] is not None and msg.get(angle) is not None:
+                        # wrap the change into [-180, 180)
+                        state[angle] += (msg[angle] - prev + 180) % 360 - 180
+                    state[f'gyro_{angle}'] = msg.get(angle)
+                continue
+            acc_beta, acc_gamma = self.acc_angles(msg)
+            for angle, acc_angle in [('beta', acc_beta), ('gamma', acc_gamma)]:
+                if state[angle] is None:
+                    state[angle] = acc_angle
+                else:
+                    state[angle] = self.alpha * state[angle] + (1 - self.alpha) * acc_angle
+            out.append(DictX({
+                'time_stamp': msg['time_stamp'],
+                'device_id': msg['device_id'],
+                'device_nr': msg.get('device_nr'),
+                'beta': state['beta'],
+                'gamma': state['gamma']
+            }))
+        return out
@@ -0,0 +1,185 @@
+from collections import deque
+from math import exp, sqrt
+from typing import Deque, Dict, Optional, Tuple
+from .dictx import DictX
+from .filters import ComplementaryFilter
+from .types import DataType
+
+GRAVITY = 9.81
+
+
+def _deviation(msg: dict) -> float:
+    '''
+    deviation of the acceleration magnitude from the gravity
+    '''
+    x, y, z = msg.get('x') or 0, msg.get('y') or 0, msg.get('z') or 0
+    return abs(sqrt(x * x + y * y + z * z) - GRAVITY)
+
+
+class GestureDetector:
+    '''
+    Base of the gesture detectors: `feed` is called once per received message of the `sources` (data types)
+    and returns the gesture event (if one was detected). The state is kept per device.
+    '''
+    event = ''
+    sources: Tuple[str, ...] = (DataType.ACCELERATION,)
+
+    def __init__(self, debounce: float = 0.5):
+        '''
+        Optional
+        --------
+        debounce : float
+            minimal time in seconds between two events of a device
+        '''
+        self.debounce = debounce
+        self.__last_event: Dict[str, float] = {}
+
+    def feed(self, msg: DictX) -> Optional[DictX]:
+        raise NotImplementedError
+
+    def reset(self):
+        self.__last_event = {}
+
+    def _emit(self, msg: dict, **fields) -> Optional[DictX]:
+        '''
+        the event for the message - or None while debouncing
+        '''
+        last = self.__last_event.get(msg['device_id'])
+        if last is not None and msg['time_stamp'] - last < self.debounce:
+            return None
+        self.__last_event[msg['device_id']] = msg['time_stamp']
+        return DictX({
+            'type': self.event,
+            'time_stamp': msg['time_stamp'],
+            'device_id': msg['device_id'],
+            'device_nr': msg.get('device_nr'),
+            **fields
+        })
+
+
+class ShakeDetector(GestureDetector):
+    '''
+    a shake: at least `peaks` samples deviating more than `threshold` (m/s^2) from the gravity within `window` seconds
+    '''
+    event = 'shake'
+
+    def __init__(self, threshold: float = 12, peaks: int = 4, window: float = 1.0, debounce: float = 1.0):
+        super().__init__(debounce)
+        self.threshold = threshold
+        self.peaks = peaks
+        self.window = window
+        self.__peaks: Dict[str, Deque[Tuple[float, float]]] = {}
+
+    def reset(self):
+        super().reset()
+        self.__peaks = {}
+
+    def feed(self, msg: DictX) -> Optional[DictX]:
+        deviation = _deviation(msg)
+        peaks = self.__peaks.setdefault(msg['device_id'], deque())
+        if deviation > self.threshold:
+            peaks.append((msg['time_stamp'], deviation))
+        while len(peaks) > 0 and peaks[0][0] < msg['time_stamp'] - self.window:
+            peaks.popleft()
+        if len(peaks) < self.peaks:
+            return None
+        event = self._emit(msg, intensity=max(p[1] for p in peaks), peaks=len(peaks))
+        if event is not None:
+            peaks.clear()
+        return event
+
+
+class TiltDetector(GestureDetector):
+    '''
+    reports when the direction the phone is tilted to changes ('left', 'right', 'forward', 'backward' or 'flat').
+    A direction is entered above `threshold` degrees and left below `threshold - hysteresis` degrees.
+    The angles are smoothed (exponential moving average over `time_constant` seconds), thus shaking
+    the phone does not tilt it.
+    '''
+    event = 'tilt'
+
+    def __init__(self, threshold: float = 25, hysteresis: float = 10, time_constant: float = 0.2, debounce: float = 0.2):
+        super().__init__(debounce)
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.time_constant = time_constant
+        self.__direction: Dict[str, str] = {}
+        # time stamp, beta and gamma per device
+        self.__angles: Dict[str, Tuple[float, float, float]] = {}
+
+    def reset(self):
+        super().reset()
+        self.__direction = {}
+        self.__angles = {}
+
+    def __smooth(self, msg: dict) -> Tuple[float, float]:
+        beta, gamma = ComplementaryFilter.acc_angles(msg)
+        prev = self.__angles.get(msg['device_id'])
+        if prev is not None and self.time_constant > 0:
+            t, prev_beta, prev_gamma = prev
+            alpha = 1 - exp(-max(msg['time_stamp'] - t, 0) / self.time_constant)
+            beta = prev_beta + alpha * (beta - prev_beta)
+            gamma = prev_gamma + alpha * (gamma - prev_gamma)
+        self.__angles[msg['device_id']] = (msg['time_stamp'], beta, gamma)
+        return beta, gamma
+
+    def direction(self, beta: float, gamma: float, current: str) -> str:
+        angles = {'forward': beta, 'backward': -beta, 'right': gamma, 'left': -gamma}
+        if current != 'flat' and angles[current] >= self.threshold - self.hysteresis:
+            return current
+        name = max(angles, key=angles.get)
+        return name if angles[name] > self.threshold else 'flat'
+
+    def feed(self, msg: DictX) -> Optional[DictX]:
+        beta, gamma = self.__smooth(msg)
+        current = self.__direction.get(msg['device_id'], 'flat')
+        direction = self.direction(beta, gamma, current)
+        if direction == current:
+            return None
+        event = self._emit(msg, direction=direction, beta=beta, gamma=gamma)
+        if event is not None:
+            self.__direction[msg['device_id']] = direction
+        return event
+
+
+class TapDetector(GestureDetector):
+    '''
+    a tap: a short spike - the deviation from the gravity exceeds `threshold` (m/s^2) and falls back below
+    half of it within `max_duration` seconds
+    '''
+    event = 'tap'
+
+    def __init__(self, threshold: float = 4, max_duration: float = 0.15, debounce: float = 0.3):
+        super().__init__(debounce)
+        self.threshold = threshold
+        self.max_duration = max_duration
+        # start and peak of the running spike per device
+        self.__spikes: Dict[str, Tuple[float, float]] = {}
+
+    def reset(self):
+        super().reset()
+        self.__spikes = {}
+
+    def feed(self, msg: DictX) -> Optional[DictX]:
+        deviation = _deviation(msg)
+        device_id = msg['device_id']
+        spike = self.__spikes.get(device_id)
+        if spike is None:
+            if deviation > self.threshold:
+                self.__spikes[device_id] = (msg['time_stamp'], deviation)
+            return None
+        start, peak = spike
+        if deviation >= self.threshold / 2:
+            self.__spikes[device_id] = (start, max(peak, deviation))
+            return None
+        del self.__spikes[device_id]
+        if msg['time_stamp'] - start > self.max_duration:
+            return None
+        return self._emit(msg, intensity=peak, duration=msg['time_stamp'] - start)
+
+
+GESTURES = {
+    'shake': ShakeDetector,
+    'tilt': TiltDetector,
+    'tap': TapDetector
+}
@@ -1,8 +1,8 @@
-from typing import List, Callable, TypeVar, Union
-from time import time_ns
+from typing import List, Callable, Optional, TypeVar, Union
 from datetime import datetime
 import random
 from .types import TimeStampedMsg, CssColorType, RgbColor
+from .clock import Clock, get_clock
 from pathlib import Path
 
 
@@ -14,11 +14,13 @@ def ClassConsts(cls) -> List[str]:
     return list(map(lambda d: cls.__dict__[d], ClassProps(cls)))
 
 
-def time_s() -> float:
+def time_s(clock: Optional[Clock] = None) -> float:
     '''
-    returns the current time in seconds since epoche
+    returns the current time in seconds since epoche (of the given clock, by default of the clock set with `set_clock`)
     '''
-    return (time_ns() // 1000000) / 1000.0
+    if clock is None:
+        clock = get_clock()
+    return (clock.time_ns() // 1000000) / 1000.0
 
 
 def without_none(raw: dict) -> dict:
@@ -32,6 +34,22 @@ def flatten(list_of_lists: List[List]) -> List:
     return [y for x in list_of_lists for y in x]
 
 
+def bisect_time(msgs: List[TimeStampedMsg], t: float, right: bool = False, lo: int = 0) -> int:
+    '''
+    index where a message with the time stamp `t` would be inserted into the messages (ordered by time_stamp).
+    With `right`, the index is after all messages with the same time stamp.
+    '''
+    hi = len(msgs)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        ts = msgs[mid]['time_stamp']
+        if ts < t or (right and ts == t):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
 def to_datetime(data: Union[TimeStampedMsg, int, float]) -> datetime:
     '''
     extracts the datetime from a data package. if the field `time_stamp` is not present,
@@ -0,0 +1,216 @@
+from math import floor, hypot, inf
+from typing import List, Optional, Tuple
+from .types import AutoMovement, Number
+
+Point = Tuple[float, float]
+
+
+def _unit(direction: Optional[List[Number]]) -> Point:
+    if direction is None or len(direction) < 2:
+        return (0.0, 0.0)
+    length = hypot(direction[0], direction[1])
+    if length == 0:
+        return (0.0, 0.0)
+    return (direction[0] / length, direction[1] / length)
+
+
+def _segment(pos: Point, movement: AutoMovement) -> Tuple[Point, Point, float]:
+    '''
+    returns the velocity, the end position and the duration of a movement starting at `pos`.
+    Relative movements without time_span and distance never end (duration inf).
+    '''
+    speed = movement.get('speed') or 0
+    if movement.get('movement') == 'absolute':
+        to = movement['to']
+        dist = hypot(to[0] - pos[0], to[1] - pos[1])
+        if movement.get('time') is not None:
+            duration = movement['time']
+        elif speed > 0:
+            duration = dist / speed
+        else:
+            duration = 0
+        if duration <= 0:
+            return (0.0, 0.0), (to[0], to[1]), 0
+        return ((to[0] - pos[0]) / duration, (to[1] - pos[1]) / duration), (to[0], to[1]), duration
+
+    ux, uy = _unit(movement.get('direction'))
+    velocity = (ux * speed, uy * speed)
+    if movement.get('time_span') is not None:
+        duration = movement['time_span']
+    elif movement.get('distance') is not None and speed > 0:
+        duration = movement['distance'] / speed
+    else:
+        duration = inf
+    if duration == inf:
+        return velocity, pos, inf
+    return velocity, (pos[0] + velocity[0] * duration, pos[1] + velocity[1] * duration), duration
+
+
+class SpriteMotion:
+    '''
+    Local model of the movement of a sprite. Positions are extrapolated from the last known position with the
+    direction and speed of the sprite (or its movement sequence), without any network traffic.
+
+    Speeds are interpreted as playground units per second, directions are normalized.
+    '''
+
+    def __init__(self, pos: Point, t: float):
+        self.origin: Point = pos
+        self.t0 = t
+        # continuous auto-movement
+        self.velocity: Point = (0.0, 0.0)
+        self.speed: Number = 0
+        self.t_start = t
+        self.travelled = 0.0
+        self.time_span: Optional[Number] = None
+        self.distance: Optional[Number] = None
+        # movement sequence
+        self.movements: List[AutoMovement] = []
+        self.repeat: Number = 1
+        self.cycle = False
+
+    @property
+    def has_sequence(self) -> bool:
+        return len(self.movements) > 0
+
+    def update(self, sprite: dict, t: float):
+        '''
+        applies the changes of an `add_sprite`/`update_sprite` call at time `t`
+        '''
+        current = self.position(t)
+        pos = (
+            sprite['pos_x'] if sprite.get('pos_x') is not None else current[0],
+            sprite['pos_y'] if sprite.get('pos_y') is not None else current[1]
+        )
+        if 'movements' in sprite and sprite['movements'] is not None:
+            sequence = sprite['movements']
+            if sequence.get('cancel_previous', True) or not self.has_sequence:
+                self.movements = list(sequence.get('movements', []))
+                self.repeat = sequence.get('repeat') or 1
+                self.cycle = bool(sequence.get('cycle'))
+                self.origin = pos
+                self.t0 = t
+                self.velocity = (0.0, 0.0)
+                return
+            self.movements.extend(sequence.get('movements', []))
+
+        if self.has_sequence:
+            # an explicit position shifts the ongoing sequence
+            self.origin = (self.origin[0] + pos[0] - current[0], self.origin[1] + pos[1] - current[1])
+            return
+
+        self.travelled += self.speed * self.__moving_time(t)
+        self.origin = pos
+        self.t0 = t
+        if sprite.get('reset_time'):
+            self.t_start = t
+            self.travelled = 0.0
+        if 'time_span' in sprite:
+            self.time_span = sprite['time_span']
+        if 'distance' in sprite:
+            self.distance = sprite['distance']
+        if 'speed' in sprite or 'direction' in sprite:
+            if self.speed == 0:
+                self.t_start = t
+                self.travelled = 0.0
+            self.speed = sprite.get('speed', self.speed) or 0
+            ux, uy = _unit(sprite['direction']) if 'direction' in sprite else _unit(self.velocity)
+            self.velocity = (ux * self.speed, uy * self.speed)
+
+    def rebase(self, x: Number, y: Number, t: float):
+        '''
+        synchronizes the model with a reported position. Within a sequence, the report is expected at the end
+        of a movement: the timeline is shifted such that the nearest segment boundary matches `t`.
+        '''
+        if not self.has_sequence:
+            self.travelled += self.speed * self.__moving_time(t)
+            self.origin = (x, y)
+            self.t0 = t
+            return
+        boundary = self.__nearest_boundary(t - self.t0)
+        if boundary is None:
+            self.origin = (x, y)
+            self.t0 = t
+            return
+        expected = self.__sequence_position(boundary)
+        self.t0 = t - boundary
+        if not any(m.get('movement') == 'absolute' for m in self.movements):
+            self.origin = (self.origin[0] + x - expected[0], self.origin[1] + y - expected[1])
+
+    def position(self, t: float) -> Point:
+        '''
+        the extrapolated position at time `t` (seconds, same time base as `time_s()`)
+        '''
+        if self.has_sequence:
+            return self.__sequence_position(t - self.t0)
+        dt = self.__moving_time(t)
+        return (self.origin[0] + self.velocity[0] * dt, self.origin[1] + self.velocity[1] * dt)
+
+    def __moving_time(self, t: float) -> float:
+        dt = t - self.t0
+        if self.time_span is not None:
+            dt = min(dt, self.t_start + self.time_span - self.t0)
+        if self.distance is not None and self.speed > 0:
+            dt = min(dt, (self.distance - self.travelled) / self.speed)
+        return max(dt, 0)
+
+    def __runs(self):
+        return inf if self.cycle else self.repeat
+
+    def __sequence_position(self, dt: float) -> Point:
+        pos = self.origin
+        remaining = max(dt, 0)
+        has_absolute = any(m.get('movement') == 'absolute' for m in self.movements)
+        runs = self.__runs()
+        run = 0
+        while run < runs:
+            start = pos
+            total = 0.0
+            for movement in self.movements:
+                velocity, end, duration = _segment(pos, movement)
+                if remaining < duration:
+                    return (pos[0] + velocity[0] * remaining, pos[1] + velocity[1] * remaining)
+                remaining -= duration
+                total += duration
+                pos = end
+            run += 1
+            if total <= 0:
+                break
+            if run >= 2 or not has_absolute:
+                # from here on, each run takes the same time and displaces the sprite by the same offset
+                k = min(floor(remaining / total), runs - run)
+                pos = (pos[0] + k * (pos[0] - start[0]), pos[1] + k * (pos[1] - start[1]))
+                remaining -= k * total
+                run += k
+        return pos
+
+    def __nearest_boundary(self, dt: float) -> Optional[float]:
+        '''
+        the time (relative to t0) of the segment boundary nearest to dt
+        '''
+        pos = self.origin
+        elapsed = 0.0
+        best = None
+        runs = self.__runs()
+        run = 0
+        while run < runs and elapsed <= dt:
+            total = 0.0
+            for movement in self.movements:
+                _, pos, duration = _segment(pos, movement)
+                if duration == inf:
+                    return best
+                elapsed += duration
+                total += duration
+                if best is None or abs(elapsed - dt) < abs(best - dt):
+                    best = elapsed
+                if elapsed > dt:
+                    return best
+            run += 1
+            if total <= 0:
+                break
+            if run >= 2:
+                # periodic - skip the runs ending before dt
+                k = max(min(floor((dt - elapsed) / total), runs - run), 0)
+                elapsed += k * total
+                run += k
+        return best
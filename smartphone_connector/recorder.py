@@ -0,0 +1,238 @@
+import gzip
+import json
+import logging
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, Literal, Optional, Union
+from .dictx import DictX
+from .helpers import time_s
+
+RecordFormat = Literal['jsonl', 'frames']
+
+DEFAULT_BUFFER_SIZE = 10000
+DEFAULT_FLUSH_INTERVAL = 1.0
+# header of the framed format
+FRAMES_MAGIC = b'SCREC\x01'
+# payload length, time stamp, flags
+FRAME_HEADER = struct.Struct('>IdB')
+FLAG_OUTBOUND = 1
+
+
+def record_format(file: Union[Path, str]) -> RecordFormat:
+    '''
+    `*.jsonl` and `*.jsonl.gz` (or `*.gz`) files are json lines (gzip compressed), all others framed
+    '''
+    suffixes = Path(file).suffixes
+    if '.jsonl' in suffixes or (len(suffixes) > 0 and suffixes[-1] == '.gz'):
+        return 'jsonl'
+    return 'frames'
+
+
+def _json_default(obj: Any):
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (bytes, bytearray)):
+        # binary payloads (e.g. assets) are not recorded
+        return f'<{len(obj)} bytes>'
+    return str(obj)
+
+
+def encode_record(event: str, data: Any, outbound: bool = False, time_stamp: Optional[float] = None, format: RecordFormat = 'jsonl') -> bytes:
+    t = time_stamp if time_stamp is not None else time_s()
+    if format == 'jsonl':
+        record = {'time_stamp': t, 'event': event, 'data': data}
+        if outbound:
+            record['outbound'] = True
+        return json.dumps(record, separators=(',', ':'), default=_json_default).encode('utf-8') + b'\n'
+    payload = json.dumps([event, data], separators=(',', ':'), default=_json_default).encode('utf-8')
+    return FRAME_HEADER.pack(len(payload), t, FLAG_OUTBOUND if outbound else 0) + payload
+
+
+def _open(file: Path, mode: str) -> IO[bytes]:
+    if file.suffix == '.gz':
+        return gzip.open(file, mode)
+    return open(file, mode)
+
+
+def read_records(file: Union[Path, str], outbound: bool = False) -> Iterator[DictX]:
+    '''
+    reads a recorded session
+
+    Optional
+    --------
+    outbound : bool
+        wheter to include the recorded outbound messages
+
+    Return
+    ------
+    Iterator[DictX]
+        the records `{'time_stamp', 'event', 'data', 'outbound'}` in the recorded order
+    '''
+    file = Path(file)
+    format = record_format(file)
+    with _open(file, 'rb') as f:
+        if format == 'jsonl':
+            for line in f:
+                if len(line.strip()) == 0:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the last line of an interrupted recording may be incomplete
+                    logging.warn(f'skipping corrupt record in {file}')
+                    continue
+                record['outbound'] = record.get('outbound', False)
+                if outbound or not record['outbound']:
+                    yield DictX(record)
+            return
+        if f.read(len(FRAMES_MAGIC)) != FRAMES_MAGIC:
+            raise ValueError(f'{file} is not a recorded session')
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            if header.startswith(FRAMES_MAGIC):
+                # an appended recording starts with a new header
+                f.seek(len(FRAMES_MAGIC) - FRAME_HEADER.size, 1)
+                continue
+            length, t, flags = FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            is_outbound = bool(flags & FLAG_OUTBOUND)
+            if outbound or not is_outbound:
+                event, data = json.loads(payload)
+                yield DictX({'time_stamp': t, 'event': event, 'data': data, 'outbound': is_outbound})
+
+
+class SessionRecorder(threading.Thread):
+    '''
+    Streams messages to an append-only file. The messages are serialized when they are recorded and written
+    by this background thread, the buffer between both is bounded - thus a recording can run for hours with
+    constant memory.
+
+    Files ending with `.jsonl.gz` (or `.gz`) are written as gzip compressed json lines, `.jsonl` as plain
+    json lines and all others in a compact framed format (a header with the payload length, time stamp
+    and direction per message).
+    '''
+
+    def __init__(self,
+                 file: Union[Path, str],
+                 outbound: bool = False,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 drop_when_full: bool = False,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        '''
+        Parameters
+        ----------
+        file : Path | str
+            the recording is appended to this file
+
+        Optional
+        --------
+        outbound : bool
+            wheter to record the sent messages too
+
+        buffer_size : int
+            the maximal number of messages waiting to be written
+
+        drop_when_full : bool
+            drop messages when the buffer is full instead of waiting for the writer
+
+        flush_interval : float
+            seconds after which written messages are flushed to the disk
+        '''
+        super().__init__(daemon=True)
+        self.file = Path(file)
+        self.format = record_format(self.file)
+        self.outbound = outbound
+        self.drop_when_full = drop_when_full
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.dropped = 0
+        self.__buffer: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self.__stopped = threading.Event()
+        # guards stopping against the messages being enqueued
+        self.__lock = threading.Condition()
+        self.__enqueuing = 0
+
+    def record(self, event: str, data: Any, outbound: bool = False):
+        '''
+        records a message (thread safe)
+        '''
+        if self.__stopped.is_set() or (outbound and not self.outbound):
+            return
+        try:
+            frame = encode_record(event, data, outbound=outbound, format=self.format)
+        except (TypeError, ValueError) as e:
+            logging.warn(f'message not recorded: {e}')
+            return
+        with self.__lock:
+            if self.__stopped.is_set():
+                return
+            self.__enqueuing += 1
+        enqueued = False
+        try:
+            enqueued = self.__enqueue(frame)
+        finally:
+            with self.__lock:
+                if enqueued:
+                    self.recorded += 1
+                else:
+                    self.dropped += 1
+                self.__enqueuing -= 1
+                self.__lock.notify_all()
+
+    def __enqueue(self, frame: bytes) -> bool:
+        while True:
+            # only wait while the writer is running, it may have stopped due to an error
+            block = not self.drop_when_full and self.is_alive()
+            try:
+                self.__buffer.put(frame, block=block, timeout=self.flush_interval)
+                return True
+            except queue.Full:
+                if not block:
+                    return False
+
+    def stop(self, timeout: Optional[float] = None):
+        '''
+        writes the buffered messages and closes the file
+        '''
+        with self.__lock:
+            if self.__stopped.is_set():
+                return
+            self.__stopped.set()
+            # the messages being enqueued are written before the end of the recording
+            self.__lock.wait_for(lambda: self.__enqueuing == 0, timeout)
+        try:
+            # a writer which was never started does not wait for the end of the recording
+            self.__buffer.put(None, block=self.is_alive(), timeout=timeout)
+        except queue.Full:
+            pass
+        if self.is_alive():
+            self.join(timeout)
+
+    @property
+    def is_recording(self) -> bool:
+        return not self.__stopped.is_set()
+
+    def run(self):
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with _open(self.file, 'ab') as f:
+            if self.format == 'frames':
+                f.write(FRAMES_MAGIC)
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    frame = self.__buffer.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    frame = b''
+                if frame is None:
+                    break
+                f.write(frame)
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    f.flush()
+                    last_flush = time.monotonic()
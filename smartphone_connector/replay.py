@@ -0,0 +1,121 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from .clock import Clock, get_clock
+from .recorder import read_records
+
+
+class ReplaySource(threading.Thread):
+    '''
+    Replays a recorded session (see `Connector.start_recording(file)`): the recorded messages are handed to
+    `deliver(event, data)` at their original timing, at a scaled speed or as fast as possible.
+
+    Use `Connector.replay` to feed the messages through the ingest path of a connector, thus all callbacks,
+    subscriptions and the gathered data behave as if the phones were connected.
+    '''
+
+    def __init__(self,
+                 source: Union[Path, str, Iterable[dict]],
+                 speed: Optional[float] = 1,
+                 events: Optional[List[str]] = None,
+                 retime: bool = False,
+                 clock: Optional[Clock] = None):
+        '''
+        Parameters
+        ----------
+        source : Path | str | Iterable[dict]
+            the recorded file or records `{'time_stamp', 'event', 'data'}`
+
+        Optional
+        --------
+        speed : float
+            1 replays at the original timing, 2 twice as fast, ... `None` replays as fast as possible
+
+        events : List[str]
+            replay only these socket events (e.g. `['new_data']`), by default all
+
+        retime : bool
+            shift the time stamps of the messages to the time of the replay
+
+        clock : Clock
+            the clock used for the timing, by default the clock set with `set_clock`
+        '''
+        super().__init__(daemon=True)
+        self.source = source
+        self.speed = speed
+        self.events = events
+        self.retime = retime
+        self.clock = clock if clock is not None else get_clock()
+        self.deliver: Optional[Callable[[str, dict], None]] = None
+        self.replayed = 0
+        self.__stopped = threading.Event()
+
+    def records(self) -> Iterable[dict]:
+        if isinstance(self.source, (str, Path)):
+            return read_records(self.source)
+        return self.source
+
+    def stop(self):
+        self.__stopped.set()
+        self.clock.interrupt()
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.__stopped.is_set()
+
+    def play(self, deliver: Optional[Callable[[str, dict], None]] = None) -> int:
+        '''
+        replays the session in the current thread. With a `VirtualClock`, the replay advances the clock
+        to the time of each message (a background replay started with `start()` waits for the clock instead).
+
+        Return
+        ------
+        int
+            the number of replayed messages
+        '''
+        deliver = deliver if deliver is not None else self.deliver
+        if deliver is None:
+            raise Exception('No receiver for the replayed messages')
+        t_record = None
+        t_replay = None
+        for record in self.records():
+            if self.is_stopped:
+                break
+            if self.events is not None and record['event'] not in self.events:
+                continue
+            if t_record is None:
+                t_record = record['time_stamp']
+                t_replay = self.clock.time()
+            if self.speed is not None and self.speed > 0:
+                # scheduled relative to the start, thus delays do not accumulate
+                due = t_replay + (record['time_stamp'] - t_record) / self.speed
+                delay = due - self.clock.time()
+                if delay > 0:
+                    if self.clock.virtual and threading.current_thread() is not self:
+                        # nobody else advances a virtual clock for a blocking replay: the replay moves
+                        # the time forward itself (running the jobs due in between)
+                        self.clock.sleep(delay)
+                        if self.is_stopped:
+                            break
+                    elif self.clock.wait(self.__stopped, delay):
+                        break
+            data = record['data']
+            if self.retime and isinstance(data, dict) and 'time_stamp' in data:
+                data['time_stamp'] = data['time_stamp'] - t_record + t_replay
+            try:
+                deliver(record['event'], data)
+            except Exception as e:
+                logging.warn(e)
+            self.replayed += 1
+        return self.replayed
+
+    def run(self):
+        try:
+            self.play()
+        finally:
+            self.clock.release(self)
+
+    def start(self):
+        self.clock.register(self)
+        super().start()
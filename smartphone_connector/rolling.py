@@ -0,0 +1,169 @@
+from collections import deque
+from math import exp, sqrt
+from typing import Deque, Optional, Tuple
+
+
+class RollingWindow:
+    '''
+    Aggregates of the values of the last `window` seconds, updated incrementally with each sample:
+    mean, variance and rms with Welford's method, min and max with monotonic queues and an exponential
+    moving average - each update is O(1) (amortized), each query O(1).
+
+    The window is measured with the time stamps of the samples and ends at the latest sample. Late samples
+    (received out of order) are kept as if they arrived with the latest sample, samples which are already
+    outside of the window are ignored.
+    '''
+
+    def __init__(self, window: float = 1.0, ema_time_constant: Optional[float] = None):
+        '''
+        Optional
+        --------
+        window : float
+            length of the window in seconds
+
+        ema_time_constant : float
+            time constant (seconds) of the exponential moving average, by default the window length
+        '''
+        self.window = window
+        self.ema_time_constant = ema_time_constant if ema_time_constant is not None else window
+        self.__samples: Deque[Tuple[float, float]] = deque()
+        self.__mins: Deque[Tuple[float, float]] = deque()
+        self.__maxs: Deque[Tuple[float, float]] = deque()
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__ema: Optional[float] = None
+        self.__t_last: Optional[float] = None
+        # value of the sample with the latest time stamp
+        self.__latest: Optional[float] = None
+
+    def add(self, t: float, value: float):
+        '''
+        adds the sample and drops the samples older than the window
+        '''
+        if self.__t_last is not None and t < self.__t_last - self.window:
+            return
+        if self.__ema is None:
+            self.__ema = value
+        else:
+            dt = max(t - self.__t_last, 0)
+            alpha = 1 - exp(-dt / self.ema_time_constant) if self.ema_time_constant > 0 else 1
+            self.__ema += alpha * (value - self.__ema)
+        if self.__t_last is None or t >= self.__t_last:
+            self.__t_last = t
+            self.__latest = value
+        # the queues stay ordered by time, thus all three evict the same samples
+        t = self.__t_last
+
+        self.__samples.append((t, value))
+        n = len(self.__samples)
+        delta = value - self.__mean
+        self.__mean += delta / n
+        self.__m2 += delta * (value - self.__mean)
+        while len(self.__mins) > 0 and self.__mins[-1][1] >= value:
+            self.__mins.pop()
+        self.__mins.append((t, value))
+        while len(self.__maxs) > 0 and self.__maxs[-1][1] <= value:
+            self.__maxs.pop()
+        self.__maxs.append((t, value))
+        self.__evict(self.__t_last - self.window)
+
+    def __evict(self, t_min: float):
+        while len(self.__samples) > 1 and self.__samples[0][0] < t_min:
+            _, value = self.__samples.popleft()
+            n = len(self.__samples)
+            delta = value - self.__mean
+            self.__mean -= delta / n
+            self.__m2 -= delta * (value - self.__mean)
+        while len(self.__mins) > 0 and self.__mins[0][0] < t_min:
+            self.__mins.popleft()
+        while len(self.__maxs) > 0 and self.__maxs[0][0] < t_min:
+            self.__maxs.popleft()
+        if len(self.__samples) == 1:
+            # no accumulated rounding errors for a single sample
+            self.__mean = self.__samples[0][1]
+            self.__m2 = 0.0
+
+    def clear(self):
+        self.__samples.clear()
+        self.__mins.clear()
+        self.__maxs.clear()
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__ema = None
+        self.__t_last = None
+        self.__latest = None
+
+    @property
+    def count(self) -> int:
+        return len(self.__samples)
+
+    @property
+    def mean(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return self.__mean
+
+    @property
+    def sum(self) -> float:
+        return self.__mean * self.count
+
+    @property
+    def variance(self) -> Optional[float]:
+        '''
+        population variance of the values within the window
+        '''
+        if self.count == 0:
+            return None
+        return max(self.__m2 / self.count, 0.0)
+
+    @property
+    def std(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return sqrt(self.variance)
+
+    @property
+    def rms(self) -> Optional[float]:
+        '''
+        root mean square of the values within the window
+        '''
+        if self.count == 0:
+            return None
+        return sqrt(self.variance + self.__mean ** 2)
+
+    @property
+    def min(self) -> Optional[float]:
+        if len(self.__mins) == 0:
+            return None
+        return self.__mins[0][1]
+
+    @property
+    def max(self) -> Optional[float]:
+        if len(self.__maxs) == 0:
+            return None
+        return self.__maxs[0][1]
+
+    @property
+    def peak(self) -> Optional[float]:
+        '''
+        the largest absolute value within the window
+        '''
+        if self.count == 0:
+            return None
+        return max(abs(self.min), abs(self.max))
+
+    @property
+    def ema(self) -> Optional[float]:
+        '''
+        exponential moving average (over all samples, weighted by `ema_time_constant`)
+        '''
+        return self.__ema
+
+    @property
+    def latest(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return self.__latest
+
+    def __repr__(self):
+        return f'<RollingWindow window={self.window} count={self.count} mean={self.mean} min={self.min} max={self.max}>'
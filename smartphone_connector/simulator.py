@@ -0,0 +1,510 @@
+from math import hypot, inf
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from .clock import Clock, get_clock
+from .dictx import DictX
+from .helpers import time_s
+from .motion import _segment, _unit
+from .types import DataType, Number
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# message types handled by the simulator instead of the phone
+PLAYGROUND_TYPES = frozenset([
+    DataType.SPRITE,
+    DataType.SPRITES,
+    DataType.REMOVE_SPRITE,
+    DataType.LINE,
+    DataType.LINES,
+    DataType.REMOVE_LINE,
+    DataType.PLAYGROUND_CONFIG,
+    DataType.CLEAR_PLAYGROUND,
+    DataType.CLEAN_PLAYGROUND,
+    DataType.ASSET_CHUNK
+])
+
+DEFAULT_FRAME_RATE = 60
+BORDERS = ('left', 'right', 'bottom', 'top')
+
+# columns of the sprite table
+X, Y, VX, VY, W, H, AX, AY, SPEED, LEFT, END = range(11)
+COLUMNS = 11
+
+
+class _SimSprite:
+    '''
+    state of a simulated sprite which is not part of the (vectorized) sprite table
+    '''
+
+    def __init__(self, sprite: dict, t: float):
+        self.data = dict(sprite)
+        self.row: List[float] = [0.0] * COLUMNS
+        self.row[LEFT] = inf
+        self.row[END] = inf
+        self.t_start = t
+        self.borders = [False] * len(BORDERS)
+        self.direction: Tuple[float, float] = (0.0, 0.0)
+        # movement sequence
+        self.movements: List[dict] = []
+        self.index = 0
+        self.run = 0
+        self.runs: Number = 1
+        self.run_duration = 0.0
+        self.exit_on_done = False
+        self.segment: Optional[Tuple[Tuple[float, float], Tuple[float, float], float]] = None
+
+    @property
+    def has_sequence(self) -> bool:
+        return self.segment is not None
+
+    def update(self, sprite: dict, t: float):
+        self.data.update(sprite)
+        row = self.row
+        if sprite.get('pos_x') is not None:
+            row[X] = sprite['pos_x']
+        if sprite.get('pos_y') is not None:
+            row[Y] = sprite['pos_y']
+        if sprite.get('width') is not None:
+            row[W] = sprite['width']
+        if sprite.get('height') is not None:
+            row[H] = sprite['height']
+        if sprite.get('anchor') is not None:
+            row[AX], row[AY] = sprite['anchor'][0], sprite['anchor'][1]
+        if sprite.get('reset_time'):
+            self.t_start = t
+        if 'time_span' in sprite or sprite.get('reset_time'):
+            time_span = self.data.get('time_span')
+            row[END] = self.t_start + time_span if time_span is not None else inf
+        if 'distance' in sprite or sprite.get('reset_time'):
+            distance = self.data.get('distance')
+            row[LEFT] = distance if distance is not None else inf
+        if 'direction' in sprite:
+            self.direction = _unit(sprite['direction'])
+        if 'speed' in sprite:
+            row[SPEED] = sprite['speed'] or 0
+        if sprite.get('movements') is not None:
+            self.__apply_movements(sprite['movements'])
+        if not self.has_sequence:
+            row[VX], row[VY] = self.direction[0] * row[SPEED], self.direction[1] * row[SPEED]
+
+    def __apply_movements(self, sequence: dict):
+        if sequence.get('cancel_previous', True) or not self.has_sequence:
+            self.movements = list(sequence.get('movements', []))
+            self.index = 0
+            self.run = 0
+            self.run_duration = 0.0
+            self.runs = inf if sequence.get('cycle') else (sequence.get('repeat') or 1)
+            self.exit_on_done = bool(sequence.get('exit_on_done'))
+            self.segment = None
+            self.__start_segment()
+        else:
+            self.movements.extend(sequence.get('movements', []))
+
+    def __start_segment(self):
+        while self.run < self.runs and len(self.movements) > 0:
+            if self.index >= len(self.movements):
+                if self.run_duration <= 0:
+                    # a run without any duration would never end
+                    break
+                self.index = 0
+                self.run += 1
+                self.run_duration = 0.0
+                continue
+            self.segment = _segment((self.row[X], self.row[Y]), self.movements[self.index])
+            self.row[VX], self.row[VY] = self.segment[0]
+            return
+        self.segment = None
+        self.movements = []
+        self.row[VX], self.row[VY] = 0.0, 0.0
+
+    def advance_sequence(self, dt: float, on_movement_end: Callable[[int], None]) -> bool:
+        '''
+        moves the sprite along its movement sequence for `dt` seconds.
+        Returns `False` when the sequence finished and the sprite should exit.
+        '''
+        remaining = dt
+        while self.segment is not None and remaining > 0:
+            velocity, end, duration = self.segment
+            if duration > remaining:
+                self.row[X] += velocity[0] * remaining
+                self.row[Y] += velocity[1] * remaining
+                self.segment = (velocity, end, duration - remaining)
+                self.run_duration += remaining
+                return True
+            self.row[X], self.row[Y] = end
+            remaining -= duration
+            self.run_duration += duration
+            on_movement_end(self.index)
+            self.index += 1
+            self.__start_segment()
+            if self.segment is None:
+                return not self.exit_on_done
+        return True
+
+
+class PlaygroundSimulator:
+    '''
+    Headless playground: consumes the playground messages a `Connector` emits (sprites, lines, movements,
+    playground config) and produces the events the phone would report (`sprite_collision`, `border_overlap`,
+    `sprite_out`, `sprite_removed`, `auto_movement_pos`).
+
+    The simulator runs on a virtual clock which only advances with `step` or `run`, thus a game can be
+    simulated much faster than in real time. Given a `VirtualClock`, the simulation advances it in lockstep:
+    the jobs due within a frame (e.g. the game loop) run before the frame is simulated. With NumPy installed, the sprites are advanced and
+    checked for collisions vectorized.
+
+    Approximations: sprites are treated as axis aligned rectangles (rotation and round forms are ignored),
+    speeds are playground units per second and lines do not collide.
+    '''
+
+    def __init__(self,
+                 on_event: Optional[Callable[[DictX], None]] = None,
+                 device_id: str = 'simulator',
+                 device_nr: int = 0,
+                 frame_rate: Number = DEFAULT_FRAME_RATE,
+                 start_time: Optional[float] = None,
+                 vectorize: bool = True,
+                 clock: Optional[Clock] = None):
+        '''
+        Optional
+        --------
+        on_event : Callable[[DictX], None]
+            called with each produced event
+
+        frame_rate : Number
+            simulated frames per second, events are detected once per frame
+
+        start_time : float
+            virtual time (seconds since epoche) at the start, by default the time of the clock
+
+        vectorize : bool
+            use NumPy when it is installed
+
+        clock : Clock
+            by default the clock set with `set_clock`. A `VirtualClock` is advanced with the simulation.
+        '''
+        self.on_event = on_event
+        self.device_id = device_id
+        self.device_nr = device_nr
+        self.frame_rate = frame_rate
+        self.clock = clock if clock is not None else get_clock()
+        self.time = start_time if start_time is not None else time_s(self.clock)
+        self.vectorize = vectorize and np is not None
+        self.config = DictX({'width': 100, 'height': 100, 'shift_x': 0, 'shift_y': 0})
+        self.lines: Dict[str, dict] = {}
+        self.__sprites: Dict[str, _SimSprite] = {}
+        self.__order: List[str] = []
+        self.__table = None
+        self.__borders = None
+        self.__dirty = True
+        self.__collisions: Set[Tuple[str, str]] = set()
+        self.__events: List[DictX] = []
+
+    @property
+    def sprites(self) -> List[DictX]:
+        '''
+        the simulated sprites with their current positions
+        '''
+        self.__sync()
+        return [self.__sprite_data(s) for s in self.__sprites.values()]
+
+    def get_sprite(self, id: str) -> Optional[DictX]:
+        self.__sync()
+        if id not in self.__sprites:
+            return None
+        return self.__sprite_data(self.__sprites[id])
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        '''
+        `(x_min, y_min, x_max, y_max)` of the playground
+        '''
+        x_min = self.config.get('shift_x') or 0
+        y_min = self.config.get('shift_y') or 0
+        return (x_min, y_min, x_min + self.config['width'], y_min + self.config['height'])
+
+    def receive(self, data: dict):
+        '''
+        applies a message sent to the playground
+        '''
+        dtype = data.get('type')
+        if dtype == DataType.SPRITE:
+            self.__set_sprite(data['sprite'])
+        elif dtype == DataType.SPRITES:
+            for sprite in data['sprites']:
+                self.__set_sprite(sprite)
+        elif dtype == DataType.REMOVE_SPRITE:
+            self.__remove(data['id'])
+        elif dtype == DataType.LINE:
+            self.__set_line(data['line'])
+        elif dtype == DataType.LINES:
+            for line in data['lines']:
+                self.__set_line(line)
+        elif dtype == DataType.REMOVE_LINE:
+            self.lines.pop(data['id'], None)
+        elif dtype == DataType.PLAYGROUND_CONFIG:
+            self.config.update({k: v for k, v in data['config'].items() if k not in ['images', 'audio_tracks']})
+        elif dtype in [DataType.CLEAR_PLAYGROUND, DataType.CLEAN_PLAYGROUND]:
+            self.__sprites = {}
+            self.__collisions = set()
+            self.__dirty = True
+            self.lines = {}
+            if dtype == DataType.CLEAR_PLAYGROUND:
+                self.config = DictX({'width': 100, 'height': 100, 'shift_x': 0, 'shift_y': 0})
+
+    def step(self, dt: Optional[float] = None) -> List[DictX]:
+        '''
+        advances the simulation by one frame (or by `dt` seconds) and delivers the produced events
+
+        Return
+        ------
+        List[DictX]
+            the produced events
+        '''
+        if dt is None:
+            dt = 1 / self.frame_rate
+        if self.clock.virtual:
+            # job threads wait for the frame, any other thread runs the jobs due within it
+            self.clock.sleep(dt)
+        self.time += dt
+        self.__rebuild()
+        self.__advance(dt)
+        self.__advance_sequences(dt)
+        self.__detect()
+        events, self.__events = self.__events, []
+        if self.on_event is not None:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def run(self, duration: float, until: Optional[Callable[[], bool]] = None) -> int:
+        '''
+        simulates `duration` seconds of virtual time as fast as possible
+
+        Optional
+        --------
+        until : Callable[[], bool]
+            checked after each frame, stops the simulation when it returns True
+
+        Return
+        ------
+        int
+            the number of simulated frames
+        '''
+        frames = 0
+        end = self.time + duration
+        while self.time < end - 1e-9:
+            self.step(min(1 / self.frame_rate, end - self.time))
+            frames += 1
+            if until is not None and until():
+                break
+        return frames
+
+    def __set_sprite(self, sprite: dict):
+        if 'id' not in sprite:
+            return
+        self.__sync()
+        state = self.__sprites.get(sprite['id'])
+        if state is None:
+            state = _SimSprite(sprite, self.time)
+            self.__sprites[sprite['id']] = state
+        state.update(sprite, self.time)
+        self.__dirty = True
+
+    def __set_line(self, line: dict):
+        if 'id' not in line:
+            return
+        if line['id'] in self.lines:
+            self.lines[line['id']].update(line)
+        else:
+            self.lines[line['id']] = dict(line)
+
+    def __remove(self, id: str) -> Optional[_SimSprite]:
+        self.__sync()
+        state = self.__sprites.pop(id, None)
+        if state is not None:
+            self.__collisions = set(pair for pair in self.__collisions if id not in pair)
+            self.__dirty = True
+        return state
+
+    def __sprite_data(self, state: _SimSprite) -> DictX:
+        return DictX({**state.data, 'pos_x': state.row[X], 'pos_y': state.row[Y]})
+
+    def __emit(self, data: dict):
+        self.__events.append(DictX({
+            **data,
+            'time_stamp': self.time,
+            'device_id': self.device_id,
+            'device_nr': self.device_nr
+        }))
+
+    def __sync(self):
+        '''
+        writes the table back to the sprite states
+        '''
+        if self.__table is None:
+            return
+        rows = self.__table.tolist() if self.vectorize else self.__table
+        borders = self.__borders.tolist() if self.vectorize else self.__borders
+        for i, id in enumerate(self.__order):
+            if id in self.__sprites:
+                self.__sprites[id].row = list(rows[i])
+                self.__sprites[id].borders = list(borders[i])
+        self.__table = None
+
+    def __rebuild(self):
+        if not self.__dirty and self.__table is not None:
+            return
+        self.__sync()
+        self.__order = list(self.__sprites.keys())
+        states = [self.__sprites[id] for id in self.__order]
+        if self.vectorize:
+            self.__table = np.array([s.row for s in states], dtype=float).reshape(len(states), COLUMNS)
+            self.__borders = np.array([s.borders for s in states], dtype=bool).reshape(len(states), len(BORDERS))
+        else:
+            # the rows are shared with the sprite states
+            self.__table = [s.row for s in states]
+            self.__borders = [s.borders for s in states]
+        self.__dirty = False
+
+    def __advance(self, dt: float):
+        table = self.__table
+        if self.vectorize:
+            table[:, X] += table[:, VX] * dt
+            table[:, Y] += table[:, VY] * dt
+            table[:, LEFT] -= np.hypot(table[:, VX], table[:, VY]) * dt
+            expired = np.nonzero((table[:, LEFT] <= 0) | (table[:, END] <= self.time))[0].tolist()
+        else:
+            expired = []
+            for i, row in enumerate(table):
+                row[X] += row[VX] * dt
+                row[Y] += row[VY] * dt
+                row[LEFT] -= hypot(row[VX], row[VY]) * dt
+                if row[LEFT] <= 0 or row[END] <= self.time:
+                    expired.append(i)
+        for id in [self.__order[i] for i in expired]:
+            self.__remove(id)
+            self.__emit({'type': DataType.SPRITE_REMOVED, 'id': id})
+        self.__rebuild()
+
+    def __advance_sequences(self, dt: float):
+        exits = []
+        for i, id in enumerate(self.__order):
+            state = self.__sprites[id]
+            if not state.has_sequence:
+                continue
+            # the vectorized step already moved the sprite along the current segment
+            row = self.__table[i]
+            state.row[X] = float(row[X]) - float(row[VX]) * dt
+            state.row[Y] = float(row[Y]) - float(row[VY]) * dt
+
+            def on_movement_end(index: int, id=id, state=state):
+                self.__emit({
+                    'type': DataType.AUTO_MOVEMENT_POS,
+                    'id': id,
+                    'movement_id': str(index),
+                    'x': state.row[X],
+                    'y': state.row[Y]
+                })
+            if not state.advance_sequence(dt, on_movement_end):
+                exits.append(id)
+            for col in [X, Y, VX, VY]:
+                row[col] = state.row[col]
+        for id in exits:
+            self.__remove(id)
+            self.__emit({'type': DataType.SPRITE_REMOVED, 'id': id})
+        self.__rebuild()
+
+    def __boxes(self):
+        table = self.__table
+        if self.vectorize:
+            x0 = table[:, X] - table[:, AX] * table[:, W]
+            y0 = table[:, Y] - table[:, AY] * table[:, H]
+            return x0, y0, x0 + table[:, W], y0 + table[:, H]
+        x0 = [row[X] - row[AX] * row[W] for row in table]
+        y0 = [row[Y] - row[AY] * row[H] for row in table]
+        return x0, y0, [x + row[W] for x, row in zip(x0, table)], [y + row[H] for y, row in zip(y0, table)]
+
+    def __detect(self):
+        if len(self.__order) == 0:
+            return
+        x_min, y_min, x_max, y_max = self.bounds
+        x0, y0, x1, y1 = self.__boxes()
+        if self.vectorize:
+            touching = np.stack([x0 < x_min, x1 > x_max, y0 < y_min, y1 > y_max], axis=1)
+            entered = np.nonzero(touching & ~self.__borders)
+            entered = list(zip(entered[0].tolist(), entered[1].tolist()))
+            self.__borders = touching
+            out = np.nonzero((x1 < x_min) | (x0 > x_max) | (y1 < y_min) | (y0 > y_max))[0].tolist()
+        else:
+            entered = []
+            out = []
+            for i in range(len(self.__order)):
+                touching = [x0[i] < x_min, x1[i] > x_max, y0[i] < y_min, y1[i] > y_max]
+                entered.extend((i, b) for b in range(len(BORDERS)) if touching[b] and not self.__borders[i][b])
+                self.__borders[i][:] = touching
+                if x1[i] < x_min or x0[i] > x_max or y1[i] < y_min or y0[i] > y_max:
+                    out.append(i)
+
+        for i, b in entered:
+            state = self.__sprites[self.__order[i]]
+            self.__emit({
+                'type': DataType.BORDER_OVERLAP,
+                'id': self.__order[i],
+                'border': BORDERS[b],
+                'collision_detection': bool(state.data.get('collision_detection')),
+                'x': float(self.__table[i][X]),
+                'y': float(self.__table[i][Y])
+            })
+        self.__detect_collisions(x0, y0, x1, y1)
+        for id in [self.__order[i] for i in out]:
+            self.__emit({'type': DataType.SPRITE_OUT, 'id': id})
+            self.__remove(id)
+            self.__emit({'type': DataType.SPRITE_REMOVED, 'id': id})
+
+    def __detect_collisions(self, x0, y0, x1, y1):
+        detecting = [i for i, id in enumerate(self.__order) if self.__sprites[id].data.get('collision_detection')]
+        pairs: List[Tuple[int, int]] = []
+        if len(detecting) > 0:
+            if self.vectorize:
+                d = np.array(detecting)
+                overlap = (
+                    (x0[d, None] < x1[None, :]) & (x1[d, None] > x0[None, :])
+                    & (y0[d, None] < y1[None, :]) & (y1[d, None] > y0[None, :])
+                )
+                overlap[np.arange(len(d)), d] = False
+                rows, cols = np.nonzero(overlap)
+                pairs = [(detecting[r], c) for r, c in zip(rows.tolist(), cols.tolist())]
+            else:
+                for i in detecting:
+                    for j in range(len(self.__order)):
+                        if i != j and x0[i] < x1[j] and x1[i] > x0[j] and y0[i] < y1[j] and y1[i] > y0[j]:
+                            pairs.append((i, j))
+        current: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for i, j in pairs:
+            key = (self.__order[i], self.__order[j])
+            if (key[1], key[0]) not in current:
+                current[key] = (i, j)
+        for key, (i, j) in current.items():
+            if key not in self.__collisions and (key[1], key[0]) not in self.__collisions:
+                self.__emit_collision(i, j, 'in')
+        previous = self.__collisions
+        self.__collisions = set(current.keys())
+        index = {id: i for i, id in enumerate(self.__order)}
+        for key in previous:
+            if key not in current and (key[1], key[0]) not in current:
+                self.__emit_collision(index[key[0]], index[key[1]], 'out')
+
+    def __emit_collision(self, i: int, j: int, overlap: str):
+        sprites = []
+        for k in [i, j]:
+            id = self.__order[k]
+            sprites.append({
+                'id': id,
+                'collision_detection': bool(self.__sprites[id].data.get('collision_detection')),
+                'pos_x': float(self.__table[k][X]),
+                'pos_y': float(self.__table[k][Y])
+            })
+        self.__emit({'type': DataType.SPRITE_COLLISION, 'sprites': sprites, 'overlap': overlap})
@@ -0,0 +1,163 @@
+from math import floor, hypot, inf
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from .types import Number
+
+BBox = Tuple[float, float, float, float]
+Cell = Tuple[int, int]
+
+DEFAULT_CELL_SIZE = 10
+# default anchor of a sprite: its position refers to the lower left corner
+DEFAULT_ANCHOR = (0, 0)
+
+
+def sprite_bbox(sprite: dict) -> BBox:
+    '''
+    the bounding box `(x_min, y_min, x_max, y_max)` of a sprite in playground units (rotation is ignored)
+    '''
+    width = sprite.get('width') or 0
+    height = sprite.get('height') or 0
+    anchor = sprite.get('anchor') or DEFAULT_ANCHOR
+    x = (sprite.get('pos_x') or 0) - anchor[0] * width
+    y = (sprite.get('pos_y') or 0) - anchor[1] * height
+    return (x, y, x + width, y + height)
+
+
+def bbox_distance(bbox: BBox, x: Number, y: Number) -> float:
+    '''
+    distance from the point to the bounding box, 0 when the point lies within
+    '''
+    dx = max(bbox[0] - x, 0, x - bbox[2])
+    dy = max(bbox[1] - y, 0, y - bbox[3])
+    return hypot(dx, dy)
+
+
+class SpatialGrid:
+    '''
+    Uniform grid indexing the bounding boxes of sprites. Each sprite is registered in all cells its
+    bounding box overlaps, thus point and rectangle queries only look at the sprites of the touched cells.
+    '''
+
+    def __init__(self, cell_size: Number = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.__cells: Dict[Cell, Set[str]] = {}
+        self.__boxes: Dict[str, BBox] = {}
+        self.__cells_of: Dict[str, List[Cell]] = {}
+        # bounds of all cells ever occupied (since the last clear), limits the nearest search
+        self.__extent: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self):
+        return len(self.__boxes)
+
+    def __contains__(self, id: str):
+        return id in self.__boxes
+
+    def __cell(self, x: Number, y: Number) -> Cell:
+        return (floor(x / self.cell_size), floor(y / self.cell_size))
+
+    def __covered(self, bbox: BBox) -> Iterator[Cell]:
+        x0, y0 = self.__cell(bbox[0], bbox[1])
+        x1, y1 = self.__cell(bbox[2], bbox[3])
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    def update(self, id: str, bbox: BBox):
+        '''
+        adds or moves the sprite with the given id
+        '''
+        if self.__boxes.get(id) == bbox:
+            return
+        self.remove(id)
+        cells = list(self.__covered(bbox))
+        (x0, y0), (x1, y1) = cells[0], cells[-1]
+        if self.__extent is not None:
+            x0, y0 = min(x0, self.__extent[0]), min(y0, self.__extent[1])
+            x1, y1 = max(x1, self.__extent[2]), max(y1, self.__extent[3])
+        self.__extent = (x0, y0, x1, y1)
+        for cell in cells:
+            self.__cells.setdefault(cell, set()).add(id)
+        self.__boxes[id] = bbox
+        self.__cells_of[id] = cells
+
+    def remove(self, id: str):
+        for cell in self.__cells_of.pop(id, []):
+            ids = self.__cells[cell]
+            ids.discard(id)
+            if len(ids) == 0:
+                del self.__cells[cell]
+        self.__boxes.pop(id, None)
+
+    def clear(self):
+        self.__cells.clear()
+        self.__boxes.clear()
+        self.__cells_of.clear()
+        self.__extent = None
+
+    def rebuild(self, cell_size: Number):
+        '''
+        re-indexes all sprites with a new cell size
+        '''
+        boxes = dict(self.__boxes)
+        self.clear()
+        self.cell_size = cell_size
+        for id, bbox in boxes.items():
+            self.update(id, bbox)
+
+    def at(self, x: Number, y: Number) -> List[str]:
+        '''
+        ids of the sprites whose bounding box contains the point
+        '''
+        ids = self.__cells.get(self.__cell(x, y), ())
+        return [id for id in ids if bbox_distance(self.__boxes[id], x, y) == 0]
+
+    def in_rect(self, x_min: Number, y_min: Number, x_max: Number, y_max: Number) -> List[str]:
+        '''
+        ids of the sprites whose bounding box overlaps the rectangle
+        '''
+        found: Set[str] = set()
+        for cell in self.__covered((x_min, y_min, x_max, y_max)):
+            found.update(self.__cells.get(cell, ()))
+        return [
+            id for id in found
+            if self.__boxes[id][0] <= x_max and self.__boxes[id][2] >= x_min
+            and self.__boxes[id][1] <= y_max and self.__boxes[id][3] >= y_min
+        ]
+
+    def nearest(self, x: Number, y: Number, max_distance: float = inf, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        '''
+        id of the sprite with the nearest bounding box. The cells are searched in rings around the point
+        until no closer sprite is possible.
+        '''
+        if self.__extent is None:
+            return None
+        cx, cy = self.__cell(x, y)
+        x0, y0, x1, y1 = self.__extent
+        max_ring = max(abs(x0 - cx), abs(x1 - cx), abs(y0 - cy), abs(y1 - cy))
+        best: Optional[str] = None
+        best_dist = inf
+        ring = 0
+        # all cells of a ring are at least (ring - 1) * cell_size away from the point
+        while ring <= max_ring and (ring - 1) * self.cell_size <= min(best_dist, max_distance):
+            for cell in self.__ring(cx, cy, ring):
+                for id in self.__cells.get(cell, ()):
+                    if exclude is not None and id in exclude:
+                        continue
+                    dist = bbox_distance(self.__boxes[id], x, y)
+                    if dist < best_dist:
+                        best, best_dist = id, dist
+            ring += 1
+        if best_dist > max_distance:
+            return None
+        return best
+
+    @staticmethod
+    def __ring(cx: int, cy: int, ring: int) -> Iterator[Cell]:
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
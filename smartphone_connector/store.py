@@ -0,0 +1,92 @@
+import threading
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+class SnapshotCache:
+    '''
+    Immutable snapshots of mutable structures for concurrent readers.
+
+    Writers change the structures only while holding `lock` and call `invalidate(key)` for each changed
+    structure before releasing it. Readers get the published snapshot without any locking - only the first
+    read after a change builds the new snapshot (while holding the lock, thus consistent).
+
+    Example
+    -------
+    ```py
+    cache = SnapshotCache()
+    with cache.lock:
+        items.append(item)
+        cache.invalidate('items')
+    ...
+    cache.get('items', lambda: tuple(items))
+    ```
+    '''
+
+    def __init__(self, lock: Optional[threading.RLock] = None):
+        self.lock = lock if lock is not None else threading.RLock()
+        self.__snapshots: Dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        snapshot = self.__snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+        with self.lock:
+            snapshot = self.__snapshots.get(key)
+            if snapshot is None:
+                snapshot = build()
+                self.__snapshots[key] = snapshot
+            return snapshot
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        '''
+        drops the snapshot of the key (or all snapshots) - to be called while holding the lock
+        '''
+        if key is None:
+            self.__snapshots = {}
+        else:
+            self.__snapshots.pop(key, None)
+
+
+class ListSnapshot(Sequence):
+    '''
+    Read-only view on the first `length` items of an append-only list - publishing it is O(1), no matter
+    how long the list is. The list must only be appended to while views on it exist, any other change
+    has to replace the list.
+
+    Example
+    -------
+    ```py
+    with cache.lock:
+        items.append(item)
+        cache.invalidate('items')
+    ...
+    cache.get('items', lambda: ListSnapshot(items))
+    ```
+    '''
+
+    def __init__(self, items: List[Any], length: Optional[int] = None):
+        self.__items = items
+        self.__length = len(items) if length is None else length
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.__length)
+            if step == 1:
+                return self.__items[start:stop]
+            return [self.__items[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self.__length
+        if index < 0 or index >= self.__length:
+            raise IndexError('ListSnapshot index out of range')
+        return self.__items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return islice(self.__items, self.__length)
+
+    def __repr__(self):
+        return f'ListSnapshot({self[:]!r})'
@@ -0,0 +1,143 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Iterator, Literal, Optional
+from .dictx import DictX
+
+StreamPolicy = Literal['drop_oldest', 'drop_newest', 'block']
+
+DEFAULT_STREAM_SIZE = 1000
+DEFAULT_BLOCK_TIMEOUT = 1.0
+
+
+class MessageStream:
+    '''
+    A bounded queue of received messages, consumed by iterating over it:
+
+    ```py
+    for msg in device.stream('acceleration'):
+        ...
+    ```
+
+    The iteration blocks until the next message arrives and ends when the stream is closed (after the
+    queued messages were consumed), e.g. by `Connector.disconnect()`. Leaving the loop early (`break`,
+    an exception) closes the stream too.
+    '''
+
+    def __init__(self,
+                 data_type: Optional[str] = None,
+                 device_id: Optional[str] = None,
+                 maxsize: int = DEFAULT_STREAM_SIZE,
+                 policy: StreamPolicy = 'drop_oldest',
+                 block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+                 on_close: Optional[Callable[['MessageStream'], None]] = None):
+        '''
+        Optional
+        --------
+        data_type : str
+            only messages of this type, by default all
+
+        device_id : str
+            only messages of this device, by default of all devices
+
+        maxsize : int
+            the maximal number of queued messages
+
+        policy : 'drop_oldest' | 'drop_newest' | 'block'
+            what happens when the queue is full: drop the oldest queued or the new message
+            (see `dropped`) - or block the receiving thread until the consumer caught up
+
+        block_timeout : float
+            with policy 'block', the maximal time in seconds the receiving thread waits for the consumer,
+            then the new message is dropped. None waits without limit.
+
+        on_close : Callable[[MessageStream], None]
+            called when the stream is closed
+        '''
+        if policy not in ['drop_oldest', 'drop_newest', 'block']:
+            raise ValueError(f'unknown stream policy "{policy}"')
+        self.data_type = data_type
+        self.device_id = device_id
+        self.maxsize = max(int(maxsize), 1)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.__on_close = on_close
+        self.__queue: Deque[DictX] = deque()
+        self.__cond = threading.Condition()
+        self.__closed = False
+
+    def accepts(self, msg: dict) -> bool:
+        return (self.data_type is None or msg.get('type') == self.data_type) and \
+            (self.device_id is None or msg.get('device_id') == self.device_id)
+
+    def put(self, msg: Any):
+        '''
+        queues the message (called by the receiving thread)
+        '''
+        with self.__cond:
+            if self.__closed:
+                return
+            if len(self.__queue) >= self.maxsize:
+                if self.policy == 'block':
+                    if not self.__cond.wait_for(lambda: len(self.__queue) < self.maxsize or self.__closed, self.block_timeout):
+                        self.dropped += 1
+                        return
+                    if self.__closed:
+                        return
+                else:
+                    self.dropped += 1
+                    if self.policy == 'drop_newest':
+                        return
+                    self.__queue.popleft()
+            self.__queue.append(msg)
+            self.__cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[DictX]:
+        '''
+        the next message - None when the timeout expired or the stream is closed and empty
+        '''
+        with self.__cond:
+            if not self.__cond.wait_for(lambda: len(self.__queue) > 0 or self.__closed, timeout):
+                return None
+            if len(self.__queue) == 0:
+                return None
+            msg = self.__queue.popleft()
+            self.__cond.notify_all()
+            return msg
+
+    @property
+    def pending(self) -> int:
+        return len(self.__queue)
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def close(self):
+        '''
+        ends the iteration once the queued messages are consumed
+        '''
+        with self.__cond:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__cond.notify_all()
+        if self.__on_close is not None:
+            self.__on_close(self)
+
+    def __iter__(self) -> Iterator[DictX]:
+        try:
+            while True:
+                msg = self.get()
+                if msg is None:
+                    return
+                yield msg
+        finally:
+            # an abandoned iteration must not keep receiving (or block the receiving thread)
+            self.close()
+
+    def __enter__(self) -> 'MessageStream':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,7 +1,8 @@
 import threading
 from time import time_ns
-from typing import Callable
+from typing import Callable, Optional
 from inspect import signature
+from .clock import Clock, get_clock
 
 
 class CancleSubscription:
@@ -27,11 +28,15 @@ class ThreadJob(threading.Thread):
         cls.__next_id += 1
         return f'job_{cls.__next_id}'
 
-    def __init__(self, callback: Callable[[str, Callable], None], interval: float, iterations: int = float('inf')):
-        '''runs the callback function after interval seconds'''
+    def __init__(self, callback: Callable[[str, Callable], None], interval: float, iterations: int = float('inf'), clock: Optional[Clock] = None):
+        '''runs the callback function after interval seconds
+
+        the intervals are measured with the given clock, by default the clock set with `set_clock`
+        '''
         self.callback = callback
         self.event = threading.Event()
         self.interval = interval
+        self.clock = clock if clock is not None else get_clock()
         self.__running = False
         self.__id = self._next_id()
         self.__iterations = iterations
@@ -39,8 +44,9 @@ class ThreadJob(threading.Thread):
 
     def cancel(self):
         self.__running = False
-        self.__t_stop = time_ns()
+        self.__t_stop = self.clock.time_ns()
         self.event.set()
+        self.clock.interrupt()
 
     stop = cancel
 
@@ -57,21 +63,28 @@ class ThreadJob(threading.Thread):
         return self.__iteration
 
     def start(self):
+        self.__t_start = self.clock.time_ns()
+        self.clock.register(self)
         super().start()
-        self.__t_start = time_ns()
 
     def reset_time(self):
-        self.__t_start = time_ns()
+        self.__t_start = self.clock.time_ns()
 
     @property
     def time_s(self):
         '''returns the time in seconds since this job was started
         '''
         if self.is_running:
-            return (time_ns() - self.__t_start) / 1000000000.0
+            return (self.clock.time_ns() - self.__t_start) / 1000000000.0
         return (self.__t_stop - self.__t_start) / 1000000000.0
 
     def run(self):
+        try:
+            self.__run()
+        finally:
+            self.clock.release(self)
+
+    def __run(self):
         self.__running = True
         arg_count = len(signature(self.callback).parameters)
         self.__iteration += 1
@@ -83,7 +96,7 @@ class ThreadJob(threading.Thread):
         if self.__iterations == 0:
             return
 
-        while not self.event.wait(self.interval) and self.iteration <= self.__iterations:
+        while not self.clock.wait(self.event, self.interval) and self.iteration <= self.__iterations:
             try:
                 self.__iteration += 1
                 clbk()
@@ -42,6 +42,7 @@ class DataType(str, Enum):
     ACCELERATION = "acceleration"
     ALERT_CONFIRM = "alert_confirm"
     ALL_DATA = "all_data"
+    ASSET_CHUNK = "asset_chunk"
     BORDER_OVERLAP = "border_overlap"
     CLEAR_PLAYGROUND = "clear_playground"
     CLEAN_PLAYGROUND = "clean_playground"
@@ -392,6 +393,7 @@ class DataFrame(DictX):
     sprite_collision: SpriteCollisionMsg
     sprite_out: SpriteOutMsg
     job: Optional[ThreadJob]
+    changed: Optional[List[str]]
 
 
 class ErrorMsg(BaseMsg):
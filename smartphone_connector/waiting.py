@@ -0,0 +1,73 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _EventWaiter:
+    def __init__(self, predicate: Optional[Callable[[Any], bool]]):
+        self.predicate = predicate
+        self.event = threading.Event()
+        self.result: Any = None
+
+
+class EventWaiters:
+    '''
+    Threads waiting for an event: the dispatching thread hands the first matching message to the
+    waiting threads and wakes them up - the waiting threads do not poll.
+
+    The messages arrive in real time, thus the timeouts are measured in real time too - also when a
+    `VirtualClock` is set.
+    '''
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__waiters: Dict[str, List[_EventWaiter]] = {}
+
+    def wait(self, event: str, predicate: Optional[Callable[[Any], bool]] = None, timeout: Optional[float] = None) -> Any:
+        '''
+        Return
+        ------
+        Any
+            the first message of the event matching the predicate, None when the timeout expired
+        '''
+        waiter = _EventWaiter(predicate)
+        with self.__lock:
+            self.__waiters.setdefault(event, []).append(waiter)
+        try:
+            waiter.event.wait(timeout)
+        finally:
+            with self.__lock:
+                waiters = self.__waiters.get(event, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if len(waiters) == 0:
+                    self.__waiters.pop(event, None)
+        return waiter.result
+
+    def notify(self, event: str, data: Any):
+        '''
+        called for each dispatched message
+        '''
+        if event not in self.__waiters:
+            return
+        with self.__lock:
+            for waiter in self.__waiters.get(event, []):
+                if waiter.event.is_set():
+                    continue
+                try:
+                    if waiter.predicate is not None and not waiter.predicate(data):
+                        continue
+                except Exception as e:
+                    logging.warn(e)
+                    continue
+                waiter.result = data
+                waiter.event.set()
+
+    def cancel(self):
+        '''
+        wakes all waiting threads up, they receive None
+        '''
+        with self.__lock:
+            for waiters in self.__waiters.values():
+                for waiter in waiters:
+                    waiter.event.set()
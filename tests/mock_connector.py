@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from smartphone_connector import Connector
+
+
+def make_connector(device_id: str = 'FooBar'):
+    '''
+    a connector which is not connected - the sent messages are collected in the returned list
+    '''
+    with patch.object(Connector, 'connect'):
+        connector = Connector('http://localhost:5000', device_id)
+    # the callback lists are declared on the class, each connector of the tests gets its own
+    for name, value in vars(Connector).items():
+        if name.startswith('_on_') and isinstance(value, list):
+            setattr(connector, name, [])
+    sent = []
+    connector.sio.emit = lambda event, data=None, **kwargs: sent.append((event, data))
+    connector.sio.sleep = time.sleep
+    return connector, sent
+
+
+def receive(connector: Connector, data: dict, event: str = 'new_data'):
+    '''
+    delivers a message as if it was received from the server
+    '''
+    connector.sio.handlers['/'][event](data)
+
+
+def sent_data(sent: list, data_type: str) -> list:
+    '''
+    the payloads of the sent `new_data` messages of the given type
+    '''
+    return [data for event, data in sent if isinstance(data, dict) and data.get('type') == data_type]
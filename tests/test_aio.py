@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.aio import AsyncMessageStream
+
+
+def key(k: str) -> dict:
+    return {'device_id': 'FooBar', 'type': 'key', 'key': k, 'time_stamp': time.time()}
+
+
+class TestAsyncMessageStream(unittest.TestCase):
+    def test_drop_policies(self):
+        async def main(policy):
+            stream = AsyncMessageStream(maxsize=2, policy=policy)
+            for i in range(4):
+                stream.put(i)
+            await asyncio.sleep(0)
+            return stream.dropped, [await stream.get(0), await stream.get(0)]
+
+        self.assertEqual(asyncio.run(main('drop_oldest')), (2, [2, 3]))
+        self.assertEqual(asyncio.run(main('drop_newest')), (2, [0, 1]))
+
+    def test_unknown_policy(self):
+        async def main():
+            AsyncMessageStream(policy='block')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(main())
+
+    def test_put_from_another_thread(self):
+        async def main():
+            stream = AsyncMessageStream()
+            threading.Timer(0.05, lambda: stream.put('a')).start()
+            return await stream.get(2)
+
+        self.assertEqual(asyncio.run(main()), 'a')
+
+    def test_get_timeout_is_the_total_time(self):
+        async def main():
+            stream = AsyncMessageStream(predicate=lambda msg: msg != 'skip')
+            loop = asyncio.get_running_loop()
+
+            async def wake_up():
+                # wakes the waiting get up without a message for it
+                for _ in range(10):
+                    await asyncio.sleep(0.02)
+                    stream._AsyncMessageStream__ready.set()
+
+            task = loop.create_task(wake_up())
+            start = loop.time()
+            msg = await stream.get(0.1)
+            duration = loop.time() - start
+            task.cancel()
+            return msg, duration
+
+        msg, duration = asyncio.run(main())
+        self.assertIsNone(msg)
+        self.assertLess(duration, 0.15)
+
+    def test_iteration_ends_after_the_queued_messages(self):
+        async def main():
+            stream = AsyncMessageStream()
+            for i in range(3):
+                stream.put(i)
+            await asyncio.sleep(0)
+            stream.close()
+            return [msg async for msg in stream]
+
+        self.assertEqual(asyncio.run(main()), [0, 1, 2])
+
+    def test_break_closes(self):
+        async def main():
+            closed = []
+            stream = AsyncMessageStream(on_close=closed.append)
+            stream.put(0)
+            async for msg in stream:
+                break
+            # the loop finalizes the abandoned iteration
+            await asyncio.sleep(0)
+            return stream, closed
+
+        stream, closed = asyncio.run(main())
+        self.assertTrue(stream.closed)
+        self.assertEqual(closed, [stream])
+
+    def test_async_context_manager(self):
+        async def main():
+            async with AsyncMessageStream() as stream:
+                pass
+            return stream
+
+        self.assertTrue(asyncio.run(main()).closed)
+
+    def test_put_after_the_loop_closed(self):
+        closed = []
+
+        async def main():
+            return AsyncMessageStream(on_close=closed.append)
+
+        stream = asyncio.run(main())
+        stream.put('a')
+        self.assertTrue(stream.closed)
+        self.assertEqual(closed, [stream])
+
+
+class TestConnectorAiter(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def streams(self):
+        return self.connector._Connector__streams
+
+    def test_receives_from_the_socket_thread(self):
+        async def main():
+            stream = self.connector.aiter('key')
+            threading.Timer(0.05, lambda: receive(self.connector, key('a'))).start()
+            msg = await stream.get(2)
+            await stream.aclose()
+            return msg
+
+        self.assertEqual(asyncio.run(main()).key, 'a')
+        self.assertEqual(self.streams(), ())
+
+    def test_anext_response(self):
+        def emit(event, data=None, **kwargs):
+            if isinstance(data, dict) and data.get('type') == 'input_prompt':
+                # a late response to an earlier prompt arrives while the prompt is sent
+                receive(self.connector, {'device_id': 'FooBar', 'type': 'input_response', 'response': 'old', 'time_stamp': 1})
+                threading.Timer(0.05, lambda: receive(self.connector, {
+                    'device_id': 'FooBar', 'type': 'input_response', 'response': 'new', 'time_stamp': data['time_stamp']
+                })).start()
+
+        self.connector.sio.emit = emit
+        self.assertEqual(asyncio.run(self.connector.anext_response('Name?', timeout=2)), 'new')
+        self.assertEqual(self.streams(), ())
+
+    def test_anext_response_timeout(self):
+        self.assertIsNone(asyncio.run(self.connector.anext_response('Name?', timeout=0.05)))
+        self.assertEqual(self.streams(), ())
+
+    def test_break_unregisters(self):
+        async def main():
+            stream = self.connector.aiter('key')
+            receive(self.connector, key('a'))
+            async for msg in stream:
+                break
+            await asyncio.sleep(0)
+
+        asyncio.run(main())
+        self.assertEqual(self.streams(), ())
+
+    def test_closed_loop_unregisters(self):
+        async def main():
+            self.connector.aiter('key')
+
+        asyncio.run(main())
+        receive(self.connector, key('a'))
+        self.assertEqual(self.streams(), ())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from mock_connector import make_connector, sent_data
+from smartphone_connector import assets
+from smartphone_connector.assets import AssetCache, AssetUpload, AssetUploader, asset_pkg, content_hash, load_assets, resolve_asset_dir
+
+
+def write_assets(directory: Path, files: dict):
+    for name, content in files.items():
+        (directory / name).write_bytes(content)
+
+
+class TestAssetHashing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.images = self.dir / 'images'
+        self.images.mkdir()
+        write_assets(self.images, {'a.png': b'aaaa', 'b.png': b'bbbb'})
+        self.cache = AssetCache(self.dir / 'cache')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_hash(self):
+        self.assertEqual(content_hash(b'abc'), content_hash('abc'))
+        self.assertNotEqual(content_hash(b'abc'), content_hash(b'abd'))
+
+    def test_asset_pkg_without_payload_is_a_reference(self):
+        ref = asset_pkg('image', 'a', 'png', 'h')
+        self.assertEqual(ref, {'name': 'a', 'type': 'png', 'hash': 'h'})
+        self.assertEqual(asset_pkg('image', 'a', 'png', 'h', b'x')['image'], b'x')
+
+    def test_cache_lookup_detects_changes(self):
+        file = self.images / 'a.png'
+        self.assertIsNone(self.cache.lookup(file))
+        self.cache.remember(file, 'h', 'png')
+        self.assertEqual(self.cache.lookup(file)['hash'], 'h')
+        self.assertIsNone(self.cache.lookup(file, 'other_variant'))
+        file.write_bytes(b'changed content')
+        self.assertIsNone(self.cache.lookup(file))
+
+    def test_cache_is_persisted(self):
+        file = self.images / 'a.png'
+        self.cache.remember(file, 'h', 'png')
+        self.cache.flush()
+        self.assertEqual(AssetCache(self.dir / 'cache').lookup(file)['hash'], 'h')
+
+    def test_disabled_cache_writes_nothing(self):
+        cache = AssetCache(self.dir / 'disabled', enabled=False)
+        cache.remember(self.images / 'a.png', 'h', 'png')
+        cache.flush()
+        self.assertFalse((self.dir / 'disabled').exists())
+
+    def test_unchanged_assets_are_only_referenced(self):
+        files = sorted(self.images.iterdir())
+        uploaded = {}
+        pkgs, _ = load_assets(files, 'image', self.cache, uploaded)
+        self.assertEqual([pkg['image'] for pkg in pkgs], [b'aaaa', b'bbbb'])
+        self.assertEqual(uploaded['a'], content_hash(b'aaaa'))
+
+        write_assets(self.images, {'b.png': b'BBBB'})
+        pkgs, _ = load_assets(files, 'image', self.cache, uploaded)
+        self.assertNotIn('image', pkgs[0])
+        self.assertEqual(pkgs[0]['hash'], content_hash(b'aaaa'))
+        self.assertEqual(pkgs[1]['image'], b'BBBB')
+
+    def test_configure_playground_sends_unchanged_images_as_references(self):
+        connector, sent = make_connector()
+        connector.asset_cache = self.cache
+        connector.configure_playground(width=100, height=100, images=self.images)
+        connector.configure_playground(width=100, height=100, images=self.images)
+        first, second = sent_data(sent, 'playground_config')
+        self.assertEqual(sorted(pkg['name'] for pkg in first['config']['images']), ['a', 'b'])
+        self.assertTrue(all('image' in pkg for pkg in first['config']['images']))
+        self.assertTrue(all('image' not in pkg for pkg in second['config']['images']))
+
+
+class TestAssetDirResolution(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        assets._resolved_dirs.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_absolute_and_unresolvable_dirs_are_unchanged(self):
+        self.assertEqual(resolve_asset_dir(self.base), self.base)
+        self.assertEqual(resolve_asset_dir('missing', [self.base]), Path('missing'))
+
+    def test_nearest_match_wins(self):
+        (self.base / 'a' / 'b' / 'images').mkdir(parents=True)
+        (self.base / 'c' / 'images').mkdir(parents=True)
+        self.assertEqual(resolve_asset_dir('images', [self.base]), self.base / 'c' / 'images')
+
+    def test_search_depth_is_bounded(self):
+        deep = self.base / 'a' / 'b' / 'c' / 'd' / 'images'
+        deep.mkdir(parents=True)
+        self.assertEqual(resolve_asset_dir('images', [self.base], max_depth=3), Path('images'))
+        self.assertEqual(resolve_asset_dir('images', [self.base], max_depth=4), deep)
+
+    def test_hidden_and_dependency_dirs_are_skipped(self):
+        (self.base / '.git' / 'images').mkdir(parents=True)
+        (self.base / 'node_modules' / 'images').mkdir(parents=True)
+        self.assertEqual(resolve_asset_dir('images', [self.base]), Path('images'))
+
+    def test_search_paths_are_searched_in_order(self):
+        first, second = self.base / 'first', self.base / 'second'
+        (first / 'x' / 'images').mkdir(parents=True)
+        (second / 'images').mkdir(parents=True)
+        self.assertEqual(resolve_asset_dir('images', [first, second]), first / 'x' / 'images')
+
+    def test_results_are_memoized(self):
+        (self.base / 'images').mkdir()
+        resolve_asset_dir('images', [self.base])
+        key = ('images', (str(self.base),), assets.DEFAULT_SEARCH_DEPTH)
+        self.assertEqual(assets._resolved_dirs[key], self.base / 'images')
+        # a removed directory is resolved again
+        (self.base / 'images').rmdir()
+        self.assertEqual(resolve_asset_dir('images', [self.base]), Path('images'))
+
+    def test_parallel_reads_keep_the_order(self):
+        files = []
+        for i in range(12):
+            file = self.base / f'img_{i:02}.png'
+            file.write_bytes(bytes([i]) * 10)
+            files.append(file)
+        cache = AssetCache(self.base / 'cache', enabled=False)
+        pkgs, _ = load_assets(files, 'image', cache, {}, workers=4)
+        self.assertEqual([pkg['name'] for pkg in pkgs], [f.stem for f in files])
+        self.assertEqual([pkg['image'] for pkg in pkgs], [bytes([i]) * 10 for i in range(12)])
+
+
+class TestAssetStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        write_assets(self.dir, {'small.mp3': b's' * 10, 'large.mp3': b'l' * 100})
+        self.files = [self.dir / 'small.mp3', self.dir / 'large.mp3']
+        self.cache = AssetCache(self.dir / 'cache', enabled=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_large_assets_are_streamed(self):
+        pkgs, uploads = load_assets(self.files, 'audio', self.cache, {}, stream_threshold=50)
+        self.assertEqual(pkgs[0]['audio'], b's' * 10)
+        self.assertNotIn('audio', pkgs[1])
+        self.assertEqual(pkgs[1]['hash'], content_hash(b'l' * 100))
+        self.assertEqual([u.name for u in uploads], ['large'])
+        # streamed from disk
+        self.assertEqual(uploads[0].source, self.dir / 'large.mp3')
+        self.assertEqual(uploads[0].size, 100)
+
+    def test_without_threshold_nothing_is_streamed(self):
+        pkgs, uploads = load_assets(self.files, 'audio', self.cache, {}, stream_threshold=None)
+        self.assertEqual(uploads, [])
+        self.assertEqual(pkgs[1]['audio'], b'l' * 100)
+
+    def test_chunks(self):
+        upload = AssetUpload('audio', 'a', 'mp3', 'h', b'0123456789')
+        self.assertEqual(list(upload.chunks(4)), [b'0123', b'4567', b'89'])
+        from_file = AssetUpload('audio', 'large', 'mp3', 'h', self.dir / 'large.mp3')
+        self.assertEqual(b''.join(from_file.chunks(30)), b'l' * 100)
+
+    def test_uploader_sends_chunks_and_reports_progress(self):
+        sent, progress = [], []
+        uploader = AssetUploader(
+            sent.append,
+            [AssetUpload('audio', 'a', 'mp3', 'h', b'0123456789')],
+            chunk_size=4,
+            on_progress=progress.append
+        )
+        uploader.start()
+        uploader.join(2)
+        self.assertEqual([(c['index'], c['count'], c['size'], c['chunk']) for c in sent],
+                         [(0, 3, 10, b'0123'), (1, 3, 10, b'4567'), (2, 3, 10, b'89')])
+        self.assertEqual([(p.sent, p.done) for p in progress], [(4, False), (8, False), (10, True)])
+
+    def test_canceled_uploads_are_reported(self):
+        release = threading.Event()
+        sent, canceled = [], []
+
+        def send(chunk):
+            sent.append(chunk)
+            release.wait(2)
+
+        uploads = [AssetUpload('audio', 'a', 'mp3', 'h', b'0' * 10), AssetUpload('audio', 'b', 'mp3', 'h2', b'1' * 10)]
+        uploader = AssetUploader(send, uploads, chunk_size=2, on_cancel=canceled.append)
+        uploader.start()
+        uploader.cancel()
+        release.set()
+        uploader.join(2)
+        self.assertTrue(uploader.is_canceled)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual([u.name for u in canceled], ['a', 'b'])
+
+    def test_configure_playground_streams_large_tracks(self):
+        connector, sent = make_connector()
+        connector.asset_cache = self.cache
+        connector.asset_stream_threshold = 50
+        connector.asset_chunk_size = 40
+        uploader = connector.configure_playground(audio_tracks=self.dir)
+        connector.wait_for_uploads(2)
+        self.assertFalse(uploader.is_alive())
+        config = sent_data(sent, 'playground_config')[0]['config']
+        self.assertEqual([t['name'] for t in config['audio_tracks']], ['large', 'small'])
+        chunks = sent_data(sent, 'asset_chunk')
+        self.assertEqual([c['index'] for c in chunks], [0, 1, 2])
+        self.assertEqual(b''.join(c['chunk'] for c in chunks), b'l' * 100)
+
+    def test_canceled_uploads_are_uploaded_again(self):
+        connector, sent = make_connector()
+        connector.asset_cache = self.cache
+        connector.asset_stream_threshold = 50
+        release = threading.Event()
+        emit = connector.sio.emit
+
+        def slow_emit(event, data=None, **kwargs):
+            emit(event, data)
+            if data.get('type') == 'asset_chunk':
+                release.wait(2)
+
+        connector.sio.emit = slow_emit
+        connector.asset_chunk_size = 10
+        uploader = connector.configure_playground(audio_tracks=self.dir)
+        uploader.cancel()
+        release.set()
+        uploader.join(2)
+        connector.sio.emit = emit
+        connector.configure_playground(audio_tracks=self.dir)
+        connector.wait_for_uploads(2)
+        self.assertEqual(sent_data(sent, 'asset_chunk')[-1]['index'], 9)
+
+
+class TestLazyImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        write_assets(self.dir, {'a.png': b'aaaa', 'b.png': b'bbbb', 'c.png': b'cccc'})
+        self.connector, self.sent = make_connector()
+        self.connector.asset_cache = AssetCache(self.dir / 'cache', enabled=False)
+
+    def tearDown(self):
+        self.connector.sio.connected = False
+        self.tmp.cleanup()
+
+    def config_images(self):
+        return sorted(ref['name'] for ref in self.connector._Connector__playground_config.get('images', []))
+
+    def test_lazy_mode_keeps_the_background_image(self):
+        self.connector.configure_playground(images=self.dir, lazy_images=True, image='a')
+        configs = [msg['config'] for msg in sent_data(self.sent, 'playground_config')]
+        # the background image is uploaded on its own, the config does not replace the images on the phone
+        self.assertEqual([pkg['name'] for pkg in configs[0]['images']], ['a'])
+        self.assertNotIn('images', configs[1])
+        self.assertEqual(configs[1]['image'], 'a')
+        self.assertEqual(self.config_images(), ['a'])
+
+    def test_reconfiguring_keeps_lazily_uploaded_images(self):
+        self.connector.configure_playground(images=self.dir, lazy_images=True, image='a')
+        self.connector.add_sprite(image='b')
+        self.connector.configure_playground(width=50, height=50)
+        self.assertNotIn('images', sent_data(self.sent, 'playground_config')[-1]['config'])
+        self.assertEqual(self.config_images(), ['a', 'b'])
+
+    def test_prefetched_images_are_kept(self):
+        self.connector.sio.connected = True
+        self.connector.configure_playground(images=self.dir, lazy_images=True, prefetch=True)
+        deadline = time.time() + 2
+        while len(self.config_images()) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.config_images(), ['a', 'b', 'c'])
+        self.assertTrue(all('images' not in msg['config'] or len(msg['config']['images']) == 1
+                            for msg in sent_data(self.sent, 'playground_config')))
+
+    def test_eager_images_are_merged_with_lazy_ones(self):
+        self.connector.configure_playground(images=self.dir, lazy_images=True, image='a')
+        eager = self.dir / 'eager'
+        eager.mkdir()
+        write_assets(eager, {'d.png': b'dddd'})
+        self.connector.configure_playground(images=eager)
+        sent = sent_data(self.sent, 'playground_config')[-1]['config']['images']
+        self.assertEqual([pkg['name'] for pkg in sent], ['d', 'a'])
+        self.assertNotIn('image', sent[1])
+        self.assertEqual(self.config_images(), ['a', 'd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
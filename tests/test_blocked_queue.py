@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+
+
+def key(i: int) -> dict:
+    return {'device_id': 'FooBar', 'type': 'key', 'key': str(i), 'time_stamp': i}
+
+
+class TestBlockedQueue(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+        self.keys = []
+        self.threads = set()
+        self.connector.on('key', lambda data: (self.keys.append(int(data.key)), self.threads.add(threading.current_thread())))
+
+    def run_blocked(self, count: int):
+        '''
+        receives `count` messages while the main thread is blocked in a subscription
+        '''
+        def feed():
+            time.sleep(0.05)
+            for i in range(count):
+                receive(self.connector, key(i))
+            time.sleep(0.2)
+            self.connector.cancel_subscription()
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        self.connector.subscribe(lambda data: None, interval=0.1)
+        feeder.join()
+
+    def test_callbacks_run_on_the_blocked_thread(self):
+        self.run_blocked(50)
+        self.assertEqual(self.keys, list(range(50)))
+        self.assertEqual(self.threads, {threading.current_thread()})
+        self.assertEqual(self.connector.blocked_dropped, 0)
+
+    def test_drop_oldest(self):
+        self.connector.blocked_queue_size = 10
+        self.run_blocked(50)
+        self.assertEqual(self.keys, list(range(40, 50)))
+        self.assertEqual(self.connector.blocked_dropped, 40)
+
+    def test_drop_newest(self):
+        self.connector.blocked_queue_size = 10
+        self.connector.blocked_drop_policy = 'newest'
+        self.run_blocked(50)
+        self.assertEqual(self.keys, list(range(10)))
+        self.assertEqual(self.connector.blocked_dropped, 40)
+
+    def test_without_blocked_thread_callbacks_run_immediately(self):
+        receive(self.connector, key(0))
+        self.assertEqual(self.keys, [0])
+        self.assertEqual(self.threads, {threading.current_thread()})
+
+    def test_data_is_gathered_while_blocked(self):
+        self.connector.blocked_queue_size = 5
+        self.run_blocked(20)
+        # only the callbacks are dropped
+        self.assertEqual(self.connector.latest_key().key, '19')
+
+
+if __name__ == '__main__':
+    unittest.main()
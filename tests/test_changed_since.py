@@ -0,0 +1,85 @@
+import threading
+import unittest
+from mock_connector import make_connector, receive
+
+
+def acc(t: float, device_id: str = 'FooBar') -> dict:
+    return {'device_id': device_id, 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t}
+
+
+def key(k: str, t: float) -> dict:
+    return {'device_id': 'FooBar', 'type': 'key', 'key': k, 'time_stamp': t}
+
+
+class TestChangedSince(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def test_messages_are_numbered(self):
+        self.assertEqual(self.connector.sequence, 0)
+        receive(self.connector, acc(0))
+        receive(self.connector, key('up', 1))
+        self.assertEqual(self.connector.sequence, 2)
+        self.assertEqual(self.connector.latest_key()['seq'], 2)
+
+    def test_cursor(self):
+        msgs, cursor = self.connector.changed_since()
+        self.assertEqual((msgs, cursor), ([], 0))
+        for t in range(3):
+            receive(self.connector, acc(t))
+        msgs, cursor = self.connector.changed_since(cursor)
+        self.assertEqual([msg.x for msg in msgs], [0, 1, 2])
+        self.assertEqual(cursor, 3)
+        self.assertEqual(self.connector.changed_since(cursor), ([], 3))
+        receive(self.connector, acc(3))
+        msgs, cursor = self.connector.changed_since(cursor)
+        self.assertEqual([msg.x for msg in msgs], [3])
+
+    def test_reception_order_not_time_order(self):
+        receive(self.connector, acc(5))
+        receive(self.connector, acc(1))
+        msgs, _ = self.connector.changed_since()
+        self.assertEqual([msg.x for msg in msgs], [5, 1])
+
+    def test_filters(self):
+        receive(self.connector, acc(0))
+        receive(self.connector, key('up', 1))
+        receive(self.connector, acc(2, 'other'))
+        msgs, cursor = self.connector.changed_since(0, 'acceleration')
+        self.assertEqual([msg.x for msg in msgs], [0])
+        # the cursor covers the skipped messages too
+        self.assertEqual(cursor, 3)
+        msgs, _ = self.connector.changed_since(0, 'acceleration', device_id='__ALL_DEVICES__')
+        self.assertEqual([msg.x for msg in msgs], [0, 2])
+
+    def test_log_is_trimmed(self):
+        self.connector.change_log_size = 10
+        for t in range(25):
+            receive(self.connector, acc(t))
+        msgs, cursor = self.connector.changed_since()
+        self.assertEqual(cursor, 25)
+        self.assertGreaterEqual(len(msgs), 10)
+        self.assertLess(len(msgs), 20)
+        self.assertEqual(msgs[-1].x, 24)
+
+    def test_concurrent_polling_misses_nothing(self):
+        polled = []
+        done = threading.Event()
+
+        def poll():
+            cursor = 0
+            while not done.is_set() or cursor < self.connector.sequence:
+                msgs, cursor = self.connector.changed_since(cursor)
+                polled.extend(msg['seq'] for msg in msgs)
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        for t in range(3000):
+            receive(self.connector, acc(t))
+        done.set()
+        poller.join(5)
+        self.assertEqual(polled, list(range(1, 3001)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive, sent_data
+from smartphone_connector.clock import Clock, VirtualClock, get_clock, set_clock
+from smartphone_connector.helpers import time_s
+from smartphone_connector.replay import ReplaySource
+from smartphone_connector.timings import ThreadJob
+
+
+class TestVirtualClock(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1000)
+        set_clock(self.clock)
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_set_clock(self):
+        self.assertIs(get_clock(), self.clock)
+        self.assertEqual(time_s(), 1000)
+        set_clock(None)
+        self.assertIsInstance(get_clock(), Clock)
+        self.assertFalse(get_clock().virtual)
+
+    def test_time_only_moves_when_advanced(self):
+        self.assertEqual(self.clock.time(), 1000)
+        time.sleep(0.01)
+        self.assertEqual(self.clock.time(), 1000)
+        self.clock.advance(1.5)
+        self.assertEqual(self.clock.time(), 1001.5)
+        self.clock.sleep(0.5)
+        self.assertEqual(self.clock.time(), 1002)
+
+    def test_jobs_run_at_their_virtual_time(self):
+        ticks = []
+        job = ThreadJob(lambda _job: ticks.append(self.clock.time()), 0.5)
+        job.start()
+        self.clock.advance(2)
+        job.cancel()
+        job.join(1)
+        self.assertEqual(ticks, [1000.5, 1001, 1001.5, 1002])
+
+    def test_jobs_are_interleaved_in_order(self):
+        order = []
+        fast = ThreadJob(lambda _job: order.append(('fast', self.clock.time())), 0.25)
+        slow = ThreadJob(lambda _job: order.append(('slow', self.clock.time())), 0.5)
+        fast.start()
+        slow.start()
+        self.clock.advance(1)
+        fast.cancel()
+        slow.cancel()
+        self.assertEqual([t for _, t in order], sorted(t for _, t in order))
+        self.assertEqual(len([n for n, _ in order if n == 'fast']), 4)
+        self.assertEqual(len([n for n, _ in order if n == 'slow']), 2)
+
+    def test_wait_for_an_event(self):
+        event = threading.Event()
+        threading.Timer(0.05, lambda: (event.set(), self.clock.interrupt())).start()
+        self.assertTrue(self.clock.wait(event))
+        self.assertEqual(self.clock.time(), 1000)
+
+
+class TestReplayOnVirtualClock(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1000)
+        set_clock(self.clock)
+        self.records = [
+            {'time_stamp': 10 + i, 'event': 'new_data', 'data': {'type': 'key', 'device_id': 'FooBar', 'key': str(i), 'time_stamp': 10 + i}}
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_blocking_replay_advances_the_clock(self):
+        times = []
+        done = threading.Event()
+
+        def play():
+            ReplaySource(self.records, speed=2).play(lambda event, data: times.append(time_s()))
+            done.set()
+
+        threading.Thread(target=play, daemon=True).start()
+        self.assertTrue(done.wait(2), 'the replay hangs')
+        self.assertEqual(times, [1000, 1000.5, 1001])
+        self.assertEqual(self.clock.time(), 1001)
+
+    def test_blocking_replay_runs_the_jobs_due_in_between(self):
+        order = []
+        job = ThreadJob(lambda _job: order.append(('job', time_s())), 0.75)
+        job.start()
+        ReplaySource(self.records, speed=1).play(lambda event, data: order.append(('msg', time_s())))
+        job.cancel()
+        self.assertEqual(order, [
+            ('msg', 1000), ('job', 1000.75), ('msg', 1001), ('job', 1001.5), ('msg', 1002)
+        ])
+
+    def test_background_replay_waits_for_the_clock(self):
+        connector, _ = make_connector()
+        keys = []
+        connector.on('key', lambda data: keys.append(data['key']))
+        replay = connector.replay(ReplaySource(self.records, speed=1), blocking=False)
+        self.clock.advance(1.5)
+        self.assertEqual(keys, ['0', '1'])
+        self.clock.advance(1)
+        replay.join(1)
+        self.assertEqual(keys, ['0', '1', '2'])
+
+
+
+class TestConnectorOnVirtualClock(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1000)
+        self.connector, self.sent = make_connector()
+        self.connector.clock = self.clock
+
+    def reply(self, data_type: str, make_reply):
+        '''
+        replies (as the phone) to the first sent message of the type
+        '''
+        def run():
+            deadline = time.time() + 2
+            while len(sent_data(self.sent, data_type)) == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            make_reply(sent_data(self.sent, data_type)[0])
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def test_injected_clock(self):
+        self.assertIs(self.connector.clock, self.clock)
+        self.assertEqual(self.connector.current_time_stamp, 1000)
+        self.connector.clock = None
+        self.assertIs(self.connector.clock, get_clock())
+
+    def test_prompt_waits_in_real_time(self):
+        self.reply('input_prompt', lambda msg: receive(self.connector, {
+            'device_id': 'FooBar', 'type': 'input_response', 'response': 'Hi', 'time_stamp': msg['time_stamp']
+        }))
+        self.assertEqual(self.connector.prompt('Name?'), 'Hi')
+        self.assertEqual(self.clock.time(), 1000)
+
+    def test_alert_waits_in_real_time(self):
+        self.reply('notification', lambda msg: receive(self.connector, {
+            'device_id': 'FooBar', 'type': 'alert_confirm', 'time_stamp': msg['time_stamp']
+        }))
+        self.connector.notify('Hello', alert=True)
+        self.assertEqual(self.clock.time(), 1000)
+
+    def test_set_device_nr_times_out_in_real_time(self):
+        start = time.time()
+        self.assertFalse(self.connector.set_device_nr(3, max_wait=0.1))
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(self.clock.time(), 1000)
+
+    def test_set_device_nr(self):
+        def emit(event, data=None, **kwargs):
+            if event == 'set_new_device_nr':
+                threading.Timer(0.05, lambda: receive(
+                    self.connector, {'message': 'Success', 'action': data, 'time_stamp': data['time_stamp']}, 'information_msg'
+                )).start()
+
+        self.connector.sio.emit = emit
+        self.assertTrue(self.connector.set_device_nr(3))
+        self.assertEqual(self.clock.time(), 1000)
+
+    def test_clear_playground_waits_in_real_time(self):
+        start = time.time()
+        self.connector.clear_playground()
+        self.assertGreaterEqual(time.time() - start, 0.2)
+        self.assertEqual(self.clock.time(), 1000)
+
+    def test_sleep_advances_the_clock(self):
+        self.connector.sleep(2)
+        self.assertEqual(self.clock.time(), 1002)
+
+    def test_sprite_motion_follows_the_clock(self):
+        self.connector.add_sprite(id='a', pos_x=0, pos_y=0, direction=[1, 0], speed=5)
+        self.clock.advance(2)
+        self.assertEqual(self.connector.sprite_position('a'), (10, 0))
+
+    def test_async_subscriptions_use_the_clock(self):
+        times = []
+        job = self.connector.subscribe_async(lambda data: times.append(time_s(self.clock)), interval=0.5)
+        self.clock.advance(1.5)
+        job.cancel()
+        self.assertEqual(times, [1000.5, 1001, 1001.5])
+
+    def test_simulation_advances_the_clock(self):
+        positions = []
+        sim = self.connector.simulate(frame_rate=10)
+        self.assertEqual(sim.time, 1000)
+        self.connector.add_sprite(id='a', pos_x=0, pos_y=0, width=2, height=2, direction=[1, 0], speed=5)
+        job = self.connector.subscribe_async(lambda data: positions.append(self.connector.sprite_position('a')), interval=1)
+        sim.run(2)
+        job.cancel()
+        self.assertAlmostEqual(self.clock.time(), 1002)
+        self.assertAlmostEqual(sim.time, 1002)
+        self.assertEqual(positions, [(5, 0), (10, 0)])
+        self.assertAlmostEqual(sim.get_sprite('a')['pos_x'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.helpers import bisect_time
+
+
+def acc(t: float, device_id: str = 'FooBar') -> dict:
+    return {'device_id': device_id, 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t}
+
+
+class TestBisectTime(unittest.TestCase):
+    def test_bisect(self):
+        msgs = [{'time_stamp': t} for t in [1, 2, 2, 3]]
+        self.assertEqual(bisect_time(msgs, 2), 1)
+        self.assertEqual(bisect_time(msgs, 2, right=True), 3)
+        self.assertEqual(bisect_time(msgs, 0), 0)
+        self.assertEqual(bisect_time(msgs, 5), 4)
+        self.assertEqual(bisect_time(msgs, 2, lo=2), 2)
+
+
+class TestDataHistory(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def times(self, msgs):
+        return [msg['time_stamp'] for msg in msgs]
+
+    def test_out_of_order_messages_are_inserted_in_order(self):
+        for t in [1, 3, 2, 5, 4]:
+            receive(self.connector, acc(t))
+        self.assertEqual(self.times(self.connector.all_data('acceleration')), [1, 2, 3, 4, 5])
+
+    def test_data_between(self):
+        for t in range(10):
+            receive(self.connector, acc(t))
+        self.assertEqual(self.times(self.connector.data_between('acceleration', 3, 5)), [3, 4, 5])
+        self.assertEqual(self.times(self.connector.data_between('acceleration', t_end=1)), [0, 1])
+        self.assertEqual(self.times(self.connector.data_between('acceleration', 8)), [8, 9])
+        self.assertEqual(self.connector.data_between('acceleration', 20, 30), [])
+        self.assertEqual(self.connector.data_between('gyro', 0, 30), [])
+
+    def test_data_since(self):
+        for t in range(5):
+            receive(self.connector, acc(t))
+        self.assertEqual(self.times(self.connector.data_since(3, 'acceleration')), [3, 4])
+
+    def test_all_devices_are_merged_by_time(self):
+        for t in range(3):
+            receive(self.connector, acc(t))
+            receive(self.connector, acc(t + 0.5, 'other'))
+        msgs = self.connector.data_between('acceleration', 0.5, 2, device_id='__ALL_DEVICES__')
+        self.assertEqual(self.times(msgs), [0.5, 1, 1.5, 2])
+
+    def test_all_data_of_the_server_is_sorted(self):
+        receive(self.connector, {
+            'device_id': 'FooBar',
+            'all_data': {'acceleration': [acc(t) for t in [5, 1, 4, 2, 3]]}
+        }, event='all_data')
+        self.assertEqual(self.times(self.connector.all_data('acceleration')), [1, 2, 3, 4, 5])
+        self.assertEqual(self.times(self.connector.data_between('acceleration', 2, 4)), [2, 3, 4])
+        receive(self.connector, acc(3.5))
+        self.assertEqual(self.times(self.connector.data_since(3, 'acceleration')), [3, 3.5, 4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import copy
+import pickle
+import unittest
+import mock_connector  # noqa: F401 (adds the package to the path)
+from smartphone_connector.dictx import DictView, DictX
+
+
+class TestDictView(unittest.TestCase):
+    def setUp(self):
+        self.base = DictX({'id': 'ball', 'pos_x': 0, 'pos_y': 0})
+        self.view = DictView(self.base, {'pos_x': 10, 'speed': 2})
+
+    def test_overlay(self):
+        self.assertEqual(self.view['pos_x'], 10)
+        self.assertEqual(self.view.pos_x, 10)
+        self.assertEqual(self.view.id, 'ball')
+        self.assertEqual(self.view.speed, 2)
+        self.assertEqual(self.base.pos_x, 0)
+        self.assertEqual(len(self.view), 4)
+        self.assertEqual(sorted(self.view), ['id', 'pos_x', 'pos_y', 'speed'])
+
+    def test_missing_keys(self):
+        with self.assertRaises(KeyError):
+            self.view['zz']
+        self.assertIsNone(self.view.zz)
+        self.assertIsNone(self.view.get('zz'))
+        self.assertEqual(self.view.get('zz', 3), 3)
+        self.assertIsNone(DictView(DictX({'a': 1})).get('zz'))
+
+    def test_contains(self):
+        self.assertIn('id', self.view)
+        self.assertIn('speed', self.view)
+        self.assertNotIn('zz', self.view)
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            self.view.pos_x = 3
+        with self.assertRaises(TypeError):
+            self.view['pos_x'] = 3
+        with self.assertRaises(TypeError):
+            del self.view['id']
+
+    def test_private_attributes_are_not_looked_up(self):
+        with self.assertRaises(AttributeError):
+            self.view._missing
+        with self.assertRaises(AttributeError):
+            self.view.__missing__
+
+    def test_to_dict_is_a_mutable_copy(self):
+        copied = self.view.to_dict()
+        self.assertIsInstance(copied, DictX)
+        copied.pos_x = 20
+        self.assertEqual(self.view.pos_x, 10)
+
+    def test_copy(self):
+        shallow = copy.copy(self.view)
+        self.assertIsInstance(shallow, DictView)
+        self.assertEqual(dict(shallow), dict(self.view))
+        deep = copy.deepcopy(self.view)
+        self.assertEqual(deep, {'id': 'ball', 'pos_x': 10, 'pos_y': 0, 'speed': 2})
+
+    def test_pickle(self):
+        restored = pickle.loads(pickle.dumps(self.view))
+        self.assertIsInstance(restored, DictView)
+        self.assertEqual(restored.pos_x, 10)
+        self.assertEqual(dict(restored), dict(self.view))
+
+
+if __name__ == '__main__':
+    unittest.main()
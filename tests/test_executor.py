@@ -0,0 +1,147 @@
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.executor import LANE_BATCH, CallbackExecutor
+
+
+class TestCallbackExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = CallbackExecutor(workers=2, queue_size=10)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=False)
+
+    def test_tasks_of_a_lane_run_in_order(self):
+        done = []
+        for i in range(100):
+            self.executor.submit('a', done.append, i)
+        self.assertTrue(self.executor.join(2))
+        self.assertEqual(done, list(range(100)))
+        self.assertEqual(self.executor.pending, 0)
+
+    def test_lanes_run_in_parallel(self):
+        release = threading.Event()
+        done = []
+        self.executor.submit('slow', release.wait, 2)
+        self.executor.submit('fast', done.append, 1)
+        time.sleep(0.05)
+        self.assertEqual(done, [1])
+        release.set()
+        self.assertTrue(self.executor.join(2))
+
+    def test_full_lane_drops_the_oldest_task(self):
+        executor = CallbackExecutor(workers=1, queue_size=2, drop_when_full=True)
+        release = threading.Event()
+        done = []
+        executor.submit('a', release.wait, 2)
+        time.sleep(0.05)
+        for i in range(5):
+            executor.submit('a', done.append, i)
+        release.set()
+        executor.join(2)
+        self.assertEqual(done, [3, 4])
+        self.assertEqual(executor.dropped, 3)
+        executor.shutdown()
+
+    def test_full_lane_blocks_the_caller(self):
+        executor = CallbackExecutor(workers=1, queue_size=1)
+        release = threading.Event()
+        executor.submit('a', release.wait, 2)
+        time.sleep(0.05)
+        executor.submit('a', lambda: None)
+        submitted = threading.Event()
+        threading.Thread(target=lambda: (executor.submit('a', lambda: None), submitted.set()), daemon=True).start()
+        self.assertFalse(submitted.wait(0.1))
+        release.set()
+        self.assertTrue(submitted.wait(2))
+        executor.shutdown()
+
+    def test_submitting_from_a_task_never_blocks(self):
+        executor = CallbackExecutor(workers=1, queue_size=1)
+        done = []
+
+        def task():
+            for i in range(5):
+                executor.submit('a', done.append, i)
+
+        executor.submit('a', task)
+        self.assertTrue(executor.join(2))
+        self.assertEqual(done, [0, 1, 2, 3, 4])
+        executor.shutdown()
+
+    def test_failing_tasks_do_not_stop_the_lane(self):
+        done = []
+        self.executor.submit('a', lambda: 1 / 0)
+        self.executor.submit('a', done.append, 1)
+        self.executor.join(2)
+        self.assertEqual(done, [1])
+
+    def test_shutdown_runs_the_queued_tasks(self):
+        done = []
+        for i in range(5):
+            self.executor.submit('a', done.append, i)
+        self.executor.shutdown(wait=True, timeout=2)
+        self.assertEqual(done, [0, 1, 2, 3, 4])
+        self.assertFalse(self.executor.is_running)
+        self.assertFalse(self.executor.submit('a', done.append, 5))
+
+    def test_shutdown_during_a_long_lane(self):
+        executor = CallbackExecutor(workers=1, queue_size=10 * LANE_BATCH)
+        started = threading.Event()
+        release = threading.Event()
+
+        def first():
+            started.set()
+            release.wait(2)
+
+        executor.submit('a', first)
+        for _ in range(3 * LANE_BATCH):
+            executor.submit('a', time.sleep, 0)
+        started.wait(2)
+        threading.Timer(0.05, release.set).start()
+        executor.shutdown(wait=False)
+        # the lane is discarded once its batch is done instead of being requeued on the stopped pool
+        start = time.time()
+        self.assertTrue(executor.join(2))
+        self.assertLess(time.time() - start, 1)
+
+    def test_shutdown_while_a_lane_is_requeued(self):
+        executor = CallbackExecutor(workers=1, queue_size=10 * LANE_BATCH)
+        pool = executor._CallbackExecutor__pool
+        submit = pool.submit
+
+        def requeue(fn, *args):
+            if threading.current_thread().name.startswith('callbacks'):
+                # shut down concurrently to the requeue of the lane
+                threading.Thread(target=executor.shutdown, kwargs={'wait': False}, daemon=True).start()
+                time.sleep(0.05)
+            return submit(fn, *args)
+
+        pool.submit = requeue
+        for _ in range(2 * LANE_BATCH):
+            executor.submit('a', time.sleep, 0)
+        self.assertTrue(executor.join(2))
+
+
+class TestConnectorCallbackExecutor(unittest.TestCase):
+    def test_callbacks_run_on_the_workers(self):
+        connector, _ = make_connector()
+        executor = connector.use_callback_executor(workers=2)
+        self.assertIs(connector.callback_executor, executor)
+        threads = []
+        keys = []
+        connector.on('key', lambda data: (threads.append(threading.current_thread()), keys.append(data.key)))
+        for i in range(20):
+            receive(connector, {'device_id': 'FooBar', 'type': 'key', 'key': str(i), 'time_stamp': i})
+        executor.join(2)
+        self.assertEqual(keys, [str(i) for i in range(20)])
+        self.assertNotIn(threading.current_thread(), threads)
+        connector.stop_callback_executor()
+        self.assertIsNone(connector.callback_executor)
+        receive(connector, {'device_id': 'FooBar', 'type': 'key', 'key': 'x', 'time_stamp': 30})
+        self.assertIs(threads[-1], threading.current_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()
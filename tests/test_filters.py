@@ -0,0 +1,171 @@
+import math
+import random
+import unittest
+from unittest.mock import patch
+from mock_connector import make_connector, receive
+from smartphone_connector.dictx import DictX
+from smartphone_connector import filters
+from smartphone_connector.filters import DEFAULT_SAMPLE_RATE, MAX_ESTIMATION_SAMPLES, ComplementaryFilter, Decimate, HighPass, LowPass, sample_rate_of
+
+
+def acc(t: float, x: float = 0, device_id: str = 'FooBar', **kwargs) -> DictX:
+    return DictX({'device_id': device_id, 'type': 'acceleration', 'x': x, 'y': 0, 'z': 0, 'time_stamp': t, **kwargs})
+
+
+class TestBiquad(unittest.TestCase):
+    def test_sample_rate_of(self):
+        self.assertEqual(sample_rate_of([acc(0, interval=10)]), 100)
+        self.assertEqual(sample_rate_of([acc(0), acc(0.02), acc(0.04)]), 50)
+        self.assertEqual(sample_rate_of([acc(0)]), DEFAULT_SAMPLE_RATE)
+        self.assertIsNone(sample_rate_of([acc(0)], None))
+
+    def test_design_waits_for_a_known_sample_rate(self):
+        lowpass = LowPass(5)
+        self.assertEqual(lowpass.process([acc(0, 1)]), [])
+        self.assertIsNone(lowpass.coefficients)
+        out = lowpass.process([acc(0.005, 1)])
+        self.assertEqual([msg.time_stamp for msg in out], [0, 0.005])
+        reference = LowPass(5, sample_rate=200)
+        reference.design(200)
+        self.assertEqual(lowpass.coefficients, reference.coefficients)
+
+    def test_interval_gives_the_sample_rate(self):
+        lowpass = LowPass(5)
+        self.assertEqual(len(lowpass.process([acc(0, 1, interval=5)])), 1)
+        reference = LowPass(5)
+        reference.design(200)
+        self.assertEqual(lowpass.coefficients, reference.coefficients)
+
+    def test_fallback_without_time_information(self):
+        lowpass = LowPass(5)
+        out = []
+        for _ in range(MAX_ESTIMATION_SAMPLES):
+            out.extend(lowpass.process([acc(0, 1)]))
+        self.assertEqual(len(out), MAX_ESTIMATION_SAMPLES)
+        reference = LowPass(5)
+        reference.design(DEFAULT_SAMPLE_RATE)
+        self.assertEqual(lowpass.coefficients, reference.coefficients)
+
+    def test_constant_signal_has_no_transient(self):
+        lowpass, highpass = LowPass(2, sample_rate=100), HighPass(2, sample_rate=100)
+        batch = [acc(i / 100, 3) for i in range(20)]
+        self.assertTrue(all(abs(msg.x - 3) < 1e-9 for msg in lowpass.process(batch)))
+        self.assertTrue(all(abs(msg.x) < 1e-9 for msg in highpass.process(batch)))
+
+    def test_lowpass_attenuates_high_frequencies(self):
+        lowpass = LowPass(2, sample_rate=200)
+        out = lowpass.process([acc(i / 200, math.sin(2 * math.pi * 50 * i / 200)) for i in range(400)])
+        self.assertLess(max(abs(msg.x) for msg in out[200:]), 0.05)
+
+    def test_state_is_kept_per_device(self):
+        lowpass = LowPass(2, sample_rate=100)
+        out = lowpass.process([acc(0, 0, 'a'), acc(0, 10, 'b')])
+        self.assertEqual([msg.x for msg in out], [0, 10])
+
+    @unittest.skipIf(filters.np is None, 'NumPy is not installed')
+    def test_blocks_match_the_sample_by_sample_filter(self):
+        rnd = random.Random(3)
+        msgs = [
+            acc(i / 100, rnd.gauss(0, 1), 'ab'[i % 2], y=rnd.gauss(0, 1), z=None if i % 7 == 0 else rnd.gauss(9, 1))
+            for i in range(1000)
+        ]
+        for kind in [LowPass, HighPass]:
+            samples, blocks = kind(3, sample_rate=100), kind(3, sample_rate=100)
+            expected = [out for msg in msgs for out in samples.process([msg])]
+            # blocks of different lengths, longer ones are split
+            actual = blocks.process(msgs[:40]) + blocks.process(msgs[40:700]) + blocks.process(msgs[700:])
+            self.assertEqual(len(actual), len(expected))
+            for exp, act in zip(expected, actual):
+                self.assertEqual(act.device_id, exp.device_id)
+                for axis in ['x', 'y']:
+                    self.assertAlmostEqual(act[axis], exp[axis], places=9)
+                if exp.z is None:
+                    self.assertIsNone(act.z)
+                else:
+                    self.assertAlmostEqual(act.z, exp.z, places=9)
+
+    def test_blocks_without_numpy(self):
+        batch = [acc(i / 100, 3) for i in range(100)]
+        with patch.object(filters, 'np', None):
+            out = LowPass(2, sample_rate=100).process(batch)
+        self.assertTrue(all(abs(msg.x - 3) < 1e-9 for msg in out))
+
+
+class TestDecimate(unittest.TestCase):
+    def test_blocks_are_averaged(self):
+        decimate = Decimate(3)
+        out = decimate.process([acc(i, i, interval=10) for i in range(7)])
+        self.assertEqual([(msg.time_stamp, msg.x, msg.interval) for msg in out], [(2, 1, 30), (5, 4, 30)])
+        # the remaining sample is completed by the next batch
+        out = decimate.process([acc(7, 7), acc(8, 8)])
+        self.assertEqual([(msg.time_stamp, msg.x) for msg in out], [(8, 7)])
+
+    def test_devices_are_decimated_separately(self):
+        decimate = Decimate(2)
+        out = decimate.process([acc(0, 0, 'a'), acc(0, 10, 'b'), acc(1, 2, 'a'), acc(1, 20, 'b')])
+        self.assertEqual(sorted((msg.device_id, msg.x) for msg in out), [('a', 1), ('b', 15)])
+
+    def test_reset(self):
+        decimate = Decimate(2)
+        decimate.process([acc(0, 5)])
+        decimate.reset()
+        self.assertEqual(decimate.process([acc(1, 1), acc(2, 3)])[0].x, 2)
+
+
+class TestComplementaryFilter(unittest.TestCase):
+    def test_angles_follow_the_gravity(self):
+        fusion = ComplementaryFilter(alpha=0.5)
+        out = fusion.process([acc(0, 0, z=9.81)])
+        self.assertAlmostEqual(out[0].beta, 0)
+        self.assertAlmostEqual(out[0].gamma, 0)
+        # tilted by 90 degrees: converges towards the acceleration angle
+        for i in range(1, 30):
+            out = fusion.process([acc(i, -9.81)])
+        self.assertAlmostEqual(out[0].gamma, 90, places=3)
+
+    def test_gyro_changes_are_integrated(self):
+        fusion = ComplementaryFilter(alpha=1)
+        fusion.process([acc(0, 0, z=9.81)])
+        gyro = {'device_id': 'FooBar', 'type': 'gyro', 'alpha': 0, 'gamma': 0, 'time_stamp': 0}
+        self.assertEqual(fusion.process([DictX({**gyro, 'beta': 170})]), [])
+        fusion.process([DictX({**gyro, 'beta': -170})])
+        # the change is wrapped: +20 degrees
+        self.assertAlmostEqual(fusion.process([acc(1, 0, z=9.81)])[0].beta, 20)
+
+
+class TestConnectorFilters(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def test_filtered_messages_are_a_new_data_type(self):
+        received = []
+        self.connector.add_filter('smooth', LowPass(2, sample_rate=100))
+        self.connector.on('smooth', lambda data: received.append(data))
+        for i in range(3):
+            receive(self.connector, acc(i / 100, 1))
+        self.assertEqual(len(received), 3)
+        self.assertEqual(received[0]['type'], 'smooth')
+        self.assertEqual(len(self.connector.all_data('smooth')), 3)
+        self.assertEqual(len(self.connector.all_data('acceleration')), 3)
+
+    def test_batches_and_chained_filters(self):
+        self.connector.add_filter('half', Decimate(2), batch_size=4)
+        self.connector.add_filter('quarter', Decimate(2, source='half'))
+        for i in range(7):
+            receive(self.connector, acc(i, i))
+        self.assertEqual([msg.x for msg in self.connector.all_data('half')], [0.5, 2.5])
+        self.assertEqual([msg.x for msg in self.connector.all_data('quarter')], [1.5])
+
+    def test_built_in_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.connector.add_filter('acceleration', LowPass(2))
+
+    def test_remove_filter(self):
+        self.connector.add_filter('smooth', LowPass(2, sample_rate=100))
+        self.connector.remove_filter('smooth')
+        receive(self.connector, acc(0, 1))
+        self.assertEqual(self.connector.all_data('smooth'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
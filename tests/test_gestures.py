@@ -0,0 +1,100 @@
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.dictx import DictX
+from smartphone_connector.gestures import GRAVITY, ShakeDetector, TapDetector, TiltDetector
+
+
+def acc(t: float, x: float = 0, y: float = 0, z: float = GRAVITY, device_id: str = 'FooBar') -> DictX:
+    return DictX({'device_id': device_id, 'type': 'acceleration', 'x': x, 'y': y, 'z': z, 'time_stamp': t})
+
+
+def feed(detector, msgs):
+    return [event for event in map(detector.feed, msgs) if event is not None]
+
+
+class TestShakeDetector(unittest.TestCase):
+    def test_shake(self):
+        msgs = [acc(i * 0.05, x=25 if i % 2 else -25) for i in range(8)]
+        events = feed(ShakeDetector(), msgs)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].type, 'shake')
+        self.assertEqual(events[0].peaks, 4)
+        self.assertGreater(events[0].intensity, 12)
+
+    def test_resting_phone_is_not_shaken(self):
+        self.assertEqual(feed(ShakeDetector(), [acc(i * 0.05) for i in range(50)]), [])
+
+    def test_peaks_must_be_within_the_window(self):
+        msgs = [acc(i * 0.5, x=25) for i in range(8)]
+        self.assertEqual(feed(ShakeDetector(peaks=4, window=1), msgs), [])
+
+    def test_debounce(self):
+        msgs = [acc(i * 0.05, x=25) for i in range(40)]
+        events = feed(ShakeDetector(debounce=1), msgs)
+        self.assertEqual([round(e.time_stamp, 6) for e in events], [0.15, 1.15])
+
+    def test_devices_are_separated(self):
+        msgs = [acc(i * 0.05, x=25, device_id='a' if i % 2 else 'b') for i in range(6)]
+        self.assertEqual(feed(ShakeDetector(), msgs), [])
+
+
+class TestTiltDetector(unittest.TestCase):
+    def test_tilt_directions(self):
+        detector = TiltDetector(time_constant=0)
+        events = feed(detector, [acc(0), acc(1, x=-6, z=7), acc(2), acc(3, y=6, z=7), acc(4, y=-6, z=7)])
+        self.assertEqual([e.direction for e in events], ['right', 'flat', 'forward', 'backward'])
+
+    def test_hysteresis(self):
+        detector = TiltDetector(threshold=25, hysteresis=10, time_constant=0)
+        # 30 degrees enters, 20 degrees stays, 10 degrees leaves
+        tilt = [acc(i, x=-GRAVITY * s, z=GRAVITY * c) for i, (s, c) in enumerate([(0.5, 0.866), (0.342, 0.94), (0.174, 0.985)])]
+        self.assertEqual([e.direction for e in feed(detector, tilt)], ['right', 'flat'])
+
+    def test_short_shakes_are_smoothed(self):
+        detector = TiltDetector(time_constant=0.5)
+        msgs = [acc(i * 0.02) for i in range(10)] + [acc(0.2, x=-20, z=3)] + [acc(0.2 + i * 0.02) for i in range(1, 10)]
+        self.assertEqual(feed(detector, msgs), [])
+
+
+class TestTapDetector(unittest.TestCase):
+    def test_tap(self):
+        events = feed(TapDetector(), [acc(0), acc(0.02, z=GRAVITY + 8), acc(0.04, z=GRAVITY + 3), acc(0.06)])
+        self.assertEqual(len(events), 1)
+        self.assertAlmostEqual(events[0].duration, 0.04)
+        self.assertAlmostEqual(events[0].intensity, 8)
+
+    def test_long_spikes_are_no_taps(self):
+        msgs = [acc(0)] + [acc(0.02 * i, z=GRAVITY + 8) for i in range(1, 20)] + [acc(0.5)]
+        self.assertEqual(feed(TapDetector(max_duration=0.15), msgs), [])
+
+
+class TestConnectorGestures(unittest.TestCase):
+    def test_registering_a_callback_starts_the_detection(self):
+        connector, _ = make_connector()
+        shakes = []
+        connector.on('shake', lambda data: shakes.append(data))
+        for i in range(8):
+            receive(connector, acc(i * 0.05, x=25 if i % 2 else -25))
+        self.assertEqual(len(shakes), 1)
+        self.assertEqual(len(connector.all_data('shake')), 1)
+
+    def test_configured_detector(self):
+        connector, _ = make_connector()
+        detector = connector.detect_gesture('shake', peaks=2)
+        self.assertEqual(detector.peaks, 2)
+        for i in range(2):
+            receive(connector, acc(i * 0.05, x=25))
+        self.assertEqual(len(connector.all_data('shake')), 1)
+        connector.stop_gesture('shake')
+        for i in range(2, 40):
+            receive(connector, acc(i * 0.05, x=25))
+        self.assertEqual(len(connector.all_data('shake')), 1)
+
+    def test_unknown_gesture(self):
+        connector, _ = make_connector()
+        with self.assertRaises(ValueError):
+            connector.detect_gesture('wave')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+import mock_connector  # noqa: F401 (adds the package to the path)
+from smartphone_connector.assets import AssetCache, ImagePipeline, load_assets
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def image_bytes(width: int, height: int, fmt: str = 'PNG') -> bytes:
+    out = BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(out, format=fmt)
+    return out.getvalue()
+
+
+@unittest.skipIf(Image is None, 'Pillow is not installed')
+class TestImagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_for_playground_limits_to_the_screen_size(self):
+        pipeline = ImagePipeline(screen_size=1000).for_playground(200, 100)
+        self.assertEqual(pipeline.max_size, (1000, 500))
+        explicit = ImagePipeline(max_size=(10, 10))
+        self.assertIs(explicit.for_playground(200, 100), explicit)
+
+    def test_variant_depends_on_the_settings(self):
+        self.assertNotEqual(ImagePipeline((10, 10)).variant, ImagePipeline((20, 10)).variant)
+        self.assertNotEqual(ImagePipeline((10, 10)).variant, ImagePipeline((10, 10), bmp_format='webp').variant)
+
+    def test_large_images_are_downscaled(self):
+        payload, file_type = ImagePipeline(max_size=(50, 50)).process(image_bytes(200, 100), 'png')
+        self.assertEqual(file_type, 'png')
+        self.assertEqual(Image.open(BytesIO(payload)).size, (50, 25))
+
+    def test_small_images_are_kept(self):
+        raw = image_bytes(20, 20)
+        payload, file_type = ImagePipeline(max_size=(50, 50)).process(raw, 'png')
+        self.assertEqual((payload, file_type), (raw, 'png'))
+
+    def test_bmps_are_converted(self):
+        payload, file_type = ImagePipeline().process(image_bytes(20, 20, 'BMP'), 'bmp')
+        self.assertEqual(file_type, 'png')
+        self.assertEqual(Image.open(BytesIO(payload)).format, 'PNG')
+
+    def test_invalid_images_are_passed_through(self):
+        payload, file_type = ImagePipeline(max_size=(5, 5)).process(b'no image', 'png')
+        self.assertEqual((payload, file_type), (b'no image', 'png'))
+
+    def test_gifs_and_svgs_are_not_handled(self):
+        pipeline = ImagePipeline()
+        self.assertFalse(pipeline.handles('gif'))
+        self.assertFalse(pipeline.handles('svg'))
+        self.assertTrue(pipeline.handles('bmp'))
+
+    def test_processed_payloads_are_cached(self):
+        file = self.dir / 'big.png'
+        file.write_bytes(image_bytes(300, 300))
+        cache = AssetCache(self.dir / 'cache')
+        pipeline = ImagePipeline(max_size=(30, 30))
+        pkgs, _ = load_assets([file], 'image', cache, {}, pipeline=pipeline)
+        processed = pkgs[0]['image']
+        self.assertEqual(Image.open(BytesIO(processed)).size, (30, 30))
+
+        # a new session (nothing uploaded yet) reuses the cached payload without processing again
+        pipeline.process = None
+        pkgs, _ = load_assets([file], 'image', cache, {}, pipeline=pipeline)
+        self.assertEqual(pkgs[0]['image'], processed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.executor import LatestCallback
+
+
+def acc(t: float) -> dict:
+    return {'device_id': 'FooBar', 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t}
+
+
+class TestLatestCallback(unittest.TestCase):
+    def test_pending_messages_are_replaced(self):
+        release = threading.Event()
+        handled = []
+
+        def slow(data):
+            handled.append(data)
+            release.wait(2)
+
+        callback = LatestCallback(slow, lambda fn, data: fn(data))
+        callback({'i': 0})
+        time.sleep(0.05)
+        for i in range(1, 5):
+            callback({'i': i})
+        release.set()
+        time.sleep(0.05)
+        callback.stop()
+        self.assertEqual([(d['i'], d['skipped']) for d in handled], [(0, 0), (4, 3)])
+        self.assertEqual(callback.skipped, 3)
+
+    def test_the_message_is_copied(self):
+        handled = []
+        done = threading.Event()
+        callback = LatestCallback(lambda data: (handled.append(data), done.set()), lambda fn, data: fn(data))
+        msg = {'i': 0}
+        callback(msg)
+        done.wait(2)
+        callback.stop()
+        self.assertNotIn('skipped', msg)
+        self.assertEqual(handled[0]['skipped'], 0)
+
+    def test_other_payloads_are_passed_unchanged(self):
+        handled = []
+        callback = LatestCallback(handled.append, lambda fn, data: fn(data))
+        for payload in [[{'device_id': 'FooBar'}], None]:
+            callback(payload)
+            time.sleep(0.05)
+        callback.stop()
+        self.assertEqual(handled, [[{'device_id': 'FooBar'}], None])
+
+    def test_stopped_callbacks_are_not_called(self):
+        handled = []
+        callback = LatestCallback(handled.append, lambda fn, data: fn(data))
+        callback.stop()
+        callback({'i': 0})
+        time.sleep(0.05)
+        self.assertEqual(handled, [])
+
+
+class TestConnectorLatestPolicy(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def test_devices(self):
+        handled = threading.Event()
+        devices = []
+        self.connector.on('devices', lambda data: (devices.append(data), handled.set()), policy='latest')
+        receive(self.connector, {'devices': [{'device_id': 'FooBar', 'device_nr': 0}]}, 'devices')
+        self.assertTrue(handled.wait(2))
+        self.assertEqual([[d['device_id'] for d in data] for data in devices], [['FooBar']])
+
+    def test_slow_callback_handles_recent_data(self):
+        release = threading.Event()
+        latest, every = [], []
+
+        def slow(data):
+            latest.append(data.x)
+            release.wait(2)
+
+        self.connector.on('acceleration', slow, policy='latest')
+        self.connector.on('acceleration', lambda data: every.append(data.x))
+        receive(self.connector, acc(0))
+        time.sleep(0.05)
+        for t in range(1, 10):
+            receive(self.connector, acc(t))
+        release.set()
+        time.sleep(0.05)
+        self.assertEqual(every, list(range(10)))
+        self.assertEqual(latest, [0, 9])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            self.connector.on('acceleration', print, policy='some')
+
+    def test_removing_stops_the_wrapper(self):
+        handled = []
+        self.connector.on('acceleration', handled.append, policy='latest')
+        self.connector.remove('acceleration', handled.append)
+        receive(self.connector, acc(0))
+        time.sleep(0.05)
+        self.assertEqual(handled, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
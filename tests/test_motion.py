@@ -0,0 +1,106 @@
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.helpers import time_s
+from smartphone_connector.motion import SpriteMotion
+
+
+def relative(direction, speed, **kwargs):
+    return {'movement': 'relative', 'direction': direction, 'speed': speed, **kwargs}
+
+
+def absolute(to, **kwargs):
+    return {'movement': 'absolute', 'to': to, **kwargs}
+
+
+class TestSpriteMotion(unittest.TestCase):
+    def assertPos(self, actual, expected):
+        self.assertAlmostEqual(actual[0], expected[0])
+        self.assertAlmostEqual(actual[1], expected[1])
+
+    def test_resting_sprite(self):
+        motion = SpriteMotion((1, 2), 0)
+        self.assertPos(motion.position(100), (1, 2))
+
+    def test_direction_is_normalized(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'direction': [3, 4], 'speed': 10}, 0)
+        self.assertPos(motion.position(2), (12, 16))
+
+    def test_time_span_and_distance_stop_the_sprite(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'direction': [1, 0], 'speed': 2, 'time_span': 3}, 0)
+        self.assertPos(motion.position(10), (6, 0))
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'direction': [0, 1], 'speed': 2, 'distance': 5}, 0)
+        self.assertPos(motion.position(10), (0, 5))
+
+    def test_explicit_position_restarts_from_there(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'direction': [1, 0], 'speed': 1}, 0)
+        motion.update({'pos_x': 0, 'pos_y': 10}, 5)
+        self.assertPos(motion.position(7), (2, 10))
+
+    def test_sequence(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'movements': {'movements': [
+            relative([1, 0], 1, time_span=2),
+            absolute([2, 4], time=2)
+        ]}}, 0)
+        self.assertPos(motion.position(1), (1, 0))
+        self.assertPos(motion.position(3), (2, 2))
+        self.assertPos(motion.position(100), (2, 4))
+
+    def test_repeated_relative_sequence(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'movements': {'movements': [relative([1, 0], 1, time_span=1)], 'repeat': 3}}, 0)
+        self.assertPos(motion.position(2.5), (2.5, 0))
+        self.assertPos(motion.position(100), (3, 0))
+
+    def test_cycle(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'movements': {'movements': [
+            absolute([10, 0], time=1),
+            absolute([0, 0], time=1)
+        ], 'cycle': True}}, 0)
+        self.assertPos(motion.position(1000.5), (5, 0))
+        self.assertPos(motion.position(1001.25), (7.5, 0))
+
+    def test_rebase_on_reported_position(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'direction': [1, 0], 'speed': 1}, 0)
+        motion.rebase(3, 1, 2)
+        self.assertPos(motion.position(4), (5, 1))
+
+    def test_rebase_shifts_the_sequence_timeline(self):
+        motion = SpriteMotion((0, 0), 0)
+        motion.update({'movements': {'movements': [
+            relative([1, 0], 1, time_span=2),
+            relative([0, 1], 1, time_span=2)
+        ]}}, 0)
+        # the end of the first movement is reported late
+        motion.rebase(2, 0, 2.5)
+        self.assertPos(motion.position(3.5), (2, 1))
+
+
+class TestSpritePosition(unittest.TestCase):
+    def test_unknown_sprite(self):
+        connector, _ = make_connector()
+        self.assertIsNone(connector.sprite_position('nope'))
+
+    def test_position_is_extrapolated(self):
+        connector, _ = make_connector()
+        connector.add_sprite(id='ball', pos_x=0, pos_y=0, direction=[0, 1], speed=2)
+        now = time_s()
+        x, y = connector.sprite_position('ball', at=now + 3)
+        self.assertAlmostEqual(x, 0)
+        self.assertAlmostEqual(y, 6, places=2)
+
+    def test_reported_position_is_used(self):
+        connector, _ = make_connector()
+        connector.add_sprite(id='ball', pos_x=0, pos_y=0)
+        receive(connector, {'device_id': 'FooBar', 'type': 'auto_movement_pos', 'id': 'ball', 'x': 4, 'y': 5})
+        self.assertEqual(connector.sprite_position('ball'), (4, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
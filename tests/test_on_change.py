@@ -0,0 +1,67 @@
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.clock import VirtualClock, set_clock
+
+
+def key(k: str, t: float) -> dict:
+    return {'device_id': 'FooBar', 'type': 'key', 'key': k, 'time_stamp': t}
+
+
+def acc(t: float) -> dict:
+    return {'device_id': 'FooBar', 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t}
+
+
+class TestOnChangeSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        set_clock(self.clock)
+        self.connector, _ = make_connector()
+        self.frames = []
+
+    def tearDown(self):
+        self.connector.cancel_async_subscriptions()
+        set_clock(None)
+
+    def subscribe(self, on_change: bool):
+        self.connector.subscribe_async(lambda data: self.frames.append(data), interval=0.1, on_change=on_change)
+
+    def test_idle_ticks_are_skipped(self):
+        self.subscribe(on_change=True)
+        receive(self.connector, key('up', 0))
+        self.clock.advance(0.1)
+        self.assertEqual(len(self.frames), 1)
+        self.clock.advance(1)
+        self.assertEqual(len(self.frames), 1)
+        receive(self.connector, acc(1))
+        self.clock.advance(0.1)
+        self.assertEqual(len(self.frames), 2)
+
+    def test_changed_fields(self):
+        self.subscribe(on_change=True)
+        receive(self.connector, key('up', 0))
+        self.clock.advance(0.1)
+        receive(self.connector, acc(1))
+        self.clock.advance(0.1)
+        receive(self.connector, acc(2))
+        receive(self.connector, key('down', 2))
+        self.clock.advance(0.1)
+        self.assertEqual([frame.changed for frame in self.frames[1:]], [['acceleration'], ['key', 'acceleration']])
+        self.assertEqual(self.frames[-1].key.key, 'down')
+
+    def test_messages_of_other_devices_are_no_change(self):
+        self.subscribe(on_change=True)
+        receive(self.connector, key('up', 0))
+        self.clock.advance(0.1)
+        receive(self.connector, {**key('down', 1), 'device_id': 'other'})
+        self.clock.advance(0.5)
+        self.assertEqual(len(self.frames), 1)
+
+    def test_without_on_change_every_tick_is_delivered(self):
+        self.subscribe(on_change=False)
+        self.clock.advance(0.5)
+        self.assertEqual(len(self.frames), 5)
+        self.assertNotIn('changed', self.frames[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
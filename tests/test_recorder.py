@@ -0,0 +1,110 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from mock_connector import make_connector, receive
+from smartphone_connector.recorder import SessionRecorder, read_records, record_format
+
+
+class TestSessionRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, name: str, **kwargs) -> Path:
+        file = self.dir / name
+        recorder = SessionRecorder(file, **kwargs)
+        recorder.start()
+        recorder.record('new_data', {'type': 'key', 'key': 'a'})
+        recorder.record('emit', {'type': 'sprite'}, outbound=True)
+        recorder.record('new_data', {'type': 'key', 'key': 'b', 'raw': b'123'})
+        recorder.stop(2)
+        self.assertFalse(recorder.is_alive())
+        self.assertFalse(recorder.is_recording)
+        return file
+
+    def test_record_format(self):
+        self.assertEqual(record_format('a.jsonl'), 'jsonl')
+        self.assertEqual(record_format('a.jsonl.gz'), 'jsonl')
+        self.assertEqual(record_format('a.rec'), 'frames')
+
+    def test_formats_roundtrip(self):
+        for name in ['session.jsonl', 'session.jsonl.gz', 'session.rec']:
+            with self.subTest(name):
+                records = list(read_records(self.record(name, outbound=True)))
+                self.assertEqual([r.data['type'] for r in records], ['key', 'key'])
+                self.assertEqual(records[1].data['raw'], '<3 bytes>')
+                self.assertLessEqual(records[0].time_stamp, records[1].time_stamp)
+                all_records = list(read_records(self.dir / name, outbound=True))
+                self.assertEqual([r.outbound for r in all_records], [False, True, False])
+
+    def test_outbound_messages_are_only_recorded_when_enabled(self):
+        records = list(read_records(self.record('session.jsonl'), outbound=True))
+        self.assertEqual(len(records), 2)
+
+    def test_recordings_are_appended(self):
+        self.record('session.rec')
+        self.record('session.rec')
+        self.assertEqual(len(list(read_records(self.dir / 'session.rec'))), 4)
+
+    def test_incomplete_lines_are_skipped(self):
+        file = self.record('session.jsonl')
+        with open(file, 'ab') as f:
+            f.write(b'{"time_stamp": 1, "ev')
+        self.assertEqual(len(list(read_records(file))), 2)
+
+    def test_full_buffer_drops_when_configured(self):
+        recorder = SessionRecorder(self.dir / 'session.jsonl', buffer_size=2, drop_when_full=True)
+        for i in range(5):
+            recorder.record('new_data', {'i': i})
+        self.assertEqual((recorder.recorded, recorder.dropped), (2, 3))
+
+    def test_stop_without_writer_does_not_block(self):
+        recorder = SessionRecorder(self.dir / 'session.jsonl', buffer_size=2)
+        for i in range(5):
+            recorder.record('new_data', {'i': i})
+        done = threading.Event()
+        threading.Thread(target=lambda: (recorder.stop(), done.set()), daemon=True).start()
+        self.assertTrue(done.wait(2), 'stop blocks')
+        self.assertEqual(recorder.recorded, 2)
+
+    def test_all_counted_messages_are_written(self):
+        file = self.dir / 'session.rec'
+        recorder = SessionRecorder(file, buffer_size=4, flush_interval=0.01)
+        recorder.start()
+
+        def produce(nr: int):
+            for i in range(500):
+                recorder.record('new_data', {'producer': nr, 'i': i})
+
+        producers = [threading.Thread(target=produce, args=(nr,)) for nr in range(4)]
+        for producer in producers:
+            producer.start()
+        recorder.stop(5)
+        for producer in producers:
+            producer.join(5)
+        self.assertFalse(recorder.is_alive())
+        self.assertEqual(len(list(read_records(file))), recorder.recorded)
+        recorder.record('new_data', {'late': True})
+        self.assertEqual(len(list(read_records(file))), recorder.recorded)
+
+
+class TestConnectorRecording(unittest.TestCase):
+    def test_received_messages_are_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / 'session.jsonl'
+            connector, _ = make_connector()
+            connector.start_recording(file)
+            self.assertTrue(connector.is_recording)
+            receive(connector, {'device_id': 'FooBar', 'type': 'key', 'key': 'up', 'time_stamp': 1})
+            connector.stop_recording()
+            self.assertFalse(connector.is_recording)
+            records = list(read_records(file))
+            self.assertEqual([(r.event, r.data['key']) for r in records], [('new_data', 'up')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from mock_connector import make_connector
+from smartphone_connector.recorder import SessionRecorder
+from smartphone_connector.replay import ReplaySource
+
+
+def key_record(i: int, t: float, event: str = 'new_data') -> dict:
+    return {'time_stamp': t, 'event': event, 'data': {'type': 'key', 'device_id': 'FooBar', 'key': str(i), 'time_stamp': t}}
+
+
+class TestReplaySource(unittest.TestCase):
+    def test_as_fast_as_possible(self):
+        delivered = []
+        replay = ReplaySource([key_record(i, 100 * i) for i in range(5)], speed=None)
+        self.assertEqual(replay.play(lambda event, data: delivered.append(data['key'])), 5)
+        self.assertEqual(delivered, ['0', '1', '2', '3', '4'])
+
+    def test_original_timing_is_scaled(self):
+        times = []
+        replay = ReplaySource([key_record(i, 0.1 * i) for i in range(3)], speed=2)
+        start = time.time()
+        replay.play(lambda event, data: times.append(time.time() - start))
+        self.assertAlmostEqual(times[1], 0.05, delta=0.03)
+        self.assertAlmostEqual(times[2], 0.1, delta=0.03)
+
+    def test_event_filter(self):
+        delivered = []
+        records = [key_record(0, 0), key_record(1, 0, 'all_data'), key_record(2, 0)]
+        ReplaySource(records, speed=None, events=['new_data']).play(lambda event, data: delivered.append(event))
+        self.assertEqual(delivered, ['new_data', 'new_data'])
+
+    def test_retime(self):
+        delivered = []
+        replay = ReplaySource([key_record(0, 10), key_record(1, 12)], speed=None, retime=True)
+        start = time.time()
+        replay.play(lambda event, data: delivered.append(data['time_stamp']))
+        self.assertAlmostEqual(delivered[0], start, delta=0.5)
+        self.assertAlmostEqual(delivered[1] - delivered[0], 2)
+
+    def test_failing_receiver_does_not_stop_the_replay(self):
+        def deliver(event, data):
+            raise ValueError('boom')
+        self.assertEqual(ReplaySource([key_record(0, 0), key_record(1, 0)], speed=None).play(deliver), 2)
+
+    def test_without_receiver(self):
+        with self.assertRaises(Exception):
+            ReplaySource([key_record(0, 0)]).play()
+
+    def test_stop_a_background_replay(self):
+        delivered = []
+        replay = ReplaySource([key_record(0, 0), key_record(1, 60)], speed=1)
+        replay.deliver = lambda event, data: delivered.append(data['key'])
+        replay.start()
+        time.sleep(0.05)
+        replay.stop()
+        replay.join(1)
+        self.assertFalse(replay.is_alive())
+        self.assertEqual(delivered, ['0'])
+
+
+class TestConnectorReplay(unittest.TestCase):
+    def test_recorded_session_is_replayed_through_the_ingest_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / 'session.rec'
+            recorder = SessionRecorder(file)
+            recorder.start()
+            for i in range(3):
+                record = key_record(i, 1 + i)
+                recorder.record(record['event'], record['data'])
+            recorder.stop(2)
+
+            connector, _ = make_connector()
+            keys = []
+            connector.on('key', lambda data: keys.append(data.key))
+            replay = connector.replay(file, speed=None)
+            self.assertEqual(replay.replayed, 3)
+            self.assertEqual(keys, ['0', '1', '2'])
+            self.assertEqual([msg['key'] for msg in connector.all_data('key')], ['0', '1', '2'])
+
+    def test_background_replay(self):
+        connector, _ = make_connector()
+        done = threading.Event()
+        connector.on('key', lambda data: data.key == '2' and done.set())
+        connector.replay(ReplaySource([key_record(i, i * 0.01) for i in range(3)]), blocking=False)
+        self.assertTrue(done.wait(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
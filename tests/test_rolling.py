@@ -0,0 +1,108 @@
+import random
+import statistics
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.rolling import RollingWindow
+
+
+class TestRollingWindow(unittest.TestCase):
+    def test_empty(self):
+        rolling = RollingWindow(1)
+        self.assertEqual(rolling.count, 0)
+        for value in [rolling.mean, rolling.variance, rolling.std, rolling.rms, rolling.min, rolling.max,
+                      rolling.peak, rolling.ema, rolling.latest]:
+            self.assertIsNone(value)
+
+    def test_aggregates_match_a_recomputation(self):
+        rnd = random.Random(1)
+        rolling = RollingWindow(window=0.5)
+        samples = []
+        t = 0.0
+        for _ in range(500):
+            t += rnd.uniform(0.005, 0.03)
+            value = rnd.gauss(3, 2)
+            rolling.add(t, value)
+            samples.append((t, value))
+            values = [v for ts, v in samples if ts >= t - 0.5]
+            self.assertEqual(rolling.count, len(values))
+            self.assertAlmostEqual(rolling.mean, statistics.fmean(values))
+            self.assertAlmostEqual(rolling.variance, statistics.pvariance(values))
+            self.assertEqual(rolling.min, min(values))
+            self.assertEqual(rolling.max, max(values))
+            self.assertEqual(rolling.peak, max(abs(v) for v in values))
+            self.assertAlmostEqual(rolling.rms, statistics.fmean(v * v for v in values) ** 0.5)
+            self.assertEqual(rolling.latest, value)
+
+    def test_the_latest_sample_is_kept(self):
+        rolling = RollingWindow(window=1)
+        rolling.add(0, 5)
+        rolling.add(10, 7)
+        self.assertEqual((rolling.count, rolling.mean, rolling.variance), (1, 7, 0))
+
+    def test_samples_outside_of_the_window_are_ignored(self):
+        rolling = RollingWindow(1.0)
+        rolling.add(10, 5)
+        rolling.add(8, 3)
+        self.assertEqual((rolling.count, rolling.mean, rolling.min, rolling.max, rolling.peak), (1, 5, 5, 5, 5))
+
+    def test_late_samples_stay_consistent(self):
+        rnd = random.Random(2)
+        rolling = RollingWindow(window=0.5)
+        t = 0.0
+        for _ in range(500):
+            t += rnd.uniform(0.005, 0.03)
+            # every third sample arrives late
+            rolling.add(t - rnd.uniform(0, 0.7) if rnd.random() < 0.3 else t, rnd.gauss(0, 2))
+            self.assertEqual(rolling.count > 0, rolling.min is not None and rolling.max is not None)
+            self.assertLessEqual(rolling.min, rolling.mean + 1e-9)
+            self.assertGreaterEqual(rolling.max, rolling.mean - 1e-9)
+            self.assertIsNotNone(rolling.peak)
+
+    def test_a_late_sample_is_not_the_latest(self):
+        rolling = RollingWindow(1.0)
+        rolling.add(10, 5)
+        rolling.add(9.5, 3)
+        self.assertEqual((rolling.count, rolling.mean, rolling.min, rolling.latest), (2, 4, 3, 5))
+        rolling.add(11.1, 1)
+        # the late sample is evicted with the sample it arrived with
+        self.assertEqual((rolling.count, rolling.min, rolling.max), (1, 1, 1))
+
+    def test_ema(self):
+        rolling = RollingWindow(window=1, ema_time_constant=1)
+        rolling.add(0, 0)
+        self.assertEqual(rolling.ema, 0)
+        rolling.add(100, 10)
+        self.assertAlmostEqual(rolling.ema, 10)
+        rolling.add(100, 0)
+        self.assertAlmostEqual(rolling.ema, 10)
+
+    def test_clear(self):
+        rolling = RollingWindow(1)
+        rolling.add(0, 1)
+        rolling.clear()
+        self.assertEqual(rolling.count, 0)
+        self.assertIsNone(rolling.ema)
+
+
+class TestConnectorRolling(unittest.TestCase):
+    def test_rolling_follows_the_received_data(self):
+        connector, _ = make_connector()
+        for t in range(5):
+            receive(connector, {'device_id': 'FooBar', 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t})
+        # initialized with the history within the window
+        acc_x = connector.rolling('acceleration', 'x', window=2)
+        self.assertEqual((acc_x.count, acc_x.min, acc_x.max), (3, 2, 4))
+        self.assertIs(connector.rolling('acceleration', 'x', window=2), acc_x)
+        receive(connector, {'device_id': 'FooBar', 'type': 'acceleration', 'x': 10, 'y': 0, 'z': 0, 'time_stamp': 5})
+        self.assertEqual((acc_x.count, acc_x.min, acc_x.max, acc_x.latest), (3, 3, 10, 10))
+        self.assertEqual(connector.rolling('acceleration', 'y', window=2).count, 3)
+
+    def test_rolling_of_other_devices(self):
+        connector, _ = make_connector()
+        receive(connector, {'device_id': 'other', 'type': 'gyro', 'alpha': 1, 'beta': 0, 'gamma': 0, 'time_stamp': 1})
+        self.assertEqual(connector.rolling('gyro', 'alpha').count, 0)
+        self.assertEqual(connector.rolling('gyro', 'alpha', device_id='other').mean, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from mock_connector import make_connector, sent_data
+from smartphone_connector.simulator import PlaygroundSimulator, np
+
+
+def sprite(id, **kwargs):
+    return {'type': 'sprite', 'sprite': {'id': id, 'width': 2, 'height': 2, **kwargs}}
+
+
+class TestPlaygroundSimulator(unittest.TestCase):
+    vectorize = False
+
+    def setUp(self):
+        self.events = []
+        self.sim = PlaygroundSimulator(on_event=self.events.append, frame_rate=10, start_time=0, vectorize=self.vectorize)
+        self.sim.receive({'type': 'playground_config', 'config': {'width': 100, 'height': 100}})
+
+    def types(self, type):
+        return [e for e in self.events if e['type'] == type]
+
+    def test_sprites_move_with_their_speed(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, direction=[1, 0], speed=5))
+        frames = self.sim.run(2)
+        self.assertEqual(frames, 20)
+        self.assertAlmostEqual(self.sim.time, 2)
+        self.assertAlmostEqual(self.sim.get_sprite('a')['pos_x'], 20)
+        self.assertAlmostEqual(self.sim.get_sprite('a')['pos_y'], 10)
+
+    def test_time_span_removes_the_sprite(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, time_span=1))
+        self.sim.run(2)
+        self.assertIsNone(self.sim.get_sprite('a'))
+        self.assertEqual([e['id'] for e in self.types('sprite_removed')], ['a'])
+
+    def test_border_overlap_and_sprite_out(self):
+        self.sim.receive(sprite('a', pos_x=95, pos_y=50, direction=[1, 0], speed=10))
+        self.sim.run(2)
+        self.assertEqual([e['border'] for e in self.types('border_overlap')], ['right'])
+        self.assertEqual([e['id'] for e in self.types('sprite_out')], ['a'])
+        self.assertEqual(self.sim.sprites, [])
+
+    def test_collisions_are_reported_on_enter_and_leave(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, direction=[1, 0], speed=10, collision_detection=True))
+        self.sim.receive(sprite('b', pos_x=20, pos_y=10))
+        self.sim.run(3)
+        collisions = self.types('sprite_collision')
+        self.assertEqual([c['overlap'] for c in collisions], ['in', 'out'])
+        self.assertEqual(sorted(s['id'] for s in collisions[0]['sprites']), ['a', 'b'])
+
+    def test_no_collisions_without_detection(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, direction=[1, 0], speed=10))
+        self.sim.receive(sprite('b', pos_x=20, pos_y=10))
+        self.sim.run(3)
+        self.assertEqual(self.types('sprite_collision'), [])
+
+    def test_movement_sequence(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, movements={'movements': [
+            {'movement': 'absolute', 'to': [20, 10], 'time': 1},
+            {'movement': 'relative', 'direction': [0, 1], 'speed': 10, 'time_span': 1}
+        ], 'exit_on_done': True}))
+        self.sim.run(1.5)
+        self.assertAlmostEqual(self.sim.get_sprite('a')['pos_x'], 20)
+        self.assertAlmostEqual(self.sim.get_sprite('a')['pos_y'], 15)
+        self.sim.run(1)
+        positions = [(e['movement_id'], e['x'], e['y']) for e in self.types('auto_movement_pos')]
+        self.assertEqual(len(positions), 2)
+        self.assertEqual(positions[0][0], '0')
+        self.assertAlmostEqual(positions[1][2], 20)
+        self.assertEqual([e['id'] for e in self.types('sprite_removed')], ['a'])
+
+    def test_clear_playground(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10))
+        self.sim.receive({'type': 'clear_playground'})
+        self.assertEqual(self.sim.sprites, [])
+        self.assertEqual(self.sim.bounds, (0, 0, 100, 100))
+
+    def test_run_until(self):
+        self.sim.receive(sprite('a', pos_x=10, pos_y=10, direction=[1, 0], speed=10))
+        frames = self.sim.run(10, until=lambda: self.sim.get_sprite('a')['pos_x'] >= 15)
+        self.assertEqual(frames, 5)
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestVectorizedPlaygroundSimulator(TestPlaygroundSimulator):
+    vectorize = True
+
+
+class TestConnectorSimulation(unittest.TestCase):
+    def test_playground_messages_go_to_the_simulator(self):
+        connector, sent = make_connector()
+        outs = []
+        connector.on('sprite_out', lambda data: outs.append(data['id']))
+        sim = connector.simulate(frame_rate=10, start_time=0)
+        connector.configure_playground(width=50, height=50)
+        connector.add_sprite(id='ball', pos_x=45, pos_y=10, width=2, height=2, direction=[1, 0], speed=10)
+        sim.run(2)
+        self.assertEqual(outs, ['ball'])
+        self.assertEqual(sent_data(sent, 'sprite'), [])
+
+        connector.stop_simulation()
+        connector.add_sprite(id='other', pos_x=0, pos_y=0)
+        self.assertEqual(len(sent_data(sent, 'sprite')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import random
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.spatial import SpatialGrid, bbox_distance, sprite_bbox
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = SpatialGrid(10)
+        self.grid.update('a', (0, 0, 5, 5))
+        self.grid.update('b', (20, 20, 45, 25))
+
+    def test_sprite_bbox(self):
+        self.assertEqual(sprite_bbox({'pos_x': 10, 'pos_y': 20, 'width': 4, 'height': 2}), (10, 20, 14, 22))
+        self.assertEqual(sprite_bbox({'pos_x': 10, 'pos_y': 20, 'width': 4, 'height': 2, 'anchor': [0.5, 0.5]}),
+                         (8, 19, 12, 21))
+
+    def test_bbox_distance(self):
+        self.assertEqual(bbox_distance((0, 0, 5, 5), 2, 2), 0)
+        self.assertEqual(bbox_distance((0, 0, 5, 5), 8, 9), 5)
+
+    def test_at(self):
+        self.assertEqual(self.grid.at(1, 1), ['a'])
+        self.assertEqual(self.grid.at(44, 21), ['b'])
+        self.assertEqual(self.grid.at(8, 8), [])
+
+    def test_in_rect(self):
+        self.assertEqual(sorted(self.grid.in_rect(-10, -10, 100, 100)), ['a', 'b'])
+        self.assertEqual(self.grid.in_rect(30, 0, 40, 20), ['b'])
+        self.assertEqual(self.grid.in_rect(6, 6, 19, 19), [])
+
+    def test_nearest(self):
+        self.assertEqual(self.grid.nearest(10, 10), 'a')
+        self.assertEqual(self.grid.nearest(100, 25), 'b')
+        self.assertIsNone(self.grid.nearest(100, 25, max_distance=10))
+        self.assertEqual(self.grid.nearest(1, 1, exclude={'a'}), 'b')
+        self.assertIsNone(SpatialGrid().nearest(0, 0))
+
+    def test_nearest_matches_brute_force(self):
+        rnd = random.Random(4)
+        grid = SpatialGrid(7)
+        boxes = {}
+        for i in range(200):
+            x, y = rnd.uniform(-100, 100), rnd.uniform(-100, 100)
+            boxes[str(i)] = (x, y, x + rnd.uniform(0, 15), y + rnd.uniform(0, 15))
+            grid.update(str(i), boxes[str(i)])
+        for _ in range(100):
+            x, y = rnd.uniform(-150, 150), rnd.uniform(-150, 150)
+            expected = min(bbox_distance(box, x, y) for box in boxes.values())
+            self.assertAlmostEqual(bbox_distance(boxes[grid.nearest(x, y)], x, y), expected)
+
+    def test_update_moves_and_remove(self):
+        self.grid.update('a', (50, 50, 52, 52))
+        self.assertEqual(self.grid.at(1, 1), [])
+        self.assertEqual(self.grid.at(51, 51), ['a'])
+        self.grid.remove('a')
+        self.assertNotIn('a', self.grid)
+        self.assertEqual(len(self.grid), 1)
+        self.grid.remove('unknown')
+
+    def test_rebuild_keeps_the_sprites(self):
+        self.grid.rebuild(3)
+        self.assertEqual(self.grid.cell_size, 3)
+        self.assertEqual(self.grid.at(44, 21), ['b'])
+        self.assertEqual(self.grid.nearest(10, 10), 'a')
+
+
+class TestConnectorSpatialQueries(unittest.TestCase):
+    def test_queries_follow_the_sprites(self):
+        connector, _ = make_connector()
+        connector.add_sprite(id='a', pos_x=0, pos_y=0, width=5, height=5)
+        connector.add_sprite(id='b', pos_x=50, pos_y=50, width=5, height=5)
+        self.assertEqual([s['id'] for s in connector.sprites_at(1, 1)], ['a'])
+        self.assertEqual(connector.nearest_sprite(40, 40)['id'], 'b')
+        self.assertEqual(sorted(s['id'] for s in connector.sprites_in_rect(0, 0, 100, 100)), ['a', 'b'])
+
+        receive(connector, {'device_id': 'FooBar', 'type': 'auto_movement_pos', 'id': 'a', 'x': 80, 'y': 80})
+        self.assertEqual(connector.sprites_at(1, 1), [])
+        self.assertEqual(connector.nearest_sprite(85, 85)['id'], 'a')
+
+        connector.remove_sprite('b')
+        self.assertIsNone(connector.nearest_sprite(50, 50, max_distance=5))
+
+    def test_queries_while_the_sprites_move(self):
+        connector, _ = make_connector()
+        for i in range(200):
+            connector.add_sprite(id=f's{i}', pos_x=i % 100, pos_y=i // 2, width=5, height=5)
+        stop = threading.Event()
+
+        def move():
+            rnd = random.Random(1)
+            while not stop.is_set():
+                id = f's{rnd.randrange(200)}'
+                receive(connector, {'device_id': 'FooBar', 'type': 'auto_movement_pos', 'id': id,
+                                    'x': rnd.uniform(0, 100), 'y': rnd.uniform(0, 100)})
+                if rnd.random() < 0.1:
+                    connector.remove_sprite(id)
+                    connector.add_sprite(id=id, pos_x=rnd.uniform(0, 100), pos_y=rnd.uniform(0, 100), width=5, height=5)
+
+        mover = threading.Thread(target=move, daemon=True)
+        mover.start()
+        try:
+            rnd = random.Random(2)
+            end = time.time() + 1
+            while time.time() < end:
+                x, y = rnd.uniform(0, 100), rnd.uniform(0, 100)
+                self.assertTrue(all(s is not None for s in connector.sprites_at(x, y)))
+                self.assertTrue(all(s is not None for s in connector.sprites_in_rect(x, y, x + 30, y + 30)))
+                connector.nearest_sprite(x, y)
+        finally:
+            stop.set()
+            mover.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
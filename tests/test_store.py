@@ -0,0 +1,136 @@
+import threading
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.store import SnapshotCache, ListSnapshot
+
+
+def acc(t: float, device_id: str = 'FooBar') -> dict:
+    return {'device_id': device_id, 'type': 'acceleration', 'x': t, 'y': 0, 'z': 0, 'time_stamp': t}
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def test_snapshots_are_built_once(self):
+        cache = SnapshotCache()
+        items = [1]
+        builds = []
+
+        def build():
+            builds.append(1)
+            return tuple(items)
+
+        self.assertEqual(cache.get('items', build), (1,))
+        self.assertIs(cache.get('items', build), cache.get('items', build))
+        self.assertEqual(len(builds), 1)
+        with cache.lock:
+            items.append(2)
+            cache.invalidate('items')
+        self.assertEqual(cache.get('items', build), (1, 2))
+        self.assertEqual(len(builds), 2)
+
+    def test_invalidate_all(self):
+        cache = SnapshotCache()
+        cache.get('a', lambda: 'a')
+        cache.get('b', lambda: 'b')
+        cache.invalidate()
+        self.assertEqual(cache.get('a', lambda: 'A'), 'A')
+        self.assertEqual(cache.get('b', lambda: 'B'), 'B')
+
+    def test_shared_lock(self):
+        lock = threading.RLock()
+        self.assertIs(SnapshotCache(lock).lock, lock)
+
+
+class TestListSnapshot(unittest.TestCase):
+    def test_view_on_the_first_items(self):
+        items = [0, 1, 2]
+        snapshot = ListSnapshot(items)
+        items.append(3)
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(list(snapshot), [0, 1, 2])
+        self.assertEqual((snapshot[0], snapshot[-1]), (0, 2))
+        self.assertEqual((snapshot[1:], snapshot[:10], snapshot[::-1]), ([1, 2], [0, 1, 2], [2, 1, 0]))
+        self.assertEqual(snapshot.index(2), 2)
+        self.assertNotIn(3, snapshot)
+        with self.assertRaises(IndexError):
+            snapshot[3]
+        with self.assertRaises(IndexError):
+            snapshot[-4]
+
+    def test_length(self):
+        self.assertEqual(list(ListSnapshot([0, 1, 2], 2)), [0, 1])
+
+
+class TestConnectorSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def test_histories_are_immutable_snapshots(self):
+        for t in range(3):
+            receive(self.connector, acc(t))
+        history = self.connector.all_data('acceleration')
+        receive(self.connector, acc(3))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(len(self.connector.all_data('acceleration')), 4)
+
+    def test_latest_data_frames_are_replaced(self):
+        receive(self.connector, acc(0))
+        first = self.connector.latest_acceleration()
+        receive(self.connector, acc(1))
+        self.assertEqual(first.x, 0)
+        self.assertEqual(self.connector.latest_acceleration().x, 1)
+
+    def test_publishing_the_history_does_not_copy_it(self):
+        self.connector.start_recording()
+        history = self.connector._Connector__history
+        for t in range(1000):
+            receive(self.connector, acc(t))
+        first = history('FooBar', 'acceleration')
+        receive(self.connector, acc(1000))
+        second = history('FooBar', 'acceleration')
+        self.assertEqual((len(first), len(second)), (1000, 1001))
+        self.assertIs(first._ListSnapshot__items, second._ListSnapshot__items)
+        self.assertEqual([msg['time_stamp'] for msg in self.connector.data_since(999, 'acceleration')], [999, 1000])
+        self.connector.stop_recording()
+
+    def test_snapshots_survive_dropped_and_late_messages(self):
+        for t in range(200):
+            receive(self.connector, acc(t))
+        history = self.connector.all_data('acceleration')
+        snapshot = self.connector._Connector__history('FooBar', 'acceleration')
+        receive(self.connector, acc(500))
+        receive(self.connector, acc(150.5))
+        self.assertEqual([msg['time_stamp'] for msg in snapshot], [msg['time_stamp'] for msg in history])
+        times = [msg['time_stamp'] for msg in self.connector.all_data('acceleration')]
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(times[-2:], [199, 500])
+        self.assertIn(150.5, times)
+
+    def test_readers_see_consistent_histories(self):
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                msgs = self.connector.all_data('acceleration')
+                times = [msg['time_stamp'] for msg in msgs]
+                if times != sorted(times):
+                    errors.append(times)
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        for t in range(2000):
+            receive(self.connector, acc(t if t % 7 else t - 3))
+        stop.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+
+    def test_clean_data(self):
+        receive(self.connector, acc(0))
+        self.connector.clean_data()
+        self.assertEqual(self.connector.all_data('acceleration'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from mock_connector import make_connector, receive
+from smartphone_connector.streams import MessageStream
+
+
+def key(k: str, device_id: str = 'FooBar') -> dict:
+    return {'device_id': device_id, 'type': 'key', 'key': k, 'time_stamp': time.time()}
+
+
+class TestMessageStream(unittest.TestCase):
+    def test_drop_oldest(self):
+        stream = MessageStream(maxsize=2)
+        for i in range(4):
+            stream.put(i)
+        self.assertEqual(stream.dropped, 2)
+        self.assertEqual([stream.get(0), stream.get(0)], [2, 3])
+
+    def test_drop_newest(self):
+        stream = MessageStream(maxsize=2, policy='drop_newest')
+        for i in range(4):
+            stream.put(i)
+        self.assertEqual(stream.dropped, 2)
+        self.assertEqual([stream.get(0), stream.get(0)], [0, 1])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            MessageStream(policy='lifo')
+
+    def test_get_timeout(self):
+        start = time.time()
+        self.assertIsNone(MessageStream().get(timeout=0.05))
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_block_waits_for_the_consumer(self):
+        stream = MessageStream(maxsize=1, policy='block', block_timeout=None)
+        stream.put(0)
+        threading.Timer(0.05, stream.get).start()
+        stream.put(1)
+        self.assertEqual(stream.get(0), 1)
+        self.assertEqual(stream.dropped, 0)
+
+    def test_block_timeout_drops(self):
+        stream = MessageStream(maxsize=1, policy='block', block_timeout=0.05)
+        stream.put(0)
+        start = time.time()
+        stream.put(1)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(stream.dropped, 1)
+        self.assertEqual(stream.get(0), 0)
+
+    def test_close_wakes_blocked_put(self):
+        stream = MessageStream(maxsize=1, policy='block', block_timeout=None)
+        stream.put(0)
+        threading.Timer(0.05, stream.close).start()
+        stream.put(1)
+        self.assertTrue(stream.closed)
+
+    def test_iteration_ends_after_the_queued_messages(self):
+        stream = MessageStream()
+        for i in range(3):
+            stream.put(i)
+        stream.close()
+        self.assertEqual(list(stream), [0, 1, 2])
+
+    def test_break_closes(self):
+        closed = []
+        stream = MessageStream(on_close=closed.append)
+        for i in range(3):
+            stream.put(i)
+        for msg in stream:
+            break
+        self.assertTrue(stream.closed)
+        self.assertEqual(closed, [stream])
+
+    def test_exception_closes(self):
+        stream = MessageStream()
+        stream.put(0)
+        with self.assertRaises(KeyError):
+            for msg in stream:
+                raise KeyError(msg)
+        self.assertTrue(stream.closed)
+
+    def test_context_manager(self):
+        with MessageStream() as stream:
+            pass
+        self.assertTrue(stream.closed)
+
+
+class TestConnectorStream(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def streams(self):
+        return self.connector._Connector__streams
+
+    def test_receives_the_messages_of_the_device(self):
+        stream = self.connector.stream('key')
+        receive(self.connector, key('a'))
+        receive(self.connector, key('b', device_id='Other'))
+        receive(self.connector, {'device_id': 'FooBar', 'type': 'gyro', 'alpha': 0, 'beta': 0, 'gamma': 0, 'time_stamp': 0})
+        self.assertEqual(stream.get(0).key, 'a')
+        self.assertIsNone(stream.get(0))
+
+    def test_all_devices(self):
+        stream = self.connector.stream('key', device_id='__ALL_DEVICES__')
+        receive(self.connector, key('a'))
+        receive(self.connector, key('b', device_id='Other'))
+        self.assertEqual(stream.pending, 2)
+
+    def test_break_unregisters(self):
+        stream = self.connector.stream('key')
+        receive(self.connector, key('a'))
+        for msg in stream:
+            break
+        self.assertEqual(self.streams(), ())
+        receive(self.connector, key('b'))
+        self.assertEqual(stream.pending, 0)
+
+    def test_abandoned_blocking_stream_does_not_block_the_reception(self):
+        stream = self.connector.stream('key', maxsize=1, policy='block')
+        receive(self.connector, key('a'))
+        receive(self.connector, key('b'))
+        for msg in stream:
+            break
+        done = threading.Event()
+        threading.Thread(target=lambda: ([receive(self.connector, key(str(i))) for i in range(5)], done.set()), daemon=True).start()
+        self.assertTrue(done.wait(1))
+
+    def test_slow_blocking_consumer_does_not_deadlock(self):
+        self.connector.stream('key', maxsize=1, policy='block', block_timeout=0.05)
+        done = threading.Event()
+        threading.Thread(target=lambda: ([receive(self.connector, key(str(i))) for i in range(3)], done.set()), daemon=True).start()
+        self.assertTrue(done.wait(2))
+
+    def test_disconnect_closes(self):
+        stream = self.connector.stream('key')
+        receive(self.connector, key('a'))
+        self.connector.sio.connected = True
+        try:
+            with patch.object(self.connector.sio, 'disconnect'):
+                self.connector.disconnect()
+        finally:
+            self.connector.sio.connected = False
+        self.assertEqual([msg.key for msg in stream], ['a'])
+        self.assertEqual(self.streams(), ())
+
+
+if __name__ == '__main__':
+    unittest.main()
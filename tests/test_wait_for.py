@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from mock_connector import make_connector, receive
+from smartphone_connector.clock import VirtualClock, set_clock
+from smartphone_connector.waiting import EventWaiters
+
+
+def key(k: str) -> dict:
+    return {'device_id': 'FooBar', 'type': 'key', 'key': k, 'time_stamp': time.time()}
+
+
+def later(fn, delay: float = 0.05):
+    threading.Timer(delay, fn).start()
+
+
+class TestEventWaiters(unittest.TestCase):
+    def test_first_matching_message(self):
+        waiters = EventWaiters()
+        later(lambda: [waiters.notify('key', i) for i in range(5)])
+        self.assertEqual(waiters.wait('key', lambda i: i > 2, timeout=2), 3)
+
+    def test_timeout(self):
+        start = time.time()
+        self.assertIsNone(EventWaiters().wait('key', timeout=0.05))
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_failing_predicate_is_skipped(self):
+        waiters = EventWaiters()
+        later(lambda: (waiters.notify('key', None), waiters.notify('key', 1)))
+        self.assertEqual(waiters.wait('key', lambda i: i > 0, timeout=2), 1)
+
+    def test_cancel(self):
+        waiters = EventWaiters()
+        later(waiters.cancel)
+        self.assertIsNone(waiters.wait('key', timeout=2))
+
+
+class TestWaitFor(unittest.TestCase):
+    def setUp(self):
+        self.connector, _ = make_connector()
+
+    def tearDown(self):
+        set_clock(None)
+
+    def test_wait_for_a_key(self):
+        later(lambda: (receive(self.connector, key('a')), receive(self.connector, key('left'))))
+        msg = self.connector.wait_for('key', lambda data: data.key in ['left', 'right'], timeout=2)
+        self.assertEqual(msg.key, 'left')
+
+    def test_aliases(self):
+        later(lambda: receive(self.connector, {
+            'device_id': 'FooBar', 'type': 'acceleration', 'x': 0, 'y': 0, 'z': 0, 'time_stamp': 0
+        }))
+        self.assertEqual(self.connector.wait_for('acc', timeout=2).type, 'acceleration')
+
+    def test_callbacks_are_called_as_usual(self):
+        keys = []
+        self.connector.on('key', lambda data: keys.append(data.key))
+        later(lambda: receive(self.connector, key('a')))
+        self.connector.wait_for('key', timeout=2)
+        self.assertEqual(keys, ['a'])
+
+    def test_timeout_is_real_time_with_a_virtual_clock(self):
+        set_clock(VirtualClock(start=0))
+        done = threading.Event()
+        result = []
+        threading.Thread(target=lambda: (result.append(self.connector.wait_for('key', timeout=0.05)), done.set()),
+                         daemon=True).start()
+        self.assertTrue(done.wait(2), 'wait_for does not time out')
+        self.assertEqual(result, [None])
+
+    def test_wakes_up_with_a_virtual_clock(self):
+        set_clock(VirtualClock(start=0))
+        later(lambda: receive(self.connector, key('a')))
+        self.assertEqual(self.connector.wait_for('key', timeout=2).key, 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()